@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark the process collector backends (/proc parser vs psutil)
+
+Builds a synthetic procfs tree with N fake processes in a temp directory and
+points both backends at it, so host sizes that are impractical to spawn for
+real (5k, 20k processes) can be measured on any Linux box.
+
+Usage:
+  python3 benchmarks/bench_collectors.py [--sizes 500,5000,20000] [--cycles 5]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import psutil  # noqa: E402
+from task_manager_gui import ProcCollector, PsutilCollector, SamplingPlan  # noqa: E402
+
+STAT_TEMPLATE = (
+    "{pid} ({name}) S 1 {pid} {pid} 0 -1 4194560 1200 0 0 0 {utime} {stime} 0 0 20 0 1 0 {start} "
+    "25000000 {rss} 18446744073709551615 1 1 0 0 0 0 0 4096 0 0 0 0 17 0 0 0 0 0 0 0 0 0 0 0 0 0 0\n"
+)
+STATUS_TEMPLATE = (
+    "Name:\t{name}\nUmask:\t0022\nState:\tS (sleeping)\nTgid:\t{pid}\nNgid:\t0\nPid:\t{pid}\nPPid:\t1\n"
+    "TracerPid:\t0\nUid:\t{uid}\t{uid}\t{uid}\t{uid}\nGid:\t{uid}\t{uid}\t{uid}\t{uid}\nFDSize:\t64\n"
+    "VmPeak:\t   25000 kB\nVmSize:\t   24000 kB\nVmRSS:\t    {rss_kb} kB\nThreads:\t1\n"
+)
+IO_TEMPLATE = (
+    "rchar: 1000\nwchar: 1000\nsyscr: 10\nsyscw: 10\nread_bytes: {rb}\nwrite_bytes: {wb}\n"
+    "cancelled_write_bytes: 0\n"
+)
+
+
+def build_fake_procfs(root, count):
+    """Create `count` fake /proc/[pid] entries (plus the global stat file) under root."""
+    with open(os.path.join(root, 'stat'), 'w') as f:
+        f.write("cpu  100 0 100 1000 0 0 0 0 0 0\nbtime 1700000000\n")
+    names = ['python3', 'bash', 'chrome', 'systemd-journald', 'node', 'java', 'postgres']
+    for i in range(count):
+        pid = 1000 + i
+        name = names[i % len(names)]
+        rss_pages = 1000 + (i * 37) % 50000
+        d = os.path.join(root, str(pid))
+        os.mkdir(d)
+        with open(os.path.join(d, 'stat'), 'w') as f:
+            f.write(STAT_TEMPLATE.format(pid=pid, name=name[:15], utime=i % 500, stime=i % 50,
+                                         start=100 + i, rss=rss_pages))
+        with open(os.path.join(d, 'statm'), 'w') as f:
+            f.write(f"6000 {rss_pages} 500 10 0 1000 0\n")
+        with open(os.path.join(d, 'status'), 'w') as f:
+            f.write(STATUS_TEMPLATE.format(pid=pid, name=name[:15], uid=0 if i % 3 else os.getuid(),
+                                           rss_kb=rss_pages * 4))
+        with open(os.path.join(d, 'io'), 'w') as f:
+            f.write(IO_TEMPLATE.format(rb=i * 4096, wb=i * 1024))
+        with open(os.path.join(d, 'cmdline'), 'wb') as f:
+            f.write(f"/usr/bin/{name}\0--worker\0{i}\0".encode())
+
+
+def time_cycles(collector, cycles):
+    """Return (mean wall seconds, mean CPU seconds, rows) per collect() call."""
+    plan = SamplingPlan()
+    plan.begin_tick()
+    collector.collect(plan)  # warm-up (fills caches, primes CPU counters)
+    plan.end_tick()
+    wall = cpu = 0.0
+    rows = 0
+    for i in range(cycles):
+        w0, c0 = time.perf_counter(), time.process_time()
+        plan.begin_tick()
+        rows = len(collector.collect(plan))
+        plan.end_tick()
+        wall += time.perf_counter() - w0
+        cpu += time.process_time() - c0
+    return wall / cycles, cpu / cycles, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='500,5000,20000', help='comma-separated process counts')
+    parser.add_argument('--cycles', type=int, default=5, help='collection cycles per measurement')
+    args = parser.parse_args()
+
+    total_memory = psutil.virtual_memory().total
+    print(f"{'procs':>7} {'backend':>8} {'wall ms/cycle':>14} {'cpu ms/cycle':>13} {'rows':>7}")
+    for size in [int(s) for s in args.sizes.split(',') if s]:
+        root = tempfile.mkdtemp(prefix='fake_proc_')
+        old_procfs = psutil.PROCFS_PATH
+        try:
+            build_fake_procfs(root, size)
+            psutil.PROCFS_PATH = root
+            # Cached Process objects keep the procfs path they were created with
+            if hasattr(psutil.process_iter, 'cache_clear'):
+                psutil.process_iter.cache_clear()
+            backends = [
+                ProcCollector(total_memory, proc_root=root),
+                PsutilCollector(total_memory),
+            ]
+            for collector in backends:
+                wall, cpu, rows = time_cycles(collector, args.cycles)
+                print(f"{size:>7} {collector.name:>8} {wall * 1000:>14.1f} {cpu * 1000:>13.1f} {rows:>7}")
+        finally:
+            psutil.PROCFS_PATH = old_procfs
+            shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
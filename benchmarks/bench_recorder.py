@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark the snapshot recorder and replay seeking
+
+Feeds a synthetic host (N processes with realistic churn: a quarter of the CPU
+values change each tick, some RSS changes, a few spawns/exits) through
+SnapshotRecorder as DataFetcher would. Reports the recorder's CPU cost per frame
+as a share of a 1 s refresh, the on-disk bytes per frame and the projected
+24h file size. Then times seeks to random timestamps.
+
+Usage:
+  python3 benchmarks/bench_recorder.py [--procs 5000] [--frames 1800] [--seeks 50]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from task_manager_gui import ProcessDelta, ProcessSnapshot, SnapshotRecorder, SnapshotRecording  # noqa: E402
+
+
+def make_snapshot(count, rng):
+    names = ['python3', 'bash', 'chrome', 'systemd-journald', 'node', 'java', 'postgres']
+    snapshot = ProcessSnapshot()
+    for i in range(count):
+        snapshot.append(1000 + i, names[i % len(names)], 'root', round(rng.random() * 10, 1),
+                        rng.randint(1, 2000) * 1048576, 0.5, 0.0, 0.0, 4, -1, '', 1700000000.0 + i)
+    return snapshot
+
+
+def churn(snapshot, rng, tick, next_pid):
+    """Return the next tick's snapshot with CPU/RSS changes and a few spawns/exits."""
+    current = snapshot.copy()
+    n = len(current)
+    for i in range(tick % 4, n, 4):
+        current.cpu[i] = round(rng.random() * 10, 1)
+    for _ in range(n // 20):
+        i = rng.randrange(n)
+        current.rss[i] += 4096 * rng.randint(1, 64)
+    keep = sorted(rng.sample(range(n), n - 3))
+    current = current.take(keep)
+    for _ in range(3):
+        current.append(next_pid, 'worker', 'builder', 1.0, 8 * 1048576, 0.1, 0.0, 0.0, 1, -1, '', time.time())
+        next_pid += 1
+    return current, next_pid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--procs', type=int, default=5000, help='process count')
+    parser.add_argument('--frames', type=int, default=1800, help='frames to record (one per second)')
+    parser.add_argument('--seeks', type=int, default=50, help='random seeks to time')
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    directory = tempfile.mkdtemp(prefix='bench_recorder_')
+    path = os.path.join(directory, 'recording.tmrec')
+    recorder = SnapshotRecorder(path)
+    previous = make_snapshot(args.procs, rng)
+    next_pid = 1000 + args.procs
+    record_cpu = 0.0
+    start = 1700000000.0
+    try:
+        for frame in range(args.frames):
+            if frame == 0:
+                delta = ProcessDelta(1, snapshot=previous.copy())
+            else:
+                current, next_pid = churn(previous, rng, frame, next_pid)
+                # DataFetcher computes this diff anyway, so it is not charged to the recorder
+                delta = current.diff(previous, frame + 1, frame)
+                previous = current
+            c0 = time.process_time()
+            recorder.record(start + frame, {'percent': 50.0}, delta)
+            record_cpu += time.process_time() - c0
+        recorder.close()
+
+        size = os.path.getsize(path) + os.path.getsize(path + '.idx')
+        per_frame = record_cpu / args.frames
+        print(f"{args.procs} processes, {args.frames} frames")
+        print(f"record: {per_frame * 1000:.2f} ms CPU/frame ({per_frame * 100:.2f}% of a 1 s refresh)")
+        print(f"disk:   {size / args.frames / 1024:.1f} KiB/frame, {size / args.frames * 86400 / 1048576:.0f} MiB per 24h")
+
+        t0 = time.perf_counter()
+        recording = SnapshotRecording(path)
+        print(f"open:   {(time.perf_counter() - t0) * 1000:.1f} ms")
+        seek_times = []
+        for _ in range(args.seeks):
+            target = start + rng.random() * args.frames
+            t0 = time.perf_counter()
+            recording.seek(target)
+            recording.next()
+            seek_times.append(time.perf_counter() - t0)
+        recording.close()
+        seek_times.sort()
+        print(f"seek:   {sum(seek_times) / len(seek_times) * 1000:.1f} ms mean, "
+              f"{seek_times[-1] * 1000:.1f} ms max (bounded by the keyframe interval, not file length)")
+    finally:
+        for name in os.listdir(directory):
+            os.unlink(os.path.join(directory, name))
+        os.rmdir(directory)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark for incremental process search
+
+Types a query one character at a time against synthetic snapshots and
+reports the per-keystroke cost of ProcessSearchIndex next to the previous
+approach (lowercasing every name on every keystroke), plus the cost of a
+refresh that changed the set of processes while a search is active
+(patching the snapshot and the index from the delta, then searching again).
+
+Usage:
+  python3 benchmarks/bench_search.py [--procs 1000,5000,20000] [--query chrome]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from task_manager_gui import ProcessSearchIndex, ProcessSnapshot  # noqa: E402
+
+
+def make_snapshot(count, seed):
+    """Return a synthetic snapshot with `count` rows and realistic command lines."""
+    rng = random.Random(seed)
+    names = ['python3', 'bash', 'Chrome', 'systemd-journald', 'node', 'java', 'postgres']
+    users = ['root', 'www-data', 'postgres', 'builder']
+    snapshot = ProcessSnapshot()
+    for i in range(count):
+        name = names[i % len(names)]
+        cmdline = f"/usr/bin/{name} --worker={rng.randint(0, 99999)} /srv/app{rng.randint(0, 999)}/main"
+        snapshot.append(1000 + i, name, users[i % len(users)], 0.0, rng.randint(1, 2000) * 1048576, 0.0,
+                        0.0, 0.0, cmdline=cmdline, start=float(i))
+    return snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--procs', default='1000,5000,20000', help='comma-separated process counts')
+    parser.add_argument('--query', default='chrome', help='query typed one character at a time')
+    args = parser.parse_args()
+    prefixes = [args.query[:n] for n in range(1, len(args.query) + 1)]
+
+    print(f"{'procs':>7} {'first key ms':>13} {'next keys ms':>13} {'churn ms':>9} {'rescan ms':>10} {'matches':>8}")
+    for count in [int(p) for p in args.procs.split(',') if p]:
+        snapshot = make_snapshot(count, 0)
+        index = ProcessSearchIndex()
+        # Warm the per-lifetime text cache, as earlier refreshes would have
+        index.matching_pids(snapshot, 'x')
+
+        start = time.perf_counter()
+        matched = index.matching_pids(snapshot, prefixes[0])
+        first_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for prefix in prefixes[1:]:
+            matched = index.matching_pids(snapshot, prefix)
+        next_ms = (time.perf_counter() - start) * 1000 / max(1, len(prefixes) - 1)
+
+        # A refresh where one process exited and another started, applied as a delta
+        current = snapshot.take(range(1, count))
+        current.append(999, 'bash', 'root', 0.0, 1048576, 0.0, 0.0, 0.0, start=1e9)
+        delta = current.diff(snapshot, 2, 1)
+        start = time.perf_counter()
+        snapshot.apply_delta(delta)
+        index.apply_delta(delta, snapshot)
+        index.matching_pids(snapshot, args.query)
+        churn_ms = (time.perf_counter() - start) * 1000
+
+        # Previous behaviour: lowercase and test every name on every keystroke
+        start = time.perf_counter()
+        for prefix in prefixes:
+            [i for i in range(count) if prefix in snapshot.names[i].lower()]
+        rescan_ms = (time.perf_counter() - start) * 1000 / len(prefixes)
+        print(f"{count:>7} {first_ms:>13.2f} {next_ms:>13.2f} {churn_ms:>9.2f} {rescan_ms:>10.2f} {len(matched):>8}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark sharded /proc collection across 1..N worker threads
+
+Runs the serial ProcCollector and ShardedProcCollector with increasing worker
+counts over the same process tree and reports time per cycle and speedup.
+By default the tree is a synthetic procfs (see bench_collectors.py); pass
+--proc-root /proc to measure the live host instead. Synthetic files are plain
+tmpfs reads, so they understate the kernel-side cost that sharding overlaps
+on a real /proc.
+
+Usage:
+  python3 benchmarks/bench_sharding.py [--procs 30000] [--workers 1,2,4,8] [--cycles 5]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import psutil  # noqa: E402
+from task_manager_gui import ProcCollector, SamplingPlan, ShardedProcCollector  # noqa: E402
+from bench_collectors import build_fake_procfs, time_cycles  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--procs', type=int, default=30000, help='fake process count (ignored with --proc-root)')
+    parser.add_argument('--workers', default=f"1,2,4,{max(8, os.cpu_count() or 1)}",
+                        help='comma-separated worker counts')
+    parser.add_argument('--cycles', type=int, default=5, help='collection cycles per measurement')
+    parser.add_argument('--proc-root', help='measure an existing proc tree (e.g. /proc) instead of a fake one')
+    args = parser.parse_args()
+
+    total_memory = psutil.virtual_memory().total
+    root = args.proc_root
+    if root is None:
+        root = tempfile.mkdtemp(prefix='fake_proc_')
+        build_fake_procfs(root, args.procs)
+    try:
+        print(f"{os.cpu_count()} CPUs, proc root {root}")
+        print(f"{'workers':>8} {'wall ms/cycle':>14} {'cpu ms/cycle':>13} {'speedup':>8} {'rows':>7}")
+        # Untimed pass so the first measurement doesn't pay for a cold dentry cache
+        time_cycles(ProcCollector(total_memory, proc_root=root), 1)
+        baseline, _, rows = time_cycles(ProcCollector(total_memory, proc_root=root), args.cycles)
+        print(f"{'serial':>8} {baseline * 1000:>14.1f} {'':>13} {1.0:>8.2f} {rows:>7}")
+        for workers in [int(w) for w in args.workers.split(',') if w]:
+            collector = ShardedProcCollector(total_memory, proc_root=root, workers=workers)
+            try:
+                wall, cpu, rows = time_cycles(collector, args.cycles)
+            finally:
+                collector.close()
+            print(f"{workers:>8} {wall * 1000:>14.1f} {cpu * 1000:>13.1f} {baseline / wall:>8.2f} {rows:>7}")
+    finally:
+        if args.proc_root is None:
+            shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
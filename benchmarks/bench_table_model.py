@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Headless benchmark for the process table model/view
+
+Times how long a full snapshot refresh (model swap + repaint of the visible
+rows) and a scroll frame take as the row count grows. Runs on Qt's offscreen
+platform, so no display is needed.
+
+Usage:
+  python3 benchmarks/bench_table_model.py [--rows 1000,5000,20000,50000] [--frames 60]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+from task_manager_gui import ProcessSnapshot, ProcessTableModel, ProcessTableView  # noqa: E402
+
+
+def make_snapshot(count, seed):
+    """Return a synthetic snapshot with `count` rows, ordered by RSS."""
+    rng = random.Random(seed)
+    names = ['python3', 'bash', 'chrome', 'systemd-journald', 'node', 'java', 'postgres']
+    users = ['root', 'www-data', 'postgres', 'builder']
+    snapshot = ProcessSnapshot()
+    for i in range(count):
+        rss = rng.randint(1, 2000) * 1048576
+        snapshot.append(1000 + i, names[i % len(names)], users[i % len(users)],
+                        round(rng.random() * 100, 1), rss, round(rss / 17179869184 * 100, 1),
+                        round(rng.random() * 50, 2), round(rng.random() * 20, 2))
+    return snapshot.sorted_by('rss', reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', default='1000,5000,20000,50000', help='comma-separated row counts')
+    parser.add_argument('--frames', type=int, default=60, help='refreshes / scroll frames per measurement')
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    model = ProcessTableModel()
+    view = ProcessTableView()
+    view.setModel(model)
+    view.resize(1400, 900)
+    view.show()
+    app.processEvents()
+
+    print(f"{'rows':>7} {'refresh ms':>11} {'scroll ms/frame':>16} {'scroll fps':>11}")
+    for count in [int(r) for r in args.rows.split(',') if r]:
+        snapshots = [make_snapshot(count, seed) for seed in range(2)]
+        model.set_snapshot(snapshots[0])
+        app.processEvents()
+
+        # Refresh: swap in a new snapshot and repaint the visible rows
+        start = time.perf_counter()
+        for i in range(args.frames):
+            model.set_snapshot(snapshots[i % 2])
+            view.viewport().repaint()
+        refresh_ms = (time.perf_counter() - start) * 1000 / args.frames
+
+        # Scroll: step through the table a page at a time, repainting every frame
+        bar = view.verticalScrollBar()
+        step = max(1, bar.maximum() // max(1, args.frames))
+        start = time.perf_counter()
+        for i in range(args.frames):
+            bar.setValue(i * step)
+            view.viewport().repaint()
+        scroll_ms = (time.perf_counter() - start) * 1000 / args.frames
+        print(f"{count:>7} {refresh_ms:>11.2f} {scroll_ms:>16.2f} {1000 / max(scroll_ms, 1e-6):>11.0f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
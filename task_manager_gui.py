@@ -7,6 +7,8 @@ PyQt5-based GUI showing system memory and process information
 import sys
 import os
 import json
+import argparse
+import signal
 import psutil
 import threading
 import subprocess
@@ -15,6 +17,23 @@ import ctypes
 import webbrowser
 import urllib.parse
 import time
+import re
+import mmap
+import struct
+import tempfile
+import zlib
+import bisect
+import heapq
+import select
+import socket
+import errno
+from array import array
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import pwd
+except ImportError:
+    pwd = None
 try:
     import pygame
     GAMEPAD_AVAILABLE = True
@@ -22,10 +41,13 @@ except ImportError:
     GAMEPAD_AVAILABLE = False
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QTableWidget, QTableWidgetItem, QLabel, QProgressBar, QHeaderView, QMenu, QMessageBox, QPushButton,
-    QDialog, QRadioButton, QButtonGroup, QCheckBox, QSizePolicy, QLineEdit, QTextEdit
+    QTableView, QAbstractItemView, QLabel, QProgressBar, QHeaderView, QMenu, QMessageBox, QPushButton,
+    QDialog, QRadioButton, QButtonGroup, QCheckBox, QSizePolicy, QLineEdit, QTextEdit, QComboBox
+)
+from PyQt5.QtCore import (
+    QTimer, Qt, pyqtSignal, QObject, QPoint, QRect, QEvent, QUrl, QThread, QSocketNotifier,
+    QAbstractTableModel, QModelIndex, QItemSelection, QItemSelectionModel
 )
-from PyQt5.QtCore import QTimer, Qt, pyqtSignal, QObject, QPoint, QRect, QEvent, QUrl, QThread
 from PyQt5.QtGui import QFont, QColor, QBrush, QKeyEvent
 try:
     from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEngineSettings
@@ -44,6 +66,28 @@ else:
 
 # (No hard cap on processes; iterate all available processes)
 
+# Where `--daemon` publishes snapshots and GUI instances look for them
+_SHM_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+DEFAULT_RING_PATH = os.path.join(_SHM_DIR, 'task_manager_snapshots')
+
+# Account names treated as system users by the "hide system processes" filter (lowercase)
+SYSTEM_USERS = frozenset({
+    'root',
+    'system',
+    'local system',
+    'nt authority\\system',
+    'nt authority\\localservice',
+    'nt authority\\networkservice',
+    'localservice',
+    'networkservice'
+})
+
+# Bits of the per-process `flags` column, set once per process lifetime by the collector.
+# Rows without FLAG_CLASSIFIED (e.g. from older recordings) have not been classified.
+FLAG_CLASSIFIED = 1
+FLAG_SYSTEM = 2         # PID 0-2 or owned by one of SYSTEM_USERS
+FLAG_INACCESSIBLE = 4   # executable path missing or its directory unreadable
+
 
 class ClickableLabel(QLabel):
     """Label that emits a signal when clicked"""
@@ -288,133 +332,3572 @@ def save_hide_inaccessible_processes(hide_inaccessible: bool):
         print(f"Error saving hide_inaccessible_processes: {e}")
 
 
-class DataFetcher(QThread):
-    """Persistent background thread that polls system data at a configurable interval.
+def load_tree_view():
+    """Load the tree view setting from config file"""
+    try:
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+                return config.get('tree_view', False)
+    except Exception as e:
+        print(f"Error loading tree_view: {e}")
+    return False
+
+
+def save_tree_view(tree_view: bool):
+    """Save tree view setting to config file"""
+    try:
+        config = {}
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+        config['tree_view'] = tree_view
+        with open(CONFIG_FILE, 'w') as f:
+            json.dump(config, f, indent=2)
+    except Exception as e:
+        print(f"Error saving tree_view: {e}")
+
+
+def load_group_by():
+    """Load the group-by mode ('none', 'exe', 'cgroup' or 'user') from config file"""
+    try:
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+                return config.get('group_by', 'none')
+    except Exception as e:
+        print(f"Error loading group_by: {e}")
+    return 'none'
+
+
+def save_group_by(group_by: str):
+    """Save group-by mode to config file"""
+    try:
+        config = {}
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+        config['group_by'] = group_by
+        with open(CONFIG_FILE, 'w') as f:
+            json.dump(config, f, indent=2)
+    except Exception as e:
+        print(f"Error saving group_by: {e}")
+
+
+def load_sort_order():
+    """Load the process table sort as (snapshot column, descending) from config file"""
+    try:
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+                return config.get('sort_column', 'rss'), bool(config.get('sort_descending', True))
+    except Exception as e:
+        print(f"Error loading sort order: {e}")
+    return 'rss', True
+
+
+def save_sort_order(column: str, descending: bool):
+    """Save process table sort to config file"""
+    try:
+        config = {}
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+        config['sort_column'] = column
+        config['sort_descending'] = descending
+        with open(CONFIG_FILE, 'w') as f:
+            json.dump(config, f, indent=2)
+    except Exception as e:
+        print(f"Error saving sort order: {e}")
+
+
+def load_kill_grace_seconds():
+    """Load how long End Task waits for processes to exit before force-killing them"""
+    try:
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+                return max(0.0, float(config.get('kill_grace_seconds', 3.0)))
+    except Exception as e:
+        print(f"Error loading kill_grace_seconds: {e}")
+    return 3.0
+
+
+def load_memory_details():
+    """Load whether the PSS/USS/swap columns are shown from config file"""
+    try:
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+                return config.get('memory_details', False)
+    except Exception as e:
+        print(f"Error loading memory_details: {e}")
+    return False
+
+
+def save_memory_details(memory_details: bool):
+    """Save memory details setting to config file"""
+    try:
+        config = {}
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+        config['memory_details'] = memory_details
+        with open(CONFIG_FILE, 'w') as f:
+            json.dump(config, f, indent=2)
+    except Exception as e:
+        print(f"Error saving memory_details: {e}")
+
+
+def load_smaps_budget_ms():
+    """Load the per-refresh time budget for PSS/USS/swap reads, in milliseconds"""
+    try:
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+                return max(1, int(config.get('smaps_budget_ms', 20)))
+    except Exception as e:
+        print(f"Error loading smaps_budget_ms: {e}")
+    return 20
+
+
+def load_collector_backend():
+    """Load the preferred process collector backend ('auto', 'proc' or 'psutil')"""
+    try:
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+                return config.get('collector_backend', 'auto')
+    except Exception as e:
+        print(f"Error loading collector_backend: {e}")
+    return 'auto'
+
+
+def load_history_max_mb():
+    """Load the memory cap for per-process history, in MB"""
+    try:
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+                return max(1, int(config.get('history_max_mb', 32)))
+    except Exception as e:
+        print(f"Error loading history_max_mb: {e}")
+    return 32
+
+
+def load_collector_workers():
+    """Load the number of parallel /proc collection shards (1 = serial)"""
+    try:
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+                return max(1, int(config.get('collector_workers', 1)))
+    except Exception as e:
+        print(f"Error loading collector_workers: {e}")
+    return 1
+
+
+def load_process_events():
+    """Load whether to follow process starts/exits through the kernel proc connector when permitted"""
+    try:
+        if os.path.exists(CONFIG_FILE):
+            with open(CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+                return bool(config.get('process_events', True))
+    except Exception as e:
+        print(f"Error loading process_events: {e}")
+    return True
+
+
+class ProcessSnapshot:
+    """Columnar process table produced by a collector each cycle.
+
+    Numeric fields are stored in parallel array.array columns and the name/user
+    strings are interned, so a cycle allocates a handful of flat arrays instead
+    of one dict per process. Row i of every column describes the same process.
+    Emitted snapshots are treated as immutable; filtering and sorting produce
+    new snapshots via take(), and only receiver-owned copies are patched with
+    apply_delta().
+    """
+    # (column, array typecode); None marks a list of interned strings
+    COLUMNS = (
+        ('pids', 'q'),
+        ('ppids', 'q'),        # parent PID, 0 if none
+        ('names', None),
+        ('users', None),
+        ('cpu', 'd'),          # percent
+        ('rss', 'Q'),          # bytes
+        ('mem_percent', 'd'),  # percent of total RAM
+        ('pss', 'q'),          # proportional set size in bytes, -1 if not sampled
+        ('uss', 'q'),          # unique (private) set size in bytes, -1 if not sampled
+        ('swap', 'q'),         # swapped-out bytes, -1 if not sampled
+        ('io_read', 'd'),      # disk read rate, MB/s
+        ('io_write', 'd'),     # disk write rate, MB/s
+        ('threads', 'l'),
+        ('fds', 'l'),          # open file descriptors, -1 if not sampled
+        ('cmdlines', None),    # '' if not sampled
+        ('starts', 'd'),       # create time (epoch seconds); (pid, start) identifies a process
+        ('start_ticks', 'Q'),  # start time in clock ticks since boot from /proc/[pid]/stat, 0 if unknown
+        ('cpu_time', 'd'),     # cumulative user+system CPU seconds
+        ('flags', 'B'),        # FLAG_* classification bits
+    )
+    __slots__ = tuple(column for column, _ in COLUMNS) + ('_index',)
+
+    def __init__(self):
+        for column, typecode in self.COLUMNS:
+            setattr(self, column, [] if typecode is None else array(typecode))
+        self._index = None
+
+    def __len__(self):
+        return len(self.pids)
+
+    def append(self, pid, name, user, cpu, rss, mem_percent, io_read, io_write, threads=0, fds=-1, cmdline='',
+               start=0.0, cpu_time=0.0, ppid=0, pss=-1, uss=-1, swap=-1, flags=0, start_ticks=0):
+        """Append one process row (name/user strings are interned)."""
+        self.pids.append(pid)
+        self.ppids.append(ppid)
+        self.names.append(sys.intern(name))
+        self.users.append(sys.intern(user))
+        self.cpu.append(cpu)
+        self.rss.append(rss)
+        self.mem_percent.append(mem_percent)
+        self.pss.append(pss)
+        self.uss.append(uss)
+        self.swap.append(swap)
+        self.io_read.append(io_read)
+        self.io_write.append(io_write)
+        self.threads.append(threads)
+        self.fds.append(fds)
+        self.cmdlines.append(cmdline)
+        self.starts.append(start)
+        self.start_ticks.append(start_ticks)
+        self.cpu_time.append(cpu_time)
+        self.flags.append(flags)
+        if self._index is not None:
+            self._index[pid] = len(self.pids) - 1
+
+    def memory_mb(self, i):
+        return self.rss[i] / 1048576
+
+    def index_of(self, pid):
+        """Return the row holding pid, or -1. The pid index is built lazily once."""
+        if self._index is None:
+            self._index = {p: i for i, p in enumerate(self.pids)}
+        return self._index.get(pid, -1)
+
+    def rows_of(self, pids):
+        """Return the rows holding the given PIDs, in the same order, skipping PIDs not present."""
+        self.index_of(-1)
+        rows = list(map(self._index.get, pids))
+        if None in rows:
+            rows = [row for row in rows if row is not None]
+        return rows
+
+    def extend(self, other):
+        """Append every row of another snapshot."""
+        for column, _ in self.COLUMNS:
+            getattr(self, column).extend(getattr(other, column))
+        self._index = None
+
+    def take(self, rows):
+        """Return a new snapshot containing only the given row indices, in that order."""
+        out = ProcessSnapshot()
+        for column, typecode in self.COLUMNS:
+            src = getattr(self, column)
+            values = [src[i] for i in rows]
+            setattr(out, column, values if typecode is None else array(typecode, values))
+        return out
+
+    def copy(self):
+        """Return an independent copy (column buffers are copied at C speed)."""
+        out = ProcessSnapshot()
+        for column, typecode in self.COLUMNS:
+            src = getattr(self, column)
+            setattr(out, column, list(src) if typecode is None else array(typecode, src))
+        return out
+
+    def sorted_by(self, column, reverse=False):
+        """Return a copy ordered by the named column (e.g. 'rss', 'cpu', 'pids')."""
+        values = getattr(self, column)
+        order = sorted(range(len(values)), key=values.__getitem__, reverse=reverse)
+        return self.take(order)
+
+    def set_fields(self, i, changes):
+        """Overwrite columns of row i from a {column: value} mapping."""
+        for column, value in changes.items():
+            getattr(self, column)[i] = value
+
+    def diff(self, previous, seq, base_seq):
+        """Return a ProcessDelta that turns `previous` into this snapshot."""
+        delta = ProcessDelta(seq, base_seq)
+        columns = [(column, getattr(self, column), getattr(previous, column))
+                   for column, _ in self.COLUMNS[1:]]
+        index_of = previous.index_of
+        added = []
+        changed = delta.changed
+        for i, pid in enumerate(self.pids):
+            j = index_of(pid)
+            if j < 0:
+                added.append(i)
+                continue
+            changes = None
+            for column, cur, old in columns:
+                value = cur[i]
+                if value != old[j]:
+                    if changes is None:
+                        changes = changed[pid] = {}
+                    changes[column] = value
+        if added:
+            delta.added = self.take(added)
+        current = self.index_of
+        delta.removed = [pid for pid in previous.pids if current(pid) < 0]
+        return delta
+
+    def apply_delta(self, delta):
+        """Patch this (receiver-owned) snapshot in place; cost scales with the delta size."""
+        index = self._index
+        if index is None:
+            self.index_of(-1)
+            index = self._index
+        columns = [getattr(self, column) for column, _ in self.COLUMNS]
+        for pid in delta.removed:
+            i = index.pop(pid, -1)
+            if i < 0:
+                continue
+            last = len(self.pids) - 1
+            if i != last:
+                # Swap-remove: move the last row into the hole so no column shifts
+                for col in columns:
+                    col[i] = col[last]
+                index[self.pids[i]] = i
+            for col in columns:
+                col.pop()
+        for pid, changes in delta.changed.items():
+            i = index.get(pid, -1)
+            if i >= 0:
+                self.set_fields(i, changes)
+        added = delta.added
+        if added is not None:
+            for j in range(len(added)):
+                pid = added.pids[j]
+                if pid in index:
+                    continue
+                for col, src in zip(columns, (getattr(added, column) for column, _ in self.COLUMNS)):
+                    col.append(src[j])
+                index[pid] = len(self.pids) - 1
+
+
+class ProcessDelta:
+    """Changes between two consecutive snapshots, as emitted by DataFetcher.
+
+    A keyframe carries a full `snapshot` and resets the receiver's state. Other
+    deltas list `removed` PIDs, `added` rows (as a ProcessSnapshot) and
+    `changed` {pid: {column: value}} for rows present in both snapshots.
+    `base_seq` names the snapshot the delta applies to, so a receiver that
+    missed one can ask for a new keyframe instead of drifting.
+    `sample_ages` maps each sampling tier to the seconds since it last ran.
+    `cgroup_totals` holds CgroupStats.sample() results when cgroup totals were read.
+    """
+    __slots__ = ('seq', 'base_seq', 'snapshot', 'added', 'removed', 'changed', 'sample_ages',
+                 'cgroup_totals')
+
+    def __init__(self, seq, base_seq=None, snapshot=None):
+        self.seq = seq
+        self.base_seq = base_seq
+        self.snapshot = snapshot
+        self.added = None
+        self.removed = []
+        self.changed = {}
+        self.sample_ages = {}
+        self.cgroup_totals = None
+
+    @property
+    def keyframe(self):
+        return self.snapshot is not None
+
+    def has_membership_changes(self):
+        """Return True if rows were added or removed."""
+        return bool(self.removed) or (self.added is not None and len(self.added) > 0)
+
+
+class SamplingTier:
+    """Cadence and staleness of one sampled metric.
+
+    A tier is due every `every` ticks. Priority-only tiers are sampled just for
+    the PIDs the GUI is showing or has selected. `last_sampled` is the
+    monotonic time of the last pass that covered at least one process and is
+    what the staleness markers report.
+    """
+    __slots__ = ('name', 'every', 'priority_only', 'last_tick', 'last_sampled')
+
+    def __init__(self, name, every=1, priority_only=False):
+        self.name = name
+        self.every = max(1, int(every))
+        self.priority_only = priority_only
+        self.last_tick = None
+        self.last_sampled = None
+
+    def is_due(self, tick):
+        return self.last_tick is None or tick - self.last_tick >= self.every
+
+
+class SamplingPlan:
+    """Per-metric sampling cadences shared by DataFetcher and the collectors.
+
+    Cheap fields (memory, CPU time, identity) are read every tick. Everything else has
+    its own tier, so the per-tick cost stays bounded on big hosts while the
+    rows the user is looking at are kept as fresh as possible.
+    """
+    # (metric, every N ticks, visible/selected rows only); CPU time is read every tick and
+    # disk I/O counters whenever a process ran (see _ProcessState.update_io)
+    DEFAULT_TIERS = (
+        ('threads', 4, False),
+        ('fds', 2, True),
+        ('cmdline', 4, True),
+    )
+    # The --daemon collector has no visible rows to favour and every attached viewer
+    # needs open-file counts and command lines, so nothing there is priority-only
+    DAEMON_TIERS = (
+        ('threads', 4, False),
+        ('fds', 4, False),
+        ('cmdline', 4, False),
+    )
+
+    def __init__(self, tiers=DEFAULT_TIERS):
+        self.tiers = {name: SamplingTier(name, every, priority_only) for name, every, priority_only in tiers}
+        self.tick = -1
+        self.due = {}
+        # Tiers that covered at least one process this tick
+        self.covered = set()
+        self.priority_pids = frozenset()
+        # Per-tick time budget in seconds for PSS/USS/swap (smaps_rollup) reads; 0 disables them
+        self.smaps_budget = 0.0
+        # Seconds the last full round-robin pass over every process took (None until one completed)
+        self.smaps_sweep = None
+
+    def set_priority_pids(self, pids):
+        """Set the PIDs (visible or selected rows) that priority tiers should cover."""
+        self.priority_pids = frozenset(pids)
+
+    def begin_tick(self):
+        """Advance one tick and work out which tiers are due."""
+        self.tick += 1
+        self.due = {name: tier.is_due(self.tick) for name, tier in self.tiers.items()}
+        self.covered = set()
+        return self.due
+
+    def end_tick(self):
+        """Advance the cadence of every due tier; stamp the ones that covered a process.
+
+        A priority-only tier with no priority PIDs left was due but read
+        nothing, so its age keeps growing rather than reporting empty data
+        as fresh.
+        """
+        now = time.monotonic()
+        for name, tier in self.tiers.items():
+            if self.due.get(name):
+                tier.last_tick = self.tick
+                if name in self.covered:
+                    tier.last_sampled = now
+
+    def wants(self, name, pid):
+        """Return True if metric `name` should be sampled for pid this tick."""
+        if not self.due.get(name):
+            return False
+        if self.tiers[name].priority_only and pid not in self.priority_pids:
+            return False
+        self.covered.add(name)
+        return True
+
+    def ages(self):
+        """Return {metric: seconds since last sample} (None if never sampled)."""
+        now = time.monotonic()
+        ages = {name: (None if tier.last_sampled is None else now - tier.last_sampled)
+                for name, tier in self.tiers.items()}
+        if self.smaps_budget > 0:
+            # Round-robin sampling: the oldest value is at most one full pass old
+            ages['smaps'] = self.smaps_sweep
+        return ages
+
+
+class BudgetedSampler:
+    """Round-robin driver for per-process reads too expensive to do for every process each tick.
+
+    Each tick the priority PIDs (visible and selected rows) are read first,
+    then the rest in PID order, resuming after the last PID read the
+    previous tick, until the time budget is spent. Over successive ticks
+    every process is covered; `sweep` is how long the last full pass took.
+    """
+
+    def __init__(self):
+        self._cursor = -1
+        self._sweep_started = time.monotonic()
+        self.sweep = None
+
+    def run(self, pids, priority, budget, read):
+        """Call read(pid) on `pids` within `budget` seconds; return how many were read."""
+        deadline = time.perf_counter() + budget
+        count = 0
+        for pid in priority:
+            if time.perf_counter() >= deadline:
+                return count
+            read(pid)
+            count += 1
+        ordered = sorted(pids)
+        start = bisect.bisect_right(ordered, self._cursor)
+        for k in range(len(ordered)):
+            if k == len(ordered) - start:
+                # Wrapped around: every process has been read once since the last wrap
+                now = time.monotonic()
+                self.sweep = now - self._sweep_started
+                self._sweep_started = now
+            pid = ordered[(start + k) % len(ordered)]
+            if pid in priority:
+                continue
+            if time.perf_counter() >= deadline:
+                break
+            read(pid)
+            count += 1
+            self._cursor = pid
+        return count
+
+
+class UserNameCache:
+    """UID -> user name lookups with a TTL, shared by the collectors and filters.
+
+    pwd/NSS lookups can be slow (or go to LDAP/SSSD), so each UID is resolved
+    at most once per `ttl` seconds. Unknown UIDs are cached as their numeric
+    string for the shorter `negative_ttl`, so a flaky directory service is
+    retried without being hammered. Also memoizes whether a name belongs to
+    SYSTEM_USERS.
+    """
+
+    def __init__(self, ttl=600.0, negative_ttl=60.0):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # uid -> (name, expiry)
+        self._names = {}
+        # name -> is system user
+        self._system = {}
+
+    def name(self, uid):
+        """Return the user name for uid (its numeric string if it cannot be resolved)."""
+        now = time.monotonic()
+        entry = self._names.get(uid)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+        ttl = self.ttl
+        try:
+            name = pwd.getpwuid(uid).pw_name if pwd else str(uid)
+        except KeyError:
+            name = str(uid)
+            ttl = self.negative_ttl
+        name = sys.intern(name)
+        self._names[uid] = (name, now + ttl)
+        return name
+
+    def is_system_user(self, name):
+        """Return True if name (case-insensitively) is one of SYSTEM_USERS."""
+        result = self._system.get(name)
+        if result is None:
+            result = self._system[name] = (name or '').lower() in SYSTEM_USERS
+        return result
+
+
+USER_NAMES = UserNameCache()
+
+
+def read_cgroup(pid, proc_root='/proc'):
+    """Return the cgroup of a process: its cgroup v2 path, else the first v1 hierarchy's ('' if unknown)."""
+    try:
+        with open(f"{proc_root}/{pid}/cgroup", 'rb') as f:
+            data = f.read().decode('utf-8', 'replace')
+    except OSError:
+        return ''
+    first = ''
+    for line in data.splitlines():
+        # "hierarchy-id:controllers:path"; the v2 hierarchy is "0::path"
+        hierarchy, _, rest = line.partition(':')
+        controllers, _, path = rest.partition(':')
+        if hierarchy == '0' and not controllers:
+            return path
+        if not first:
+            first = path
+    return first
+
+
+class CgroupStats:
+    """Resource totals per cgroup v2 group, read from its interface files in /sys/fs/cgroup.
+
+    The kernel already keeps memory.current, cpu.stat and io.stat per cgroup,
+    so a handful of small reads per group replaces summing thousands of
+    processes, and the totals include page cache and kernel memory charged to
+    the group. CPU% and I/O rates come from the counter deltas between two
+    sample() calls. Files a group does not have (controller not enabled, or a
+    v1-only host) are reported as None, so callers can fall back to the sums
+    of the member processes.
+    """
+
+    def __init__(self, root=None, cpu_count=None):
+        self.root = root if root is not None else self.find_root()
+        self.cpu_count = cpu_count or psutil.cpu_count() or 1
+        self._previous = {}
+
+    @staticmethod
+    def find_root():
+        """Return the cgroup v2 mount point (unified or hybrid layout), or None."""
+        for root in ('/sys/fs/cgroup', '/sys/fs/cgroup/unified'):
+            if os.path.exists(os.path.join(root, 'cgroup.controllers')):
+                return root
+        return None
+
+    def _read(self, path):
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def sample(self, paths, now=None):
+        """Return {path: (memory bytes, cpu %, read MB/s, write MB/s)} for the given cgroup paths.
+
+        CPU% and the rates are None until a path has been sampled twice.
+        """
+        if self.root is None:
+            return {}
+        now = time.monotonic() if now is None else now
+        previous = self._previous
+        current = {}
+        totals = {}
+        scale = 100.0 / self.cpu_count
+        for path in paths:
+            base = self.root + path.rstrip('/')
+            data = self._read(base + '/memory.current')
+            memory = int(data) if data else None
+            usage = None
+            data = self._read(base + '/cpu.stat')
+            if data:
+                for line in data.splitlines():
+                    if line.startswith(b'usage_usec '):
+                        usage = int(line[11:]) / 1e6
+                        break
+            read_bytes = write_bytes = None
+            data = self._read(base + '/io.stat')
+            if data is not None:
+                # One line per device: "8:0 rbytes=N wbytes=N rios=N ..."
+                read_bytes = write_bytes = 0
+                for line in data.split():
+                    if line.startswith(b'rbytes='):
+                        read_bytes += int(line[7:])
+                    elif line.startswith(b'wbytes='):
+                        write_bytes += int(line[7:])
+            current[path] = (now, usage, read_bytes, write_bytes)
+            cpu = io_read = io_write = None
+            before = previous.get(path)
+            if before is not None and now > before[0]:
+                elapsed = now - before[0]
+                if usage is not None and before[1] is not None:
+                    cpu = round(min(100.0, max(0.0, usage - before[1]) * scale / elapsed), 1)
+                if read_bytes is not None and before[2] is not None:
+                    io_read = max(0, read_bytes - before[2]) / elapsed / 1048576
+                    io_write = max(0, write_bytes - before[3]) / elapsed / 1048576
+            totals[path] = (memory, cpu, io_read, io_write)
+        # Rebuilt every call, so groups that disappeared drop out
+        self._previous = current
+        return totals
+
+
+class ProcessMetadata:
+    """Attributes of one process that do not change over its lifetime.
+
+    Name, user and exe are resolved once when the process is first seen; the
+    command line is filled in the first time its sampling tier covers the
+    process, the inaccessible-exe check the first time a filter asks, and
+    the cgroup by DataFetcher while grouping by cgroup. `comm` is the raw kernel name it was resolved
+    from (None when unknown), so a collector can spot an exec.
+    """
+    __slots__ = ('name', 'user', 'exe', 'comm', 'cmdline', 'inaccessible', 'cgroup', 'flags')
+
+    def __init__(self, name, user, exe, comm=None):
+        self.name = name
+        self.user = user
+        self.exe = exe
+        self.comm = comm
+        self.cmdline = None
+        self.inaccessible = None
+        self.cgroup = None
+        self.flags = 0
+
+    def classify(self, pid):
+        """Compute the FLAG_* bits for this process (done once, when it is first seen)."""
+        flags = FLAG_CLASSIFIED
+        if pid in (0, 1, 2) or USER_NAMES.is_system_user(self.user):
+            flags |= FLAG_SYSTEM
+        if self.is_inaccessible():
+            flags |= FLAG_INACCESSIBLE
+        self.flags = flags
+        return flags
+
+    def cgroup_path(self, pid):
+        """Return the process's cgroup path, read on first use ('' if unknown)."""
+        if self.cgroup is None:
+            self.cgroup = read_cgroup(pid)
+        return self.cgroup
+
+    def is_inaccessible(self):
+        """Return True if the executable path is missing or its directory is unreadable."""
+        if self.inaccessible is None:
+            exe = self.exe
+            try:
+                self.inaccessible = (not exe or not os.path.exists(exe)
+                                     or not os.access(os.path.dirname(exe), os.R_OK))
+            except OSError:
+                self.inaccessible = True
+        return self.inaccessible
+
+
+class ProcessMetadataCache:
+    """ProcessMetadata keyed by (pid, start time).
+
+    The start time makes the key unique for the lifetime of a process, so a
+    reused PID gets a fresh entry instead of the previous owner's data.
+    Entries are only added and evicted by the collector (fetcher thread);
+    the GUI thread just reads them.
+    """
+
+    def __init__(self):
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, pid, start):
+        return self._entries.get((pid, start))
+
+    def discard(self, pid, start):
+        """Forget a process's entry so it is resolved again (after it exec'd another program)."""
+        self._entries.pop((pid, start), None)
+
+    def add(self, pid, start, name, user, exe, comm=None):
+        meta = self._entries[(pid, start)] = ProcessMetadata(name, user, exe, comm)
+        meta.classify(pid)
+        return meta
+
+    def prune(self, live_keys):
+        """Evict entries of processes that exited (or whose PID was reused)."""
+        entries = self._entries
+        if len(entries) != len(live_keys) or not live_keys.issuperset(entries):
+            for key in [key for key in entries if key not in live_keys]:
+                del entries[key]
+
+
+class CpuAccountant:
+    """Per-process CPU% from cumulative CPU time, for every process in one pass per tick.
+
+    The previous CPU time is kept per (pid, start time), so a reused PID never
+    inherits its predecessor's counter. A process seen for the first time is
+    measured against its own start time instead of reading 0 until the next
+    sample. Percentages are of the whole machine (all cores = 100%).
+    """
+
+    def __init__(self, cpu_count=None):
+        self.cpu_count = cpu_count or psutil.cpu_count() or 1
+        self._previous = {}
+        self._last_time = None
+
+    def update(self, snapshot, now=None, advance=True):
+        """Fill snapshot.cpu from snapshot.cpu_time.
+
+        With advance=False (a few rows collected between ticks) the counters
+        the next tick measures against are left alone.
+        """
+        now = time.time() if now is None else now
+        previous = self._previous
+        current = {}
+        scale = 100.0 / self.cpu_count
+        elapsed = now - self._last_time if self._last_time is not None else 0.0
+        cpu = snapshot.cpu
+        cpu_time = snapshot.cpu_time
+        for i, key in enumerate(zip(snapshot.pids, snapshot.starts)):
+            used = current[key] = cpu_time[i]
+            before = previous.get(key)
+            if before is None:
+                span = now - key[1]
+            else:
+                span = elapsed
+                used -= before
+            cpu[i] = round(min(100.0, used * scale / span), 1) if span > 0 and used > 0 else 0.0
+        # Rebuilt every tick, so exited processes drop out without a separate sweep
+        if advance:
+            self._previous = current
+            self._last_time = now
+
+
+class _ProcessState:
+    """Per-PID values carried forward between ticks when a tier is not due.
+
+    Also holds the last disk I/O counters, so read/write rates can be derived
+    from deltas: the collector reads the counters only when the process ran
+    since the previous tick (its CPU time moved or it is runnable/in disk
+    wait), and a process that did not run is known to have done no I/O.
+    """
+    __slots__ = ('start', 'ticks', 'run_mark', 'threads', 'fds', 'read_bytes', 'write_bytes', 'io_time',
+                 'io_read', 'io_write', 'pss', 'uss', 'swap')
+
+    def __init__(self, start, ticks=0):
+        self.start = start
+        self.ticks = ticks
+        self.run_mark = None
+        self.threads = 0
+        self.fds = -1
+        self.read_bytes = 0
+        self.write_bytes = 0
+        self.io_time = None
+        self.io_read = 0.0
+        self.io_write = 0.0
+        self.pss = self.uss = self.swap = -1
+
+    def ran(self, run_mark):
+        """Record this tick's CPU-time mark; True if it changed (or is the first one)."""
+        changed = run_mark != self.run_mark
+        self.run_mark = run_mark
+        return changed
+
+    def update_io(self, read_bytes, write_bytes, now):
+        """Set MB/s rates from cumulative counters read at `now`.
+
+        The first reading is averaged over the process lifetime, like CPU%.
+        """
+        if self.io_time is None:
+            span = now - self.start
+            read, written = read_bytes, write_bytes
+        else:
+            span = now - self.io_time
+            read, written = read_bytes - self.read_bytes, write_bytes - self.write_bytes
+        if span > 0:
+            self.io_read = round(max(0, read) / span / 1048576, 2)
+            self.io_write = round(max(0, written) / span / 1048576, 2)
+        else:
+            self.io_read = self.io_write = 0.0
+        self.read_bytes = read_bytes
+        self.write_bytes = write_bytes
+        self.io_time = now
+
+    def idle_io(self, now):
+        """Mark a tick without I/O: the rates drop to zero and the counters stay valid."""
+        self.io_read = self.io_write = 0.0
+        if self.io_time is not None:
+            self.io_time = now
+
+
+class PsutilCollector:
+    """Portable collector backend built on psutil's per-process API.
+
+    Used on platforms without a Linux-style /proc and as the fallback when the
+    /proc backend is unavailable.
+    """
+    name = 'psutil'
+
+    # Process states in which a process may be doing I/O even if its CPU time did not move
+    _ACTIVE_STATUSES = frozenset((psutil.STATUS_RUNNING, psutil.STATUS_DISK_SLEEP))
+
+    def __init__(self, total_memory):
+        self.total_memory = total_memory
+        # pid -> _ProcessState
+        self.process_cache = {}
+        self.metadata = ProcessMetadataCache()
+        self.cpu_accountant = CpuAccountant()
+        self.smaps_sampler = BudgetedSampler()
+
+    def _resolve_metadata(self, proc, start):
+        """Look up name, user and exe for a process seen for the first time."""
+        if pwd is not None:
+            # Resolve the real UID through the shared cache instead of a pwd lookup per process
+            info = proc.as_dict(attrs=['name', 'uids', 'exe'])
+            uids = info.get('uids')
+            username = USER_NAMES.name(uids.real) if uids else 'unknown'
+        else:
+            info = proc.as_dict(attrs=['name', 'username', 'exe'])
+            username = info.get('username') or 'unknown'
+        if '\\' in username:
+            username = username.rpartition('\\')[2]
+        return self.metadata.add(proc.pid, start, (info.get('name') or '')[:30], username[:15],
+                                 info.get('exe') or '')
+
+    def collect(self, plan):
+        """Return a ProcessSnapshot covering every visible process, sampling tiers per `plan`."""
+        snapshot = ProcessSnapshot()
+        cache = self.process_cache
+        metadata = self.metadata
+        live = set()
+        procs = {}
+        now = time.time()
+        for proc in psutil.process_iter():
+            try:
+                with proc.oneshot():
+                    pid = proc.pid
+                    start = proc.create_time()
+                    meta = metadata.get(pid, start)
+                    if meta is None:
+                        meta = self._resolve_metadata(proc, start)
+                    rss = proc.memory_info().rss
+                    state = cache.get(pid)
+                    if state is None or state.start != start:
+                        state = cache[pid] = _ProcessState(start, read_start_ticks(pid))
+
+                    try:
+                        times = proc.cpu_times()
+                        cpu_time = times.user + times.system
+                    except (psutil.AccessDenied, psutil.NoSuchProcess):
+                        cpu_time = 0.0
+
+                    # Only processes that ran since the last tick can have new I/O
+                    ran = state.ran(cpu_time)
+                    if not ran:
+                        try:
+                            ran = proc.status() in self._ACTIVE_STATUSES
+                        except (psutil.AccessDenied, psutil.NoSuchProcess):
+                            pass
+                    if ran or pid in plan.priority_pids:
+                        try:
+                            io = proc.io_counters()
+                            state.update_io(io.read_bytes, io.write_bytes, now)
+                        except (psutil.AccessDenied, psutil.NoSuchProcess, AttributeError):
+                            pass
+                    else:
+                        state.idle_io(now)
+
+                    if plan.wants('threads', pid):
+                        try:
+                            state.threads = proc.num_threads()
+                        except (psutil.AccessDenied, psutil.NoSuchProcess):
+                            pass
+                    if plan.wants('fds', pid):
+                        try:
+                            state.fds = proc.num_fds() if hasattr(proc, 'num_fds') else proc.num_handles()
+                        except (psutil.AccessDenied, psutil.NoSuchProcess):
+                            state.fds = -1
+                    if plan.wants('cmdline', pid) and meta.cmdline is None:
+                        try:
+                            meta.cmdline = ' '.join(proc.cmdline())
+                        except (psutil.AccessDenied, psutil.NoSuchProcess):
+                            meta.cmdline = ''
+
+                    snapshot.append(pid, meta.name, meta.user, 0.0, rss,
+                                    round(rss / self.total_memory * 100, 1), state.io_read, state.io_write,
+                                    state.threads, state.fds, meta.cmdline or '', start, cpu_time, proc.ppid(),
+                                    state.pss, state.uss, state.swap, meta.flags, state.ticks)
+                    live.add((pid, start))
+                    procs[pid] = proc
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                pass
+
+        # Clean up process cache
+        current_pids = set(snapshot.pids)
+        for pid in list(cache.keys()):
+            if pid not in current_pids:
+                del cache[pid]
+        if plan.smaps_budget > 0:
+            self._sample_memory_detail(plan, snapshot, procs)
+        metadata.prune(live)
+        self.cpu_accountant.update(snapshot)
+        return snapshot
+
+    def _sample_memory_detail(self, plan, snapshot, procs):
+        """Refresh PSS/USS/swap (memory_full_info) for as many processes as the plan's budget allows."""
+        def read(pid):
+            try:
+                info = procs[pid].memory_full_info()
+            except (psutil.AccessDenied, psutil.NoSuchProcess, psutil.ZombieProcess):
+                return
+            state = self.process_cache[pid]
+            state.pss = getattr(info, 'pss', -1)
+            state.uss = getattr(info, 'uss', -1)
+            state.swap = getattr(info, 'swap', -1)
+            i = snapshot.index_of(pid)
+            snapshot.pss[i], snapshot.uss[i], snapshot.swap[i] = state.pss, state.uss, state.swap
+
+        self.smaps_sampler.run(procs, [pid for pid in plan.priority_pids if pid in procs], plan.smaps_budget, read)
+        plan.smaps_sweep = self.smaps_sampler.sweep
+
+
+# Precompiled byte-level patterns for /proc parsing
+_STATUS_UID_RE = re.compile(rb'\nUid:\s+(\d+)')
+_IO_BYTES_RE = re.compile(rb'\nread_bytes: (\d+)\nwrite_bytes: (\d+)')
+_BTIME_RE = re.compile(rb'\nbtime (\d+)')
+
+
+def read_start_ticks(pid, proc_root='/proc'):
+    """Return a process's start time in clock ticks since boot from /proc/[pid]/stat (0 if unavailable).
+
+    Unlike an epoch start time it does not depend on any boot-time estimate,
+    so it stays exact across wall-clock steps and between processes.
+    """
+    try:
+        with open(f"{proc_root}/{pid}/stat", 'rb') as f:
+            data = f.read()
+        return int(data[data.rfind(b')') + 2:].split()[ProcCollector._STAT_STARTTIME])
+    except (OSError, IndexError, ValueError):
+        return 0
+_SMAPS_FIELD_RE = re.compile(rb'\n(Pss|Private_Clean|Private_Dirty|Swap):\s+(\d+) kB')
+
+
+class ProcCollector:
+    """Linux collector backend that parses /proc directly.
+
+    Each cycle lists PIDs with a single os.scandir() and reads
+    /proc/[pid]/stat and statm into one reused buffer with raw os.open/os.readv
+    calls; status, exe and cmdline are read only the first time a process is
+    seen (see ProcessMetadataCache). Parsing works on the buffer in place with
+    precompiled byte patterns, so no per-process psutil objects are created.
+    """
+    name = 'proc'
+
+    # Field offsets within /proc/[pid]/stat, counted from the state field after "(comm) "
+    _STAT_STATE = 0
+    _STAT_PPID = 1
+    _STAT_UTIME = 11
+    _STAT_STIME = 12
+    _STAT_NUM_THREADS = 17
+    _STAT_STARTTIME = 19
+
+    def __init__(self, total_memory, proc_root='/proc', metadata=None):
+        self.total_memory = total_memory
+        self.proc_root = proc_root
+        self.page_size = os.sysconf('SC_PAGE_SIZE')
+        self.clock_ticks = os.sysconf('SC_CLK_TCK')
+        self._buf = bytearray(8192)
+        self._bufs = [self._buf]
+        # pid -> _ProcessState
+        self.process_cache = {}
+        self.metadata = metadata if metadata is not None else ProcessMetadataCache()
+        self.cpu_accountant = CpuAccountant()
+        self.smaps_sampler = BudgetedSampler()
+        # Share of the plan's smaps budget this collector may spend (set per shard when sharded)
+        self.smaps_share = 1.0
+        n = self._read(os.path.join(proc_root, 'stat'))
+        m = _BTIME_RE.search(self._buf, 0, n) if n else None
+        if not m:
+            raise OSError(f"no btime in {proc_root}/stat")
+        self.boot_time = float(m.group(1))
+        # btime is whole seconds; derive a sub-second boot time from uptime when available,
+        # so CPU% of a process first seen moments after it started is measured correctly
+        n = self._read(os.path.join(proc_root, 'uptime'))
+        if n:
+            try:
+                self.boot_time = time.time() - float(self._buf[:n].split()[0])
+            except (IndexError, ValueError):
+                pass
+
+    @staticmethod
+    def is_supported(proc_root='/proc'):
+        """Return True if this host exposes a Linux-style /proc."""
+        return sys.platform.startswith('linux') and os.path.exists(os.path.join(proc_root, 'self', 'stat'))
+
+    def _read(self, path):
+        """Read a small /proc file into the shared buffer and return the byte count (0 if gone)."""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return 0
+        try:
+            return os.readv(fd, self._bufs)
+        except OSError:
+            return 0
+        finally:
+            os.close(fd)
+
+    def _full_name(self, base, comm):
+        n = self._read(base + 'cmdline')
+        if n:
+            end = self._buf.find(b'\0', 0, n)
+            argv0 = os.path.basename(self._buf[:n if end < 0 else end].decode('utf-8', 'replace'))
+            if argv0.startswith(comm):
+                return argv0
+        return comm
+
+    def _cmdline(self, base):
+        n = self._read(base + 'cmdline')
+        return self._buf[:n].rstrip(b'\0').replace(b'\0', b' ').decode('utf-8', 'replace') if n else ''
+
+    def _count_fds(self, base):
+        try:
+            with os.scandir(base + 'fd') as it:
+                return sum(1 for _ in it)
+        except OSError:
+            return -1
+
+    def _resolve_metadata(self, pid, start, base, comm):
+        """Read status (UID), exe and, for long names, cmdline for a process seen for the first time."""
+        name = comm.decode('utf-8', 'replace')
+        if len(name) >= 15:
+            # comm is truncated to 15 chars; recover the full name from argv[0] like psutil does
+            name = self._full_name(base, name)
+        n = self._read(base + 'status')
+        m = _STATUS_UID_RE.search(self._buf, 0, n) if n else None
+        username = USER_NAMES.name(int(m.group(1))) if m else 'unknown'
+        try:
+            exe = os.readlink(base + 'exe')
+        except OSError:
+            exe = ''
+        return self.metadata.add(pid, start, name[:30], username[:15], exe, comm)
+
+    def list_pids(self):
+        """Return all numeric PIDs currently present under the proc root."""
+        pids = []
+        with os.scandir(self.proc_root) as it:
+            for entry in it:
+                name = entry.name
+                if name.isdigit():
+                    pids.append(int(name))
+        return pids
+
+    def collect(self, plan, pids=None):
+        """Return a ProcessSnapshot covering every visible process, sampling tiers per `plan`.
+
+        `pids` is the current process set when the caller already knows it
+        (from process events); otherwise the proc root is listed.
+        """
+        snapshot = self.collect_pids(plan, self.list_pids() if pids is None else pids)
+        self.metadata.prune(set(zip(snapshot.pids, snapshot.starts)))
+        self.cpu_accountant.update(snapshot)
+        return snapshot
+
+    def collect_new(self, plan, pids):
+        """Collect just the given (newly started) PIDs between ticks, keeping all other state."""
+        snapshot = self.collect_pids(plan, pids, partial=True)
+        self.cpu_accountant.update(snapshot, advance=False)
+        return snapshot
+
+    def collect_pids(self, plan, pids, partial=False):
+        """Collect the given PIDs only; per-PID state of PIDs not in `pids` is dropped unless `partial`."""
+        root = self.proc_root
+        buf = self._buf
+        read = self._read
+        wants = plan.wants
+        page_size = self.page_size
+        total_memory = self.total_memory
+        priority = plan.priority_pids
+        cache = self.process_cache
+        metadata = self.metadata
+        ticks_per_sec = float(self.clock_ticks)
+        boot_time = self.boot_time
+        seen = set()
+        snapshot = ProcessSnapshot()
+        append = snapshot.append
+        now = time.time()
+
+        for pid in pids:
+            base = f"{root}/{pid}/"
+
+            # stat: "(comm)" may contain spaces or parens, so split at the last ')'
+            n = read(base + 'stat')
+            if not n:
+                continue
+            lpar = buf.find(b'(', 0, n)
+            rpar = buf.rfind(b')', 0, n)
+            if lpar < 0 or rpar < 0:
+                continue
+            fields = buf[rpar + 2:n].split()
+            try:
+                active = fields[self._STAT_STATE] in (b'R', b'D')
+                ppid = int(fields[self._STAT_PPID])
+                ticks = int(fields[self._STAT_UTIME]) + int(fields[self._STAT_STIME])
+                threads = int(fields[self._STAT_NUM_THREADS])
+                # Fixed for the collector's lifetime, so (pid, start) stays a stable key
+                start_ticks = int(fields[self._STAT_STARTTIME])
+                start = start_ticks / ticks_per_sec + boot_time
+            except (IndexError, ValueError):
+                continue
+            comm = buf[lpar + 1:rpar]
+            meta = metadata.get(pid, start)
+            if meta is None:
+                meta = self._resolve_metadata(pid, start, base, comm)
+            elif meta.comm != comm:
+                # Same process, new program: an exec we had no event for. Re-read the
+                # command line now if it was known, rather than blanking it until its tier
+                had_cmdline = meta.cmdline is not None
+                metadata.discard(pid, start)
+                meta = self._resolve_metadata(pid, start, base, comm)
+                if had_cmdline:
+                    meta.cmdline = self._cmdline(base)
+
+            # statm: "size resident shared ..." in pages
+            n = read(base + 'statm')
+            if not n:
+                continue
+            try:
+                rss = int(buf[:n].split(None, 2)[1]) * page_size
+            except (IndexError, ValueError):
+                continue
+
+            seen.add(pid)
+            state = cache.get(pid)
+            if state is None or state.start != start:
+                state = cache[pid] = _ProcessState(start)
+            if wants('threads', pid):
+                state.threads = threads
+            # A process whose CPU time did not move and that is not runnable or in
+            # disk wait did no I/O, so most of /proc/[pid]/io is never opened
+            if state.ran(ticks) or active or pid in priority:
+                n = read(base + 'io')
+                m = _IO_BYTES_RE.search(buf, 0, n) if n else None
+                if m:
+                    state.update_io(int(m.group(1)), int(m.group(2)), now)
+            else:
+                state.idle_io(now)
+            if wants('fds', pid):
+                state.fds = self._count_fds(base)
+            if wants('cmdline', pid) and meta.cmdline is None:
+                meta.cmdline = self._cmdline(base)
+
+            append(pid, meta.name, meta.user, 0.0, rss,
+                   round(rss / total_memory * 100, 1), state.io_read, state.io_write,
+                   state.threads, state.fds, meta.cmdline or '', start, ticks / ticks_per_sec, ppid,
+                   state.pss, state.uss, state.swap, meta.flags, start_ticks)
+
+        if partial:
+            return snapshot
+        # Clean up process cache
+        for pid in list(cache.keys()):
+            if pid not in seen:
+                del cache[pid]
+        if plan.smaps_budget > 0:
+            self._sample_memory_detail(plan, snapshot, seen)
+        return snapshot
+
+    def _sample_memory_detail(self, plan, snapshot, pids):
+        """Refresh PSS/USS/swap from smaps_rollup for as many processes as the plan's budget allows.
+
+        The kernel walks every mapping of a process to produce this file, so
+        it is far more expensive than stat; BudgetedSampler spreads the reads
+        over ticks and puts the visible/selected rows first.
+        """
+        root = self.proc_root
+        buf = self._buf
+        cache = self.process_cache
+
+        def read(pid):
+            n = self._read(f"{root}/{pid}/smaps_rollup")
+            if not n:
+                return
+            fields = {m.group(1): int(m.group(2)) * 1024 for m in _SMAPS_FIELD_RE.finditer(buf, 0, n)}
+            if b'Pss' not in fields:
+                return
+            state = cache[pid]
+            state.pss = fields[b'Pss']
+            state.uss = fields.get(b'Private_Clean', 0) + fields.get(b'Private_Dirty', 0)
+            state.swap = fields.get(b'Swap', 0)
+            i = snapshot.index_of(pid)
+            snapshot.pss[i], snapshot.uss[i], snapshot.swap[i] = state.pss, state.uss, state.swap
+
+        priority = [pid for pid in plan.priority_pids if pid in pids]
+        self.smaps_sampler.run(pids, priority, plan.smaps_budget * self.smaps_share, read)
+        plan.smaps_sweep = self.smaps_sampler.sweep
+
+
+class ShardedProcCollector:
+    """/proc collector that splits the PID space across a thread pool.
+
+    PID p always goes to shard p % workers, so each shard keeps the per-PID
+    I/O counters and thread state of its own processes between cycles; the static metadata
+    cache and CPU accounting are shared. Reading /proc files releases the GIL (the kernel formats
+    each file inside the read call), so shards overlap their I/O, and the
+    per-shard snapshots are concatenated into one.
+    """
+    name = 'proc-sharded'
+
+    def __init__(self, total_memory, proc_root='/proc', workers=4):
+        self.workers = max(1, int(workers))
+        self.metadata = ProcessMetadataCache()
+        self.cpu_accountant = CpuAccountant()
+        self.shards = [ProcCollector(total_memory, proc_root, self.metadata)
+                       for _ in range(self.workers)]
+        # Shards sample smaps in parallel; split the budget so the total cost stays the same
+        for shard in self.shards:
+            shard.smaps_share = 1.0 / self.workers
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='collector')
+
+    def collect(self, plan, pids=None):
+        """Return a ProcessSnapshot covering every visible process, collected in parallel."""
+        workers = self.workers
+        buckets = [[] for _ in range(workers)]
+        for pid in self.shards[0].list_pids() if pids is None else pids:
+            buckets[pid % workers].append(pid)
+        futures = [self._executor.submit(shard.collect_pids, plan, bucket)
+                   for shard, bucket in zip(self.shards, buckets)]
+        snapshot = ProcessSnapshot()
+        for future in futures:
+            snapshot.extend(future.result())
+        if plan.smaps_budget > 0:
+            # A full pass is done only once every shard has finished its own
+            sweeps = [shard.smaps_sampler.sweep for shard in self.shards]
+            plan.smaps_sweep = None if None in sweeps else max(sweeps)
+        self.metadata.prune(set(zip(snapshot.pids, snapshot.starts)))
+        self.cpu_accountant.update(snapshot)
+        return snapshot
+
+    def collect_new(self, plan, pids):
+        """Collect just the given (newly started) PIDs between ticks, each in its own shard."""
+        snapshot = ProcessSnapshot()
+        for pid in pids:
+            snapshot.extend(self.shards[pid % self.workers].collect_pids(plan, (pid,), partial=True))
+        self.cpu_accountant.update(snapshot, advance=False)
+        return snapshot
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+class ProcEventStream:
+    """Process starts, execs and exits from the Linux proc connector, as they happen.
+
+    A daemon thread reads fork/exec/exit events from a NETLINK_CONNECTOR
+    socket and accumulates the PIDs of processes (not threads) until take()
+    is called, calling `on_event` from that thread whenever some arrive.
+    Older kernels only allow subscribing with CAP_NET_ADMIN, so the
+    constructor raises OSError when that is refused (or off Linux) and
+    callers keep polling.
+    If the socket buffer overflowed the kernel dropped events, and take()
+    says so, so that the caller can resync with a full scan.
+    """
+    NETLINK_CONNECTOR = 11
+    CN_IDX_PROC = 1
+    CN_VAL_PROC = 1
+    PROC_CN_MCAST_LISTEN = 1
+    NLMSG_DONE = 3
+    PROC_EVENT_FORK = 0x00000001
+    PROC_EVENT_EXEC = 0x00000002
+    PROC_EVENT_EXIT = 0x80000000
+    # nlmsghdr, cn_msg, then proc_event: what, cpu, timestamp and the event's PIDs
+    _NLMSG = struct.Struct('=IHHII')
+    _CN_MSG = struct.Struct('=IIIIHH')
+    _EVENT = struct.Struct('=IIQ')
+    _PIDS = struct.Struct('=IIII')
+    RECV_BUFFER = 4 * 1048576
+
+    def __init__(self, on_event=None):
+        if not sys.platform.startswith('linux'):
+            raise OSError("the proc connector is only available on Linux")
+        self.on_event = on_event
+        self._lock = threading.Lock()
+        self._started = set()
+        self._exited = set()
+        self._execed = set()
+        self._overflowed = False
+        self._closed = False
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, self.NETLINK_CONNECTOR)
+        try:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.RECV_BUFFER)
+            except OSError:
+                pass
+            sock.bind((0, self.CN_IDX_PROC))
+            op = struct.pack('=I', self.PROC_CN_MCAST_LISTEN)
+            header = self._CN_MSG.pack(self.CN_IDX_PROC, self.CN_VAL_PROC, 0, 0, len(op), 0)
+            length = self._NLMSG.size + len(header) + len(op)
+            sock.send(self._NLMSG.pack(length, self.NLMSG_DONE, 0, 0, sock.getsockname()[0]) + header + op)
+            # Wake up now and then so close() is noticed
+            sock.settimeout(0.5)
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+        self._thread = threading.Thread(target=self._run, name='proc-events', daemon=True)
+        self._thread.start()
+
+    def take(self):
+        """Return and reset (started, exited, execed, overflowed) since the previous call.
+
+        A PID can be in `exited` and `started` when it was reused; it then
+        exited before it was started again. PIDs that started and exited in
+        between are only in `exited`.
+        """
+        with self._lock:
+            changes = self._started, self._exited, self._execed, self._overflowed
+            self._started, self._exited, self._execed = set(), set(), set()
+            self._overflowed = False
+        return changes
+
+    def close(self):
+        self._closed = True
+
+    def _run(self):
+        sock = self._sock
+        try:
+            while not self._closed:
+                try:
+                    data = sock.recv(65536)
+                except socket.timeout:
+                    continue
+                except OSError as e:
+                    if e.errno != errno.ENOBUFS:
+                        raise
+                    with self._lock:
+                        self._overflowed = True
+                else:
+                    if not self._parse(data):
+                        continue
+                if self.on_event is not None:
+                    self.on_event()
+        except Exception as e:
+            if not self._closed:
+                print(f"Error reading process events: {e}")
+                with self._lock:
+                    self._overflowed = True
+        finally:
+            sock.close()
+
+    def _parse(self, data):
+        """Fold one datagram's events into the pending sets; return True if any concerned a process."""
+        found = False
+        offset = 0
+        event_offset = self._NLMSG.size + self._CN_MSG.size
+        pids_offset = event_offset + self._EVENT.size
+        with self._lock:
+            while offset + pids_offset + self._PIDS.size <= len(data):
+                length = self._NLMSG.unpack_from(data, offset)[0]
+                if length < self._NLMSG.size:
+                    break
+                what = self._EVENT.unpack_from(data, offset + event_offset)[0]
+                a, b, c, d = self._PIDS.unpack_from(data, offset + pids_offset)
+                if what == self.PROC_EVENT_FORK:
+                    # (parent pid, parent tgid, child pid, child tgid); a new thread shares its tgid
+                    if c == d:
+                        self._started.add(d)
+                        found = True
+                elif what == self.PROC_EVENT_EXEC:
+                    self._execed.add(b)
+                    found = True
+                elif what == self.PROC_EVENT_EXIT:
+                    # (pid, tgid, exit code, exit signal); only the thread-group leader ends a process
+                    if a == b:
+                        self._started.discard(b)
+                        self._execed.discard(b)
+                        self._exited.add(b)
+                        found = True
+                offset += (length + 3) & ~3
+        return found
+
+
+def forget_execs(collector, snapshot, execed):
+    """Drop cached metadata of processes that exec'd, so their new name and command line are read."""
+    for row in snapshot.rows_of(execed):
+        collector.metadata.discard(snapshot.pids[row], snapshot.starts[row])
+
+
+def collect_changes(collector, plan, previous, started, exited, execed):
+    """Return a ProcessDelta patching `previous` for processes that started, exec'd or exited.
+
+    Only those processes are read; `previous` (the collector's last full
+    snapshot) is patched in place and every other row is carried over until
+    the next full collection. An exec'd process is read again under a fresh
+    metadata entry, so its new name and command line show up.
+    """
+    forget_execs(collector, previous, execed)
+    touched = exited | started | execed
+    before = previous.take(previous.rows_of(touched))
+    fresh = collector.collect_new(plan, sorted(started | execed))
+    delta = fresh.diff(before, None, None)
+    previous.apply_delta(delta)
+    return delta
+
+
+def create_collector(backend, total_memory, workers=1):
+    """Return a collector for the requested backend, falling back to psutil.
+
+    With workers > 1 the /proc backend collects in that many parallel shards.
+    """
+    if backend in ('auto', 'proc') and ProcCollector.is_supported():
+        try:
+            if workers > 1:
+                return ShardedProcCollector(total_memory, workers=workers)
+            return ProcCollector(total_memory)
+        except Exception as e:
+            print(f"/proc collector unavailable, falling back to psutil: {e}")
+    elif backend == 'proc':
+        print("/proc collector not supported on this platform, falling back to psutil")
+    return PsutilCollector(total_memory)
+
+
+def collect_mem_info():
+    """Return system memory usage in GB (and percent) for the memory panel."""
+    mem = psutil.virtual_memory()
+    gb_divisor = 1073741824
+    return {
+        'total': round(mem.total / gb_divisor, 2),
+        'used': round(mem.used / gb_divisor, 2),
+        'available': round(mem.available / gb_divisor, 2),
+        'percent': round(mem.percent, 1)
+    }
+
+
+# Shared-memory snapshot encoding: (row count, meta length) and per-column byte lengths
+_SNAPSHOT_HEADER = struct.Struct('<QQ')
+_LENGTH = struct.Struct('<Q')
+
+
+def encode_snapshot(snapshot, meta):
+    """Serialize a snapshot plus a JSON-able meta dict into one flat buffer.
+
+    Layout: row count, meta length, meta JSON, then one (name, data) pair per
+    column, each length-prefixed: array buffers as-is, string columns
+    NUL-joined UTF-8. Columns are named so recordings stay readable when
+    columns are added later.
+    """
+    meta_bytes = json.dumps(meta).encode('utf-8')
+    parts = [_SNAPSHOT_HEADER.pack(len(snapshot), len(meta_bytes)), meta_bytes]
+    for column, typecode in ProcessSnapshot.COLUMNS:
+        values = getattr(snapshot, column)
+        data = values.tobytes() if typecode is not None else '\0'.join(values).encode('utf-8', 'replace')
+        name = column.encode('ascii')
+        parts.append(_LENGTH.pack(len(name)))
+        parts.append(name)
+        parts.append(_LENGTH.pack(len(data)))
+        parts.append(data)
+    return b''.join(parts)
+
+
+def decode_snapshot(view):
+    """Inverse of encode_snapshot(); `view` may be a memoryview into shared memory.
+
+    Column data is copied out of `view` (one bulk copy per column, no
+    per-row parsing), so the snapshot stays valid after the buffer is
+    reused. Unknown columns are skipped and missing ones filled with defaults.
+    """
+    count, meta_len = _SNAPSHOT_HEADER.unpack_from(view, 0)
+    offset = _SNAPSHOT_HEADER.size
+    meta = json.loads(bytes(view[offset:offset + meta_len]))
+    offset += meta_len
+    typecodes = dict(ProcessSnapshot.COLUMNS)
+    snapshot = ProcessSnapshot()
+    missing = set(typecodes)
+    while offset < len(view):
+        (length,) = _LENGTH.unpack_from(view, offset)
+        column = bytes(view[offset + _LENGTH.size:offset + _LENGTH.size + length]).decode('ascii')
+        offset += _LENGTH.size + length
+        (length,) = _LENGTH.unpack_from(view, offset)
+        offset += _LENGTH.size
+        data = view[offset:offset + length]
+        offset += length
+        if column not in typecodes:
+            continue
+        typecode = typecodes[column]
+        if typecode is None:
+            values = [sys.intern(s) for s in bytes(data).decode('utf-8').split('\0')] if count else []
+        else:
+            values = array(typecode)
+            values.frombytes(data)
+        if len(values) != count:
+            raise ValueError(f"column {column} has {len(values)} rows, expected {count}")
+        setattr(snapshot, column, values)
+        missing.discard(column)
+    for column in missing:
+        typecode = typecodes[column]
+        default = _COLUMN_DEFAULTS.get(column, '' if typecode is None else 0)
+        setattr(snapshot, column, [default] * count if typecode is None else array(typecode, [default]) * count)
+    return snapshot, meta
+
+
+# Values for columns absent from older encoded snapshots (0 or '' otherwise)
+_COLUMN_DEFAULTS = {'fds': -1, 'pss': -1, 'uss': -1, 'swap': -1}
+
+
+class SnapshotRing:
+    """Memory-mapped ring of snapshot slots shared by a collector daemon and GUI readers.
+
+    File layout: a 64-byte header (magic, version, slot count, slot size,
+    latest published seq, writer pid, heartbeat, closed flag) followed by
+    `slot_count` slots. Each slot starts with a seqlock counter, the snapshot
+    seq and the payload length. The writer makes the counter odd while it
+    writes a slot and even again when done; readers copy the payload out and
+    retry if the counter moved, so they never lock against the writer.
+    """
+    MAGIC = b'TMRING\0\0'
+    VERSION = 2
+    HEADER = struct.Struct('<8sIIQQQdQ')
+    HEADER_SIZE = 64
+    SLOT_HEADER = struct.Struct('<QQQ')
+    # Field offsets inside the header
+    _LATEST = 24
+    _HEARTBEAT = 40
+    _CLOSED = 48
+
+
+class SnapshotRingWriter(SnapshotRing):
+    """Publishing side of the ring, used by `--daemon`."""
+
+    def __init__(self, path, slot_count=4, slot_size=4 * 1048576):
+        self.path = path
+        self.slot_count = slot_count
+        self._file = None
+        self._map = None
+        self._create(slot_size)
+
+    def _create(self, slot_size):
+        """Create a fresh ring file next to `path` and atomically rename it into place.
+
+        `slot_size` only takes effect once the new mapping exists, so a failure
+        (e.g. /dev/shm full) leaves the writer on its old, consistent ring.
+        """
+        directory = os.path.dirname(self.path) or '.'
+        fd, tmp_path = tempfile.mkstemp(prefix='.task_manager_ring.', dir=directory)
+        mapping = None
+        try:
+            os.fchmod(fd, 0o644)
+            size = self.HEADER_SIZE + self.slot_count * slot_size
+            os.ftruncate(fd, size)
+            mapping = mmap.mmap(fd, size)
+            self.HEADER.pack_into(mapping, 0, self.MAGIC, self.VERSION, self.slot_count,
+                                  slot_size, 0, os.getpid(), time.time(), 0)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if mapping is not None:
+                mapping.close()
+            os.close(fd)
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        old_map, old_fd = self._map, self._file
+        self._map, self._file = mapping, fd
+        self.slot_size = slot_size
+        if old_map is not None:
+            # Tell readers still mapped to the old file to reopen the path
+            struct.pack_into('<Q', old_map, self._CLOSED, 1)
+            old_map.close()
+            os.close(old_fd)
+
+    def publish(self, seq, snapshot, meta):
+        """Write a snapshot into the next slot and advertise it as the latest."""
+        payload = encode_snapshot(snapshot, meta)
+        capacity = self.slot_size - self.SLOT_HEADER.size
+        if len(payload) > capacity:
+            # Grow to twice what is needed so a growing host doesn't resize every cycle
+            self._create(1 << (2 * len(payload) + self.SLOT_HEADER.size - 1).bit_length())
+        mapping = self._map
+        offset = self.HEADER_SIZE + (seq % self.slot_count) * self.slot_size
+        (lock,) = struct.unpack_from('<Q', mapping, offset)
+        lock += 1 + (lock & 1)
+        self.SLOT_HEADER.pack_into(mapping, offset, lock, seq, len(payload))  # odd: slot being written
+        start = offset + self.SLOT_HEADER.size
+        mapping[start:start + len(payload)] = payload
+        struct.pack_into('<Q', mapping, offset, lock + 1)  # even: slot stable
+        struct.pack_into('<Q', mapping, self._LATEST, seq)
+        struct.pack_into('<d', mapping, self._HEARTBEAT, time.time())
+
+    def close(self):
+        """Mark the ring closed and remove it."""
+        if self._map is None:
+            return
+        struct.pack_into('<Q', self._map, self._CLOSED, 1)
+        self._map.close()
+        os.close(self._file)
+        self._map = None
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class SnapshotRingReader(SnapshotRing):
+    """Reading side of the ring, used by DataFetcher when a daemon is publishing."""
+
+    def __init__(self, path, stale_after=10.0):
+        self.path = path
+        self.stale_after = stale_after
+        self.last_seq = 0
+        self._map = None
+        self._open()
+
+    def _open(self):
+        with open(self.path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            # The default path is in a world-writable directory; only trust root or ourselves
+            if st.st_uid not in (0, os.getuid()):
+                raise PermissionError(f"{self.path} is owned by uid {st.st_uid}")
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = self.HEADER.unpack_from(mapping, 0)[:2]
+        if magic != self.MAGIC or version != self.VERSION:
+            mapping.close()
+            raise ValueError(f"{self.path} is not a snapshot ring")
+        if self._map is not None:
+            self._map.close()
+        self._map = mapping
+
+    def alive(self):
+        """Return True while the writer is publishing (reopening the file if it was replaced)."""
+        try:
+            if struct.unpack_from('<Q', self._map, self._CLOSED)[0]:
+                self._open()
+            heartbeat = struct.unpack_from('<d', self._map, self._HEARTBEAT)[0]
+            return time.time() - heartbeat < self.stale_after
+        except (OSError, ValueError):
+            return False
+
+    def read(self, retries=5):
+        """Return (seq, snapshot, meta) for the newest snapshot, or None if nothing new.
+
+        The slot is decoded straight from the mapping but its columns are
+        copied: the writer reuses the slot a few cycles later, and the
+        seqlock check only proves the copy was not torn.
+        """
+        mapping = self._map
+        latest = struct.unpack_from('<Q', mapping, self._LATEST)[0]
+        if latest == 0 or latest == self.last_seq:
+            return None
+        slot_count, slot_size = self.HEADER.unpack_from(mapping, 0)[2:4]
+        offset = self.HEADER_SIZE + (latest % slot_count) * slot_size
+        start = offset + self.SLOT_HEADER.size
+        view = memoryview(mapping)
+        try:
+            for _ in range(retries):
+                lock, seq, length = self.SLOT_HEADER.unpack_from(mapping, offset)
+                if lock & 1 or seq != latest:
+                    time.sleep(0.001)
+                    continue
+                try:
+                    snapshot, meta = decode_snapshot(view[start:start + length])
+                except (ValueError, struct.error, UnicodeDecodeError):
+                    snapshot = None
+                # Torn read if the writer touched the slot while we copied it
+                if snapshot is not None and struct.unpack_from('<Q', mapping, offset)[0] == lock:
+                    self.last_seq = seq
+                    return seq, snapshot, meta
+        finally:
+            view.release()
+        return None
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+def encode_delta(delta, meta):
+    """Serialize a non-keyframe ProcessDelta plus meta into one flat buffer.
+
+    Layout: meta, removed PIDs, the added rows as an encode_snapshot() blob,
+    then one group per changed column: column name, PIDs and new values.
+    Every part is length-prefixed.
+    """
+    parts = []
+
+    def put(data):
+        parts.append(_LENGTH.pack(len(data)))
+        parts.append(data)
+
+    put(json.dumps(meta).encode('utf-8'))
+    put(array('q', delta.removed).tobytes())
+    put(encode_snapshot(delta.added, {}) if delta.added is not None else b'')
+    by_column = {}
+    for pid, changes in delta.changed.items():
+        for column, value in changes.items():
+            by_column.setdefault(column, ([], []))
+            by_column[column][0].append(pid)
+            by_column[column][1].append(value)
+    for column, typecode in ProcessSnapshot.COLUMNS:
+        if column not in by_column:
+            continue
+        pids, values = by_column[column]
+        put(column.encode('ascii'))
+        put(array('q', pids).tobytes())
+        put(array(typecode, values).tobytes() if typecode is not None
+            else '\0'.join(values).encode('utf-8', 'replace'))
+    return b''.join(parts)
+
+
+def apply_encoded_delta(snapshot, view):
+    """Apply an encode_delta() buffer to a snapshot in place and return its meta.
+
+    Changed values are written column by column straight from the decoded
+    arrays, without building a per-PID dict, which keeps replay seeks fast.
+    """
+    offset = 0
+
+    def get():
+        nonlocal offset
+        (length,) = _LENGTH.unpack_from(view, offset)
+        offset += _LENGTH.size + length
+        return view[offset - length:offset]
+
+    meta = json.loads(bytes(get()))
+    delta = ProcessDelta(0)
+    removed = array('q')
+    removed.frombytes(get())
+    delta.removed = removed
+    added = get()
+    if len(added):
+        delta.added = decode_snapshot(added)[0]
+    snapshot.apply_delta(delta)
+    index = snapshot._index
+    typecodes = dict(ProcessSnapshot.COLUMNS)
+    while offset < len(view):
+        column = bytes(get()).decode('ascii')
+        pids = array('q')
+        pids.frombytes(get())
+        data = get()
+        if column not in typecodes:
+            continue
+        typecode = typecodes[column]
+        if typecode is None:
+            values = bytes(data).decode('utf-8').split('\0')
+        else:
+            values = array(typecode)
+            values.frombytes(data)
+        target = getattr(snapshot, column)
+        for pid, value in zip(pids, values):
+            i = index.get(pid, -1)
+            if i >= 0:
+                target[i] = value
+    return meta
+
+
+class SnapshotRecorder:
+    """Append-only, compressed on-disk recording of snapshots for later replay.
+
+    The data file is a magic header followed by frames of (timestamp, kind,
+    length, zlib payload). A keyframe holds a whole snapshot and a delta frame
+    only what changed since the previous frame, so a frame costs time
+    proportional to what changed. A keyframe is written every
+    `keyframe_interval` frames so seeking never replays more than that many
+    deltas. A sidecar `.idx` file holds one fixed-size (timestamp, offset,
+    kind) record per frame for fast seeking. It can be rebuilt from the data
+    file if lost.
+    """
+    MAGIC = b'TMREC\0\0\2'
+    FRAME = struct.Struct('<dBI')
+    INDEX = struct.Struct('<dQB')
+    KEYFRAME = 1
+    DELTA = 2
+
+    def __init__(self, path, keyframe_interval=300, level=6):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.level = level
+        self._current = None
+        self._since_keyframe = 0
+        self._seq = 0
+        self._data = open(path, 'ab')
+        if self._data.tell() == 0:
+            self._data.write(self.MAGIC)
+        self._index = open(path + '.idx', 'ab')
+
+    def _write(self, timestamp, kind, payload):
+        compressed = zlib.compress(payload, self.level)
+        offset = self._data.tell()
+        self._data.write(self.FRAME.pack(timestamp, kind, len(compressed)))
+        self._data.write(compressed)
+        self._data.flush()
+        self._index.write(self.INDEX.pack(timestamp, offset, kind))
+        self._index.flush()
+
+    def record(self, timestamp, mem_info, delta, ages=None):
+        """Record one DataFetcher delta (or keyframe)."""
+        meta = {'mem_info': mem_info, 'ages': ages or {}}
+        if delta.keyframe:
+            snapshot = delta.snapshot
+            if self._current is not None and self._since_keyframe < self.keyframe_interval:
+                # The fetcher's resync keyframes are cheaper to store as deltas
+                self._write_delta(timestamp, snapshot.diff(self._current, 0, 0), meta)
+                self._current = snapshot.copy()
+                return
+            self._current = snapshot.copy()
+        else:
+            if self._current is None:
+                return  # can't start a recording mid-stream
+            self._current.apply_delta(delta)
+            if self._since_keyframe < self.keyframe_interval:
+                self._write_delta(timestamp, delta, meta)
+                return
+        self._since_keyframe = 0
+        self._write(timestamp, self.KEYFRAME, encode_snapshot(self._current, meta))
+
+    def record_snapshot(self, timestamp, mem_info, snapshot, ages=None):
+        """Record a full collector snapshot (used by `--daemon`, which has no deltas)."""
+        self._seq += 1
+        if self._current is None:
+            delta = ProcessDelta(self._seq, snapshot=snapshot)
+        else:
+            delta = snapshot.diff(self._current, self._seq, self._seq - 1)
+        self.record(timestamp, mem_info, delta, ages)
+
+    def _write_delta(self, timestamp, delta, meta):
+        self._since_keyframe += 1
+        self._write(timestamp, self.DELTA, encode_delta(delta, meta))
+
+    def close(self):
+        self._data.close()
+        self._index.close()
+
+
+class SnapshotRecording:
+    """Random-access reader for a SnapshotRecorder file, used by `--replay`."""
+
+    def __init__(self, path):
+        self.path = path
+        self._data = open(path, 'rb')
+        if self._data.read(len(SnapshotRecorder.MAGIC)) != SnapshotRecorder.MAGIC:
+            raise ValueError(f"{path} is not a task manager recording")
+        self.times = array('d')
+        self.offsets = array('Q')
+        self.kinds = array('B')
+        self._load_index()
+        self.keyframes = array('q', [i for i, kind in enumerate(self.kinds)
+                                     if kind == SnapshotRecorder.KEYFRAME])
+        self._position = 0
+        self._current = None
+
+    def _load_index(self):
+        """Read the sidecar index, then scan any frames written after it (or all, if it is missing)."""
+        record = SnapshotRecorder.INDEX
+        try:
+            with open(self.path + '.idx', 'rb') as f:
+                raw = f.read()
+        except OSError:
+            raw = b''
+        for timestamp, offset, kind in record.iter_unpack(raw[:len(raw) - len(raw) % record.size]):
+            self.times.append(timestamp)
+            self.offsets.append(offset)
+            self.kinds.append(kind)
+        frame = SnapshotRecorder.FRAME
+        data = self._data
+        if self.offsets:
+            data.seek(self.offsets[-1])
+            header = data.read(frame.size)
+            offset = self.offsets[-1] + frame.size + frame.unpack(header)[2]
+        else:
+            offset = len(SnapshotRecorder.MAGIC)
+        while True:
+            data.seek(offset)
+            header = data.read(frame.size)
+            if len(header) < frame.size:
+                break
+            timestamp, kind, length = frame.unpack(header)
+            if len(data.read(length)) < length:
+                break  # partially written last frame
+            self.times.append(timestamp)
+            self.offsets.append(offset)
+            self.kinds.append(kind)
+            offset += frame.size + length
+
+    def __len__(self):
+        return len(self.times)
+
+    def _frame(self, i):
+        frame = SnapshotRecorder.FRAME
+        self._data.seek(self.offsets[i])
+        _, kind, length = frame.unpack(self._data.read(frame.size))
+        return kind, memoryview(zlib.decompress(self._data.read(length)))
+
+    def seek(self, timestamp):
+        """Position so the next frame returned is the last one at or before timestamp."""
+        if not self.times:
+            return
+        target = max(0, bisect.bisect_right(self.times, timestamp) - 1)
+        k = bisect.bisect_right(self.keyframes, target) - 1
+        start = self.keyframes[k] if k >= 0 else 0
+        self._current = None
+        self._position = start
+        while self._position < target:
+            self._advance()
+
+    def _advance(self):
+        kind, payload = self._frame(self._position)
+        self._position += 1
+        if kind == SnapshotRecorder.KEYFRAME:
+            self._current, meta = decode_snapshot(payload)
+        elif self._current is not None:
+            meta = apply_encoded_delta(self._current, payload)
+        else:
+            meta = None
+        return meta
+
+    def next(self):
+        """Return (timestamp, snapshot, meta) for the next frame, or None at the end."""
+        while self._position < len(self.times):
+            timestamp = self.times[self._position]
+            meta = self._advance()
+            if self._current is not None:
+                # Hand out a copy: the receiver keeps it while we keep patching ours
+                return timestamp, self._current.copy(), meta
+        return None
+
+    def next_delay(self):
+        """Return the recorded gap before the next frame (None at the end)."""
+        i = self._position
+        if i == 0 or i >= len(self.times):
+            return None
+        return self.times[i] - self.times[i - 1]
+
+    def close(self):
+        self._data.close()
+
+
+def run_daemon(ring_path, interval=1.0, recorder=None):
+    """Collect headlessly and publish every snapshot to the shared ring (and recorder) until interrupted."""
+    total_memory = psutil.virtual_memory().total
+    collector = create_collector(load_collector_backend(), total_memory, load_collector_workers())
+    plan = SamplingPlan(SamplingPlan.DAEMON_TIERS)
+    if load_memory_details():
+        plan.smaps_budget = load_smaps_budget_ms() / 1000.0
+    writer = SnapshotRingWriter(ring_path)
+    # Remove the ring on `kill` too, not just Ctrl+C
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Publishing snapshots to {ring_path} every {interval:.1f}s ({collector.name} collector)")
+    seq = 0
+    try:
+        while True:
+            started = time.monotonic()
+            try:
+                plan.begin_tick()
+                snapshot = collector.collect(plan)
+                plan.end_tick()
+                seq += 1
+                mem_info = collect_mem_info()
+                ages = plan.ages()
+                writer.publish(seq, snapshot, {'mem_info': mem_info, 'ages': ages})
+                if recorder is not None:
+                    recorder.record_snapshot(time.time(), mem_info, snapshot, ages)
+            except Exception as e:
+                print(f"Error in collector daemon: {e}")
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        writer.close()
+        if recorder is not None:
+            recorder.close()
+        close = getattr(collector, 'close', None)
+        if close is not None:
+            close()
+
+
+class HistoryStore:
+    """Bounded in-memory time series of per-process CPU, RSS and IO.
+
+    Every live process (and the system as a whole, slot 0) owns a slot in
+    time-major ring buffers that share one time axis: `fine_samples` raw
+    samples, plus `coarse_samples` buckets that each average
+    `coarse_factor` raw samples, so older data is kept at lower resolution.
+    Slots are allocated in chunks up to the number that fits in `max_bytes`,
+    counting each slot's index entries and the extra ring _grow() briefly
+    holds, so the cap also holds while growing; when that is reached the slot of the longest-exited process is reused,
+    and if every slot belongs to a live process new ones simply go
+    unrecorded (counted in `dropped`). Reading a series is a slice of the
+    rings, never a new sample. Written by DataFetcher, read by the GUI.
+    """
+    METRICS = ('cpu', 'rss', 'io')  # percent, MB, MB/s read+write
+    _SLOT_CHUNK = 256
+    # Python objects behind one slot: its _index entry, (pid, start) key tuple with
+    # its int and float, the slot number's int, and the _keys/_free pointers
+    _KEY_BYTES = 200
+
+    def __init__(self, fine_samples=120, coarse_samples=180, coarse_factor=10, max_bytes=32 * 1048576):
+        self.fine_samples = fine_samples
+        self.coarse_samples = coarse_samples
+        self.coarse_factor = coarse_factor
+        self.max_bytes = max_bytes
+        # float32 rings + float64 coarse accumulators for each metric, acc_n and last_tick
+        per_slot = len(self.METRICS) * ((fine_samples + coarse_samples) * 4 + 8) + 16 + self._KEY_BYTES
+        # _grow() builds each ring before dropping the old one, so one ring briefly exists twice
+        headroom = max(fine_samples, coarse_samples) * 4
+        fixed = (fine_samples + coarse_samples) * 8  # shared time axes
+        self.max_slots = max(1, (max_bytes - fixed) // (per_slot + headroom))
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._slots = 0
+        self._index = {}                # (pid, start) -> slot; slot 0 is the system
+        self._keys = [None]             # slot -> key
+        self._free = []
+        self._last_tick = array('q')    # slot -> tick it was last recorded
+        self._tick = 0
+        self._fine_times = array('d', [0.0] * fine_samples)
+        self._coarse_times = array('d', [0.0] * coarse_samples)
+        self._fine_count = 0
+        self._coarse_count = 0
+        self._fine = {m: array('f') for m in self.METRICS}
+        self._coarse = {m: array('f') for m in self.METRICS}
+        self._acc = {m: array('d') for m in self.METRICS}
+        self._acc_n = array('l')
+        self._grow(1)
+
+    def _grow(self, needed):
+        """Re-lay the rings out for more slots (rare: once per _SLOT_CHUNK new slots).
+
+        One ring at a time, so only a single old ring is alive next to its
+        replacement (the headroom max_slots reserves).
+        """
+        old = self._slots
+        new = min(self.max_slots, max(needed, old + self._SLOT_CHUNK))
+        nan = float('nan')
+        for rings, samples in ((self._fine, self.fine_samples), (self._coarse, self.coarse_samples)):
+            for metric, ring in rings.items():
+                grown = array('f', [nan]) * (samples * new)
+                for h in range(samples):
+                    grown[h * new:h * new + old] = ring[h * old:(h + 1) * old]
+                rings[metric] = grown
+                del ring, grown
+        for acc in self._acc.values():
+            acc.extend([0.0] * (new - old))
+        self._acc_n.extend([0] * (new - old))
+        self._last_tick.extend([0] * (new - old))
+        self._keys.extend([None] * (new - old - (1 if old == 0 else 0)))
+        self._free.extend(range(new - 1, max(old, 1) - 1, -1))
+        self._slots = new
+
+    def _clear_slot(self, slot):
+        nan = float('nan')
+        slots = self._slots
+        for rings, samples in ((self._fine, self.fine_samples), (self._coarse, self.coarse_samples)):
+            for ring in rings.values():
+                ring[slot:samples * slots:slots] = array('f', [nan]) * samples
+        for acc in self._acc.values():
+            acc[slot] = 0.0
+        self._acc_n[slot] = 0
+
+    def _allocate(self, key):
+        """Return a slot for a newly seen process, or -1 if the store is full."""
+        if self._free:
+            slot = self._free.pop()
+        else:
+            # Reuse the slot of the process that exited longest ago (missing since before
+            # the previous tick, so no process still to be recorded this tick is picked)
+            last_tick = self._last_tick
+            slot = -1
+            oldest = self._tick - 1
+            for s in range(1, self._slots):
+                if last_tick[s] < oldest:
+                    oldest = last_tick[s]
+                    slot = s
+            if slot < 0:
+                return -1
+            del self._index[self._keys[slot]]
+        self._clear_slot(slot)
+        self._keys[slot] = key
+        self._index[key] = slot
+        return slot
+
+    def record(self, snapshot, mem_info, timestamp=None):
+        """Append one sample per process in the snapshot (plus the system totals)."""
+        with self._lock:
+            self._tick += 1
+            tick = self._tick
+            index = self._index
+            keys = list(zip(snapshot.pids, snapshot.starts))
+            new = sum(1 for key in keys if key not in index)
+            if new > len(self._free) and self._slots < self.max_slots:
+                self._grow(self._slots + new - len(self._free))
+            slots = self._slots
+            head = self._fine_count % self.fine_samples
+            self._fine_times[head] = time.time() if timestamp is None else timestamp
+            base = head * slots
+            fine_cpu, fine_rss, fine_io = (self._fine[m] for m in self.METRICS)
+            acc_cpu, acc_rss, acc_io = (self._acc[m] for m in self.METRICS)
+            acc_n = self._acc_n
+            # Processes not in this snapshot get a gap, not a stale value
+            blank = array('f', [float('nan')]) * slots
+            for ring in (fine_cpu, fine_rss, fine_io):
+                ring[base:base + slots] = blank
+
+            last_tick = self._last_tick
+            cpu, rss, io_read, io_write = snapshot.cpu, snapshot.rss, snapshot.io_read, snapshot.io_write
+            total_cpu = total_io = 0.0
+            for i, key in enumerate(keys):
+                slot = index.get(key)
+                if slot is None:
+                    slot = self._allocate(key)
+                    if slot < 0:
+                        self.dropped += 1
+                        continue
+                c, r, o = cpu[i], rss[i] / 1048576, io_read[i] + io_write[i]
+                fine_cpu[base + slot] = c
+                fine_rss[base + slot] = r
+                fine_io[base + slot] = o
+                acc_cpu[slot] += c
+                acc_rss[slot] += r
+                acc_io[slot] += o
+                acc_n[slot] += 1
+                last_tick[slot] = tick
+                total_cpu += c
+                total_io += o
+
+            used_mb = mem_info.get('used', 0.0) * 1024 if mem_info else float('nan')
+            for ring, acc, value in ((fine_cpu, acc_cpu, total_cpu), (fine_rss, acc_rss, used_mb),
+                                     (fine_io, acc_io, total_io)):
+                ring[base] = value
+                acc[0] += value
+            acc_n[0] += 1
+            last_tick[0] = tick
+
+            self._fine_count += 1
+            if self._fine_count % self.coarse_factor == 0:
+                self._close_bucket()
+
+    def _close_bucket(self):
+        """Average the accumulated raw samples into the next coarse bucket."""
+        slots = self._slots
+        head = self._coarse_count % self.coarse_samples
+        self._coarse_times[head] = self._fine_times[(self._fine_count - 1) % self.fine_samples]
+        base = head * slots
+        acc_n = self._acc_n
+        nan = float('nan')
+        for metric in self.METRICS:
+            acc = self._acc[metric]
+            ring = self._coarse[metric]
+            ring[base:base + slots] = array('f', [acc[s] / acc_n[s] if acc_n[s] else nan
+                                                  for s in range(slots)])
+            acc[:] = array('d', [0.0]) * slots
+        acc_n[:] = array('l', [0]) * slots
+        self._coarse_count += 1
+
+    def _series(self, slot, metric, coarse):
+        if coarse:
+            ring, times, samples, count = (self._coarse[metric], self._coarse_times,
+                                           self.coarse_samples, self._coarse_count)
+        else:
+            ring, times, samples, count = (self._fine[metric], self._fine_times,
+                                           self.fine_samples, self._fine_count)
+        slots = self._slots
+        out_times, out_values = [], []
+        for n in range(max(0, count - samples), count):
+            h = n % samples
+            value = ring[h * slots + slot]
+            if value == value:  # skip gaps (NaN)
+                out_times.append(times[h])
+                out_values.append(value)
+        return out_times, out_values
+
+    def series(self, pid, start, metric, coarse=False):
+        """Return (timestamps, values) for one process metric, oldest first."""
+        with self._lock:
+            slot = self._index.get((pid, start))
+            if slot is None:
+                return [], []
+            return self._series(slot, metric, coarse)
+
+    def system_series(self, metric, coarse=False):
+        """Return (timestamps, values) for the system totals (CPU sum, used RAM in MB, IO sum)."""
+        with self._lock:
+            return self._series(0, metric, coarse)
+
+    def memory_bytes(self):
+        """Return the bytes held by the history buffers and their slot index, as max_bytes counts them."""
+        arrays = [*self._fine.values(), *self._coarse.values(), *self._acc.values(),
+                  self._acc_n, self._last_tick, self._fine_times, self._coarse_times]
+        return sum(a.buffer_info()[1] * a.itemsize for a in arrays) + self._slots * self._KEY_BYTES
+
+    def tracked(self):
+        """Return how many processes currently have a history slot."""
+        return len(self._index)
+
+
+class ProcessTree:
+    """Parent PID -> children index, kept up to date from DataFetcher's deltas.
+
+    Only processes that appeared, exited or were reparented touch the index,
+    so a tick costs what changed rather than a rebuild; keyframes are
+    reconciled against the index the same way. Written by DataFetcher, read
+    by the GUI.
+    """
+
+    def __init__(self):
+        self._parents = {}   # pid -> ppid
+        self._children = {}  # ppid -> set of child pids
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._parents)
+
+    def _link(self, pid, ppid):
+        old = self._parents.get(pid)
+        if old == ppid:
+            return
+        if old is not None:
+            self._unlink(pid)
+        self._parents[pid] = ppid
+        children = self._children.get(ppid)
+        if children is None:
+            children = self._children[ppid] = set()
+        children.add(pid)
+
+    def _unlink(self, pid):
+        ppid = self._parents.pop(pid, None)
+        if ppid is None:
+            return
+        children = self._children[ppid]
+        children.discard(pid)
+        if not children:
+            del self._children[ppid]
+
+    def apply_delta(self, delta):
+        """Update the index from one ProcessDelta (or keyframe)."""
+        with self._lock:
+            if delta.keyframe:
+                live = dict(zip(delta.snapshot.pids, delta.snapshot.ppids))
+                for pid in [pid for pid in self._parents if pid not in live]:
+                    self._unlink(pid)
+                for pid, ppid in live.items():
+                    self._link(pid, ppid)
+                return
+            for pid in delta.removed:
+                self._unlink(pid)
+            for pid, changes in delta.changed.items():
+                if 'ppids' in changes:
+                    self._link(pid, changes['ppids'])
+            added = delta.added
+            if added is not None:
+                for pid, ppid in zip(added.pids, added.ppids):
+                    self._link(pid, ppid)
+
+    def children(self, pid):
+        """Return the PIDs whose parent is `pid`."""
+        with self._lock:
+            return list(self._children.get(pid, ()))
+
+    def layout(self, snapshot):
+        """Return the TreeLayout of `snapshot` (one pass over its rows).
+
+        A row whose parent is not in `snapshot` (filtered out, or not visible
+        to us) becomes a root. The fetcher may be a tick ahead of `snapshot`;
+        PIDs missing from either side are skipped.
+        """
+        pids = snapshot.pids
+        row_of = {pid: i for i, pid in enumerate(pids)}
+        kids_of = [()] * len(pids)
+        with self._lock:
+            get_parent = self._parents.get
+            get_children = self._children.get
+            roots = [i for i, pid in enumerate(pids) if get_parent(pid, pid) == pid or get_parent(pid) not in row_of]
+            # Pre-order over every reachable row, recording each row's children
+            order = []
+            stack = list(roots)
+            while stack:
+                i = stack.pop()
+                order.append(i)
+                kids = get_children(pids[i])
+                if kids:
+                    # (a process that is its own parent, like PID 0 on some systems, is only a root)
+                    rows = [row_of[pid] for pid in kids if pid in row_of and row_of[pid] != i]
+                    kids_of[i] = rows
+                    stack.extend(rows)
+        return TreeLayout(snapshot, roots, kids_of, order)
+
+
+class TreeLayout:
+    """One snapshot arranged as a process tree, with subtree totals.
+
+    Built by ProcessTree.layout(); flatten() then produces the rows to show
+    for a set of collapsed PIDs without walking the hidden subtrees, so
+    expanding or collapsing does not redo the per-snapshot work.
+    """
+    TOTALS = ('cpu', 'rss', 'mem_percent', 'io_read', 'io_write')
+
+    def __init__(self, snapshot, roots, kids_of, order):
+        self.snapshot = snapshot
+        self.roots = roots
+        self.kids_of = kids_of
+        # Children come after their parent in pre-order, so one reverse pass sums every subtree
+        self.totals = {}
+        for column in self.TOTALS:
+            values = getattr(snapshot, column).tolist()
+            for i in reversed(order):
+                kids = kids_of[i]
+                if kids:
+                    values[i] += sum([values[r] for r in kids])
+            self.totals[column] = values
+
+    def flatten(self, collapsed=()):
+        """Return (view, depths, expandable) for the rows shown with `collapsed` PIDs folded.
+
+        `view` holds the shown rows in display order, parents before their
+        children and siblings by subtree RAM, with the TOTALS columns
+        replaced by subtree totals (collapsed descendants included).
+        """
+        pids = self.snapshot.pids
+        kids_of = self.kids_of
+        by_rss = self.totals['rss'].__getitem__
+        rows, depths, expandable = [], [], []
+        stack = [(i, 0) for i in sorted(self.roots, key=by_rss)]
+        while stack:
+            i, depth = stack.pop()
+            rows.append(i)
+            depths.append(depth)
+            kids = kids_of[i]
+            expandable.append(bool(kids))
+            if kids and pids[i] not in collapsed:
+                stack.extend((r, depth + 1) for r in sorted(kids, key=by_rss))
+        view = self.snapshot.take(rows)
+        for column in self.TOTALS:
+            values = self.totals[column]
+            setattr(view, column, array(getattr(view, column).typecode, [values[i] for i in rows]))
+        return view, depths, expandable
+
+
+class ProcessSearchIndex:
+    """Case-insensitive substring search over process name, user, command line and PID.
+
+    The searchable text of each process is lowercased once (and again when
+    its command line first arrives), so a keystroke costs one `in` test per
+    process instead of lowercasing every name again. Like ProcessTree, the
+    index is kept up to date from each delta, so a refresh only touches the
+    processes that started, exited or changed. It is built on the first
+    search and dropped by clear() when the search box empties. Digits also
+    match as a PID prefix, and a query that extends the previous one only
+    re-checks the processes that matched it.
+    """
+
+    def __init__(self):
+        self._texts = None  # pid -> lowercased "name\nuser\ncmdline"
+        self._query = None
+        self._matches = ()
+
+    @staticmethod
+    def _text(snapshot, i):
+        return f"{snapshot.names[i]}\n{snapshot.users[i]}\n{snapshot.cmdlines[i]}".lower()
+
+    def clear(self):
+        """Forget the index until the next search."""
+        self._texts = None
+        self._query = None
+        self._matches = ()
+
+    def apply_delta(self, delta, snapshot):
+        """Update the index from one ProcessDelta; `snapshot` is the receiver's copy with it applied."""
+        texts = self._texts
+        if texts is None:
+            return
+        if delta.keyframe:
+            self._build(snapshot)
+            return
+        text_of = self._text
+        touched = bool(delta.removed)
+        for pid in delta.removed:
+            texts.pop(pid, None)
+        for pid, changes in delta.changed.items():
+            # A new command line, or a reused PID (new name/user/start)
+            if 'cmdlines' in changes or 'names' in changes or 'users' in changes:
+                texts[pid] = text_of(snapshot, snapshot.index_of(pid))
+                touched = True
+        added = delta.added
+        if added is not None and len(added):
+            for i, pid in enumerate(added.pids):
+                texts[pid] = text_of(added, i)
+            touched = True
+        if touched:
+            self._query = None
+
+    def _build(self, snapshot):
+        text_of = self._text
+        self._texts = {pid: text_of(snapshot, i) for i, pid in enumerate(snapshot.pids)}
+        self._query = None
+
+    def matching_pids(self, snapshot, query):
+        """Return the set of PIDs whose name, user, command line or PID matches `query`."""
+        if self._texts is None:
+            self._build(snapshot)
+        query = query.lower()
+        previous = self._query
+        if previous is not None and query.startswith(previous):
+            candidates = self._matches
+        else:
+            candidates = self._texts.items()
+        matches = [(pid, text) for pid, text in candidates if query in text]
+        if query.isdigit():
+            matches.extend((pid, text) for pid, text in candidates
+                           if query not in text and str(pid).startswith(query))
+        self._query = query
+        self._matches = matches
+        return {pid for pid, _ in matches}
+
+
+class SortOrder:
+    """Row order of the process table by a user-chosen column, carried from one refresh to the next.
+
+    Each sort starts from the previous order (kept as PIDs), so rows that did
+    not move form long presorted runs that Python's sort merges in close to
+    linear time, and rows with equal values keep their places instead of
+    shuffling. Without a previous order (first sort, or the column just
+    changed) and when only the first `limit` rows can be on screen, those are
+    picked with a heap instead and the rest are left unordered until the next
+    refresh; `exact` is how many leading rows are in true order, and the GUI
+    re-sorts when the user scrolls past it.
+    """
+
+    def __init__(self, column='rss', descending=True):
+        self.column = column
+        self.descending = descending
+        self._pids = []
+        self.exact = 0
+
+    def set_column(self, column, descending):
+        self.column = column
+        self.descending = descending
+        self._pids = []
+
+    def order(self, snapshot, rows=None, limit=None):
+        """Return the rows of `snapshot` (all, or the given subset) in sort order."""
+        # Previous order first, then rows new since the last sort
+        fresh = not self._pids
+        seeded = snapshot.rows_of(self._pids)
+        if rows is None:
+            rows = range(len(snapshot))
+        else:
+            wanted = set(rows)
+            seeded = [row for row in seeded if row in wanted]
+        if len(seeded) != len(rows):
+            seen = set(seeded)
+            seeded.extend(row for row in rows if row not in seen)
+        key = getattr(snapshot, self.column).__getitem__
+        if fresh and limit is not None and limit * 4 < len(seeded):
+            pick = heapq.nlargest if self.descending else heapq.nsmallest
+            top = pick(limit, seeded, key=key)
+            chosen = set(top)
+            order = top + [row for row in seeded if row not in chosen]
+            self.exact = limit
+        else:
+            seeded.sort(key=key, reverse=self.descending)
+            order = seeded
+            self.exact = len(order)
+        self._pids = list(map(snapshot.pids.__getitem__, order))
+        return order
+
+
+class ProcessGroups:
+    """Processes aggregated under a key (executable, cgroup or user) in one pass over a snapshot.
+
+    `view` has one row per group, largest RAM first: the pid, user and start
+    of its biggest member, `label` as the name, the key as the command line,
+    and cpu, rss, mem_percent, io, threads, fd and PSS/USS/swap columns
+    summed over the members. `members[row]` maps each member PID to its name
+    and `identities[row]` to its ProcessIdentity.
+    """
+    SUMS = ('cpu', 'rss', 'mem_percent', 'io_read', 'io_write', 'threads', 'cpu_time')
+    # Columns where -1 marks "not sampled"; only sampled members are summed
+    SAMPLED_SUMS = ('fds', 'pss', 'uss', 'swap')
+
+    def __init__(self, snapshot, keys, labels):
+        slots = {}
+        first, members, identities, group_keys, group_labels = [], [], [], [], []
+        sums = {column: [] for column in self.SUMS}
+        columns = [(getattr(snapshot, column), sums[column]) for column in self.SUMS]
+        sampled = {column: [] for column in self.SAMPLED_SUMS}
+        sampled_columns = [(getattr(snapshot, column), sampled[column]) for column in self.SAMPLED_SUMS]
+        pids, names, starts, start_ticks = snapshot.pids, snapshot.names, snapshot.starts, snapshot.start_ticks
+        member_rss = snapshot.rss
+        for i, key in enumerate(keys):
+            g = slots.get(key)
+            if g is None:
+                g = slots[key] = len(first)
+                first.append(i)
+                members.append({})
+                identities.append({})
+                group_keys.append(key)
+                group_labels.append(labels[i])
+                for src, out in columns:
+                    out.append(src[i])
+                for src, out in sampled_columns:
+                    out.append(src[i])
+            else:
+                if member_rss[i] > member_rss[first[g]]:
+                    first[g] = i
+                for src, out in columns:
+                    out[g] += src[i]
+                for src, out in sampled_columns:
+                    value = src[i]
+                    if value >= 0:
+                        out[g] = value if out[g] < 0 else out[g] + value
+            members[g][pids[i]] = names[i]
+            identities[g][pids[i]] = ProcessIdentity(pids[i], starts[i], start_ticks[i])
+
+        rss = sums['rss']
+        order = sorted(range(len(first)), key=rss.__getitem__, reverse=True)
+        view = snapshot.take([first[g] for g in order])
+        for column in self.SUMS:
+            values = sums[column]
+            setattr(view, column, array(getattr(view, column).typecode, [values[g] for g in order]))
+        for column in self.SAMPLED_SUMS:
+            values = sampled[column]
+            setattr(view, column, array(getattr(view, column).typecode, [values[g] for g in order]))
+        view.names = [sys.intern(group_labels[g]) for g in order]
+        view.cmdlines = [str(group_keys[g]) for g in order]
+        view.ppids = array('q', [0]) * len(order)
+        self.view = view
+        self.members = [members[g] for g in order]
+        self.identities = [identities[g] for g in order]
+        self.keys = [group_keys[g] for g in order]
+
+    def __len__(self):
+        return len(self.members)
+
+    def take(self, rows):
+        """Keep only the given group rows, in that order."""
+        self.view = self.view.take(rows)
+        self.members = [self.members[g] for g in rows]
+        self.identities = [self.identities[g] for g in rows]
+        self.keys = [self.keys[g] for g in rows]
+
+    def apply_totals(self, totals, total_memory):
+        """Replace summed RAM, CPU and I/O with per-key totals from CgroupStats.sample(), then re-sort.
+
+        Values a key has no total for (None, or a key not in `totals`) keep
+        the sum over its member processes.
+        """
+        view = self.view
+        for g, key in enumerate(self.keys):
+            total = totals.get(key)
+            if total is None:
+                continue
+            memory, cpu, io_read, io_write = total
+            if memory is not None:
+                view.rss[g] = memory
+                view.mem_percent[g] = memory * 100.0 / total_memory if total_memory else 0.0
+            if cpu is not None:
+                view.cpu[g] = cpu
+            if io_read is not None:
+                view.io_read[g] = io_read
+                view.io_write[g] = io_write
+        self.take(sorted(range(len(self.keys)), key=view.rss.__getitem__, reverse=True))
+
+
+class AdaptivePollScheduler:
+    """Owns the refresh cadence of DataFetcher.
+
+    The base interval follows what the user can see: fast while the window is
+    focused and in use, slower when it is merely visible or the user has gone
+    idle, and slowest when minimized or occluded. On top of that the interval
+    is stretched whenever the collector's own CPU cost (smoothed over recent
+    cycles) would exceed `cpu_budget`, a fraction of one core.
+
+    Window state is written from the GUI thread and read by the fetcher thread;
+    every field is a single float/bool, so no locking is needed.
+    """
+
+    def __init__(self, focused_interval=1.0, visible_interval=2.0, idle_interval=4.0,
+                 hidden_interval=10.0, idle_after_sec=60.0, cpu_budget=0.05, max_interval=30.0):
+        self.focused_interval = focused_interval
+        self.visible_interval = visible_interval
+        self.idle_interval = idle_interval
+        self.hidden_interval = hidden_interval
+        self.idle_after_sec = idle_after_sec
+        self.cpu_budget = cpu_budget
+        self.max_interval = max_interval
+        self.visible = True
+        self.focused = True
+        self._last_activity = time.monotonic()
+        # Smoothed per-cycle collector cost (seconds)
+        self.cycle_cpu = 0.0
+        self.cycle_wall = 0.0
+        self.effective_interval = visible_interval
+
+    def set_window_state(self, visible, focused):
+        self.visible = visible
+        self.focused = focused
+
+    def note_user_activity(self):
+        self._last_activity = time.monotonic()
+
+    def is_idle(self):
+        return time.monotonic() - self._last_activity > self.idle_after_sec
+
+    def record_cycle(self, cpu_seconds, wall_seconds):
+        """Fold one collection cycle's cost into the moving average."""
+        if self.cycle_wall == 0.0:
+            self.cycle_cpu, self.cycle_wall = cpu_seconds, wall_seconds
+        else:
+            self.cycle_cpu += 0.3 * (cpu_seconds - self.cycle_cpu)
+            self.cycle_wall += 0.3 * (wall_seconds - self.cycle_wall)
+
+    def collector_load(self):
+        """Return the collector's CPU use as a fraction of one core at the current rate."""
+        return self.cycle_cpu / max(self.effective_interval, 1e-6)
+
+    def next_interval(self):
+        """Return how long the fetcher should sleep before the next cycle."""
+        if not self.visible:
+            interval = self.hidden_interval
+        elif self.is_idle():
+            interval = self.idle_interval
+        elif self.focused:
+            interval = self.focused_interval
+        else:
+            interval = self.visible_interval
+        # Back off so that collection stays within its CPU budget
+        if self.cpu_budget > 0:
+            interval = max(interval, self.cycle_cpu / self.cpu_budget)
+        self.effective_interval = min(interval, self.max_interval)
+        return self.effective_interval
+
+
+class UserActivityMonitor(QObject):
+    """Application-wide event filter that timestamps user input for the poll scheduler."""
+    _INPUT_EVENTS = frozenset((QEvent.KeyPress, QEvent.MouseButtonPress, QEvent.MouseMove, QEvent.Wheel))
+
+    def __init__(self, scheduler, parent=None):
+        super().__init__(parent)
+        self.scheduler = scheduler
+
+    def eventFilter(self, source, event):
+        if event.type() in self._INPUT_EVENTS:
+            self.scheduler.note_user_activity()
+        return False
+
+
+class DataFetcher(QThread):
+    """Persistent background thread that polls system data at the cadence set by an AdaptivePollScheduler.
+
+    Emits `data_ready` with (mem_info, ProcessDelta). The first emission and
+    every `keyframe_interval`-th one after it are keyframes carrying a full
+    snapshot; the rest only describe what changed since the previous cycle.
+    """
+    data_ready = pyqtSignal(dict, object)
+
+    # With process events, how often /proc is still listed in full to catch anything missed
+    RESYNC_INTERVAL = 30.0
+    # Wait this long after a process event so a fork and the exec that follows arrive together
+    EVENT_COALESCE = 0.02
+    # Emit at most one event patch per this many seconds, however fast processes churn
+    EVENT_MIN_INTERVAL = 0.1
+
+    def __init__(self, scheduler=None, backend=None, ring_path=DEFAULT_RING_PATH,
+                 recorder=None, replay=None, replay_speed=1.0):
+        super().__init__()
+        self.scheduler = scheduler or AdaptivePollScheduler()
+        self.total_memory = psutil.virtual_memory().total
+        self._stop_event = threading.Event()
+        self._immediate_event = threading.Event()
+        # Per-metric sampling cadences (threads, fds, cmdline)
+        self.sampling = SamplingPlan()
+        # Pluggable process collector (/proc parser on Linux, psutil elsewhere)
+        if backend is None:
+            backend = load_collector_backend()
+        self.collector = create_collector(backend, self.total_memory, load_collector_workers())
+        # Delta emission: last collected snapshot and periodic keyframe resync
+        self.keyframe_interval = 15
+        self._previous_snapshot = None
+        self._seq = 0
+        self._cycles_since_keyframe = 0
+        self._keyframe_requested = False
+        # Shared snapshots from a `--daemon` collector, used instead of collecting when available
+        self.ring_path = ring_path
+        self.ring_reader = None
+        self._ring_retry_at = 0.0
+        # Recent per-process CPU/RSS/IO for graphs and tooltips
+        self.history = HistoryStore(max_bytes=load_history_max_mb() * 1048576)
+        # Parent -> children index for the tree view, updated from each delta
+        self.tree = ProcessTree()
+        # Optional on-disk recording of every cycle, or replay of one instead of live data
+        self.recorder = recorder
+        self.replay = replay
+        self.replay_speed = replay_speed
+        # While grouping by cgroup, each process's cgroup path is resolved here (never on
+        # the GUI thread), plus kernel-side per-cgroup totals where cgroup v2 provides them
+        self.group_by_cgroup = False
+        self.cgroup_stats = None
+        self.replay_time = None
+        self._replay_frame = None
+        self._replay_due = 0.0
+        # Process start/exec/exit events from the kernel, where permitted: between ticks
+        # the new processes are read and emitted at once, and /proc is only listed to resync.
+        # Subscribed only while collecting locally (not while a daemon ring or replay feeds us)
+        self.proc_events = None
+        self._events_wanted = replay is None and hasattr(self.collector, 'collect_new') and load_process_events()
+        self._resync_at = 0.0
+        self._fetch_requested = False
+        self._local = False  # whether the previous cycle collected in this process
+        self._last_mem_info = {}
+        self._last_ages = {}
+        self._last_cgroup_totals = None
+        # Time of the last event patch, and what patches cost since the last full cycle
+        self._last_patch = 0.0
+        self._event_cpu = 0.0
+        self._event_wall = 0.0
+
+    def trigger_fetch(self):
+        """Trigger an immediate fetch outside the regular interval."""
+        self._fetch_requested = True
+        self._immediate_event.set()
+
+    def request_keyframe(self):
+        """Ask for the next emission to be a full keyframe (e.g. after a receiver lost sync)."""
+        self._keyframe_requested = True
+
+    def set_priority_pids(self, pids):
+        """Set the visible/selected PIDs whose expensive metrics are kept freshest."""
+        self.sampling.set_priority_pids(pids)
+
+    def set_group_by_cgroup(self, enabled):
+        """Start or stop resolving cgroup paths (and reading per-cgroup totals) each cycle."""
+        self.group_by_cgroup = enabled
+        if not enabled:
+            self.cgroup_stats = None
+        elif self.cgroup_stats is None:
+            stats = CgroupStats()
+            self.cgroup_stats = stats if stats.root is not None else None
+
+    def _resolve_cgroups(self, snapshot):
+        """Resolve the cgroup path of every process in the snapshot and return the set of paths."""
+        get_meta = self.collector.metadata.get
+        paths = set()
+        for pid, start in zip(snapshot.pids, snapshot.starts):
+            meta = get_meta(pid, start)
+            if meta is not None:
+                # Read once per process lifetime; the GUI only reads the cached value
+                paths.add(meta.cgroup_path(pid))
+        paths.discard('')
+        return paths
+
+    def _sample_cgroups(self, snapshot):
+        """While grouping by cgroup, resolve paths and read totals for every cgroup in the snapshot."""
+        if not self.group_by_cgroup:
+            return None
+        paths = self._resolve_cgroups(snapshot)
+        stats = self.cgroup_stats
+        return stats.sample(paths) if stats is not None else None
+
+    def set_search_active(self, active):
+        """While a search is active, read command lines for every process so they can be matched.
+
+        A command line is read once per process lifetime, so this only costs
+        one read per process that has not been shown yet.
+        """
+        self.sampling.tiers['cmdline'].priority_only = not active
+
+    def set_memory_details(self, enabled):
+        """Turn budgeted PSS/USS/swap sampling on or off."""
+        self.sampling.smaps_budget = load_smaps_budget_ms() / 1000.0 if enabled else 0.0
+
+    def stop(self):
+        self._stop_event.set()
+        self._immediate_event.set()
+
+    def _make_delta(self, snapshot):
+        """Build the delta (or keyframe) for this cycle and remember the snapshot."""
+        previous = self._previous_snapshot
+        base_seq = self._seq
+        self._seq += 1
+        if (previous is None or self._keyframe_requested
+                or self._cycles_since_keyframe >= self.keyframe_interval):
+            self._keyframe_requested = False
+            self._cycles_since_keyframe = 0
+            # Receivers patch their copy in place, so never hand out the fetcher's own snapshot
+            delta = ProcessDelta(self._seq, snapshot=snapshot.copy())
+        else:
+            self._cycles_since_keyframe += 1
+            delta = snapshot.diff(previous, self._seq, base_seq)
+        self._previous_snapshot = snapshot
+        return delta
+
+    def run(self):
+        while not self._stop_event.is_set():
+            wall_start = time.perf_counter()
+            cpu_start = time.thread_time()
+            self._fetch_requested = False
+            try:
+                shared = self._read_replay() if self.replay is not None else self._read_ring()
+                self._follow_process_events(shared is None)
+                if shared is not None:
+                    snapshot, mem_info, ages = shared
+                else:
+                    mem_info = collect_mem_info()
+                    self.sampling.begin_tick()
+                    snapshot = self._collect()
+                    self.sampling.end_tick()
+                    ages = self.sampling.ages()
+                self._local = shared is None
+                if snapshot is not None:
+                    self.history.record(snapshot, mem_info)
+                    delta = self._make_delta(snapshot)
+                    delta.sample_ages = ages
+                    if shared is None:
+                        delta.cgroup_totals = self._sample_cgroups(snapshot)
+                    self.tree.apply_delta(delta)
+                    if self.recorder is not None:
+                        self.recorder.record(time.time(), mem_info, delta, ages)
+                    self._last_mem_info, self._last_ages = mem_info, ages
+                    self._last_cgroup_totals = delta.cgroup_totals
+                    # Emit data to UI thread
+                    self.data_ready.emit(mem_info, delta)
+            except Exception as e:
+                print(f"Error in DataFetcher run loop: {e}")
+            finally:
+                # Event patches since the last cycle count against the same CPU budget
+                self.scheduler.record_cycle(time.thread_time() - cpu_start + self._event_cpu,
+                                            time.perf_counter() - wall_start + self._event_wall)
+                self._event_cpu = self._event_wall = 0.0
+
+            # Wait for the scheduled interval or immediate trigger or stop
+            if self._stop_event.is_set():
+                break
+            if self.replay is not None and self._replay_due != float('inf'):
+                interval = max(0.0, self._replay_due - time.monotonic())
+            else:
+                interval = self.scheduler.next_interval()
+            deadline = time.monotonic() + interval
+            while self._immediate_event.wait(max(0.0, deadline - time.monotonic())):
+                self._immediate_event.clear()
+                if self._fetch_requested or self._stop_event.is_set() or self.proc_events is None:
+                    break
+                # Woken by process events: patch them in and keep waiting for the tick
+                self._patch_from_events()
+
+        if self.proc_events is not None:
+            self.proc_events.close()
+        # Release collector worker threads, if any
+        close = getattr(self.collector, 'close', None)
+        if close is not None:
+            close()
+        if self.ring_reader is not None:
+            self.ring_reader.close()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.replay is not None:
+            self.replay.close()
+
+    def _follow_process_events(self, local):
+        """Subscribe to process events while collecting locally; unsubscribe while another source feeds us."""
+        if not local:
+            if self.proc_events is not None:
+                self.proc_events.close()
+                self.proc_events = None
+            return
+        if self.proc_events is None and self._events_wanted:
+            try:
+                self.proc_events = ProcEventStream(self._immediate_event.set)
+            except OSError:
+                self._events_wanted = False  # not permitted: keep polling
+                return
+            # Events before the subscription were missed, so list /proc in full first
+            self._resync_at = 0.0
+
+    def _collect(self):
+        """Collect every process; with process events, from the process set they keep current."""
+        events = self.proc_events
+        previous = self._previous_snapshot
+        if events is None or previous is None or not self._local:
+            return self.collector.collect(self.sampling)
+        started, exited, execed, overflowed = events.take()
+        forget_execs(self.collector, previous, execed)
+        now = time.monotonic()
+        if overflowed or now >= self._resync_at:
+            self._resync_at = now + self.RESYNC_INTERVAL
+            return self.collector.collect(self.sampling)
+        pids = set(previous.pids)
+        pids -= exited
+        pids |= started
+        return self.collector.collect(self.sampling, sorted(pids))
+
+    def _patch_from_events(self):
+        """Emit a delta for processes that started, exec'd or exited since the last cycle, reading only those."""
+        delay = max(self.EVENT_COALESCE, self._last_patch + self.EVENT_MIN_INTERVAL - time.monotonic())
+        if self._stop_event.wait(delay) or self._fetch_requested:
+            return  # a full cycle is due anyway and takes the pending events
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            self._emit_event_patch()
+        finally:
+            self._last_patch = time.monotonic()
+            self._event_cpu += time.thread_time() - cpu_start
+            self._event_wall += time.perf_counter() - wall_start
+
+    def _emit_event_patch(self):
+        previous = self._previous_snapshot
+        if previous is None or not self._local:
+            return
+        started, exited, execed, overflowed = self.proc_events.take()
+        if overflowed:
+            # The kernel dropped events: list /proc in full right away
+            self._resync_at = 0.0
+            self.trigger_fetch()
+            return
+        if not (started or exited or execed):
+            return
+        try:
+            delta = collect_changes(self.collector, self.sampling, previous, started, exited, execed)
+        except Exception as e:
+            print(f"Error applying process events: {e}")
+            self._resync_at = 0.0
+            self.request_keyframe()
+            self.trigger_fetch()
+            return
+        if not (delta.has_membership_changes() or delta.changed):
+            return
+        if self.group_by_cgroup and delta.added is not None:
+            self._resolve_cgroups(delta.added)
+        delta.base_seq = self._seq
+        self._seq += 1
+        delta.seq = self._seq
+        delta.sample_ages = self._last_ages
+        delta.cgroup_totals = self._last_cgroup_totals
+        self.tree.apply_delta(delta)
+        if self.recorder is not None:
+            self.recorder.record(time.time(), self._last_mem_info, delta, self._last_ages)
+        self.data_ready.emit(self._last_mem_info, delta)
+
+    def _read_replay(self):
+        """Return (snapshot, mem_info, ages) for the next recorded frame, at the recorded pace.
+
+        Woken early (refresh or resync request) or past the end, it returns the
+        current frame again only if a keyframe is needed, so playback never skips.
+        """
+        now = time.monotonic()
+        if now >= self._replay_due:
+            frame = self.replay.next()
+            if frame is not None:
+                timestamp, snapshot, meta = frame
+                delay = self.replay.next_delay()
+                self._replay_due = now + delay / self.replay_speed if delay is not None else float('inf')
+                self.replay_time = timestamp
+                self._replay_frame = (snapshot, meta['mem_info'], meta.get('ages', {}))
+                return self._replay_frame
+            self._replay_due = float('inf')
+        if self._keyframe_requested and self._replay_frame is not None:
+            return self._replay_frame
+        return None, None, None
+
+    def _read_ring(self):
+        """Return (snapshot, mem_info, ages) from a live daemon, or None to collect locally.
+
+        snapshot is None when the daemon is alive but has not published since
+        the last read, so there is nothing to emit this cycle.
+        """
+        reader = self.ring_reader
+        if reader is None:
+            now = time.monotonic()
+            if not self.ring_path or now < self._ring_retry_at or not os.path.exists(self.ring_path):
+                return None
+            self._ring_retry_at = now + 5.0
+            try:
+                reader = SnapshotRingReader(self.ring_path)
+            except (OSError, ValueError):
+                return None
+            self.ring_reader = reader
+            self.request_keyframe()
+        if not reader.alive():
+            # Daemon stopped: fall back to collecting in this process
+            reader.close()
+            self.ring_reader = None
+            self.request_keyframe()
+            return None
+        result = reader.read()
+        if result is None:
+            return None, None, None
+        _, snapshot, meta = result
+        return snapshot, meta['mem_info'], meta.get('ages', {})
+
+
+# A process as shown in the table: its PID plus its start time (epoch seconds, and
+# clock ticks since boot where /proc provides them), which tells it apart from a
+# later process that reuses the PID. start is None when the PID is not (or no
+# longer) in the snapshot.
+ProcessIdentity = namedtuple('ProcessIdentity', 'pid start ticks', defaults=(0,))
+
+
+class ProcessHandle:
+    """A live process pinned to a ProcessIdentity.
+
+    Where the kernel supports it (Linux 5.3+), open() takes a pidfd first and
+    only then checks the start time (the exact tick count from /proc where
+    known, else psutil's create time, which other platforms report from an
+    absolute kernel clock), so once open() succeeds the pidfd refers
+    to exactly the identified process: signals sent through it can never
+    reach a process that reused the PID, and it becomes readable when the
+    process exits. Elsewhere the handle wraps a psutil.Process, which checks
+    for PID reuse itself before signalling. open() raises
+    psutil.NoSuchProcess if the process exited or the PID now belongs to a
+    different process.
+    """
+    PIDFD_AVAILABLE = hasattr(os, 'pidfd_open') and hasattr(signal, 'pidfd_send_signal')
+
+    __slots__ = ('identity', 'pid', 'proc', 'fd')
+
+    def __init__(self, identity, proc, fd):
+        self.identity = identity
+        self.pid = identity.pid
+        self.proc = proc
+        self.fd = fd
+
+    @classmethod
+    def open(cls, identity):
+        pid, start, ticks = identity
+        if start is None:
+            raise psutil.NoSuchProcess(pid)
+        fd = None
+        if cls.PIDFD_AVAILABLE:
+            try:
+                fd = os.pidfd_open(pid)
+            except ProcessLookupError:
+                raise psutil.NoSuchProcess(pid)
+            except OSError:
+                fd = None  # old kernel or out of descriptors: fall back to psutil
+        try:
+            proc = psutil.Process(pid)
+            current = read_start_ticks(pid) if ticks else 0
+            if (current != ticks) if current else (proc.create_time() != start):
+                raise psutil.NoSuchProcess(pid)  # PID reused
+        except Exception:
+            if fd is not None:
+                os.close(fd)
+            raise
+        return cls(identity, proc, fd)
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def send_signal(self, sig):
+        if self.fd is None:
+            self.proc.send_signal(sig)
+            return
+        try:
+            signal.pidfd_send_signal(self.fd, sig)
+        except ProcessLookupError:
+            raise psutil.NoSuchProcess(self.pid)
+        except PermissionError:
+            raise psutil.AccessDenied(self.pid)
+
+    def terminate(self):
+        if self.fd is None:
+            self.proc.terminate()
+        else:
+            self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        if self.fd is None:
+            self.proc.kill()
+        else:
+            self.send_signal(signal.SIGKILL)
+
+    def exited(self):
+        """Return True if the process is gone or a zombie its (foreign) parent has not reaped yet."""
+        if self.fd is not None:
+            return bool(select.select([self.fd], [], [], 0)[0])
+        try:
+            return not self.proc.is_running() or self.proc.status() == psutil.STATUS_ZOMBIE
+        except psutil.NoSuchProcess:
+            return True
+        except psutil.Error:
+            return False
+
+    def exe(self):
+        """Return the executable path, checked to belong to this process."""
+        exe = self.proc.exe()
+        if self.exited():
+            raise psutil.NoSuchProcess(self.pid)
+        return exe
+
+    @staticmethod
+    def wait(handles, timeout, callback):
+        """Wait up to `timeout` seconds for handles to exit, calling callback(handle) as each does.
+
+        pidfds are waited on with poll(), so exits are seen the moment they
+        happen; handles without one are polled every 50 ms. Returns the
+        handles still running.
+        """
+        by_fd = {handle.fd: handle for handle in handles if handle.fd is not None}
+        polled = [handle for handle in handles if handle.fd is None]
+        poller = None
+        if by_fd:
+            poller = select.poll()
+            for fd in by_fd:
+                poller.register(fd, select.POLLIN)
+        deadline = time.monotonic() + timeout
+        wait = 0.0
+        while True:
+            if poller is not None:
+                for fd, _ in poller.poll(wait * 1000):
+                    poller.unregister(fd)
+                    callback(by_fd.pop(fd))
+            elif wait:
+                time.sleep(wait)
+            for handle in [handle for handle in polled if handle.exited()]:
+                polled.remove(handle)
+                callback(handle)
+            remaining = deadline - time.monotonic()
+            if not (by_fd or polled) or remaining <= 0:
+                return list(by_fd.values()) + polled
+            wait = min(remaining, 0.05) if polled else remaining
+
+
+class ProcessWatcher(QObject):
+    """Emits `exited` when a watched process exits, without polling.
+
+    Keeps a pidfd per watched identity, each with a QSocketNotifier on the
+    GUI event loop. Used for the selected rows so that a selected process
+    that exits is noticed at once instead of on the next refresh. Only the
+    first WATCH_LIMIT identities are watched, to bound descriptor use.
+    """
+    exited = pyqtSignal(int)  # pid
+
+    WATCH_LIMIT = 64
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._watched = {}  # identity -> (handle, notifier)
+
+    def watch(self, identities):
+        """Watch exactly `identities` (an iterable of ProcessIdentity)."""
+        wanted = set()
+        if ProcessHandle.PIDFD_AVAILABLE:
+            for identity in identities:
+                if len(wanted) >= self.WATCH_LIMIT:
+                    break
+                wanted.add(identity)
+        for identity in [identity for identity in self._watched if identity not in wanted]:
+            self._unwatch(identity)
+        for identity in wanted:
+            if identity in self._watched:
+                continue
+            try:
+                handle = ProcessHandle.open(identity)
+            except psutil.NoSuchProcess:
+                self.exited.emit(identity.pid)
+                continue
+            except psutil.Error:
+                continue
+            if handle.fd is None:
+                continue
+            notifier = QSocketNotifier(handle.fd, QSocketNotifier.Read, self)
+            notifier.activated.connect(lambda _, identity=identity: self._on_exit(identity))
+            self._watched[identity] = (handle, notifier)
+
+    def close(self):
+        for identity in list(self._watched):
+            self._unwatch(identity)
+
+    def _on_exit(self, identity):
+        self._unwatch(identity)
+        self.exited.emit(identity.pid)
+
+    def _unwatch(self, identity):
+        handle, notifier = self._watched.pop(identity)
+        notifier.setEnabled(False)
+        notifier.deleteLater()
+        handle.close()
+
+
+class KillEngine(QObject):
+    """Signals a batch of processes and confirms that they exited, off the GUI thread.
+
+    Each request is one job on a small thread pool. Targets are
+    ProcessIdentity keys, opened as ProcessHandles, so a PID that was reused
+    since the table was drawn is reported GONE instead of being signalled.
+    The signal goes to every process first, then ProcessHandle.wait() waits
+    on all of them at once (on pidfd readiness where available), so a batch
+    of any size costs one grace period rather than one round-trip per
+    process. With `escalate`, processes still alive after the grace period
+    are force-killed. `result` is emitted for each PID as soon as its
+    outcome is known, and `finished` once per job with every outcome.
+    """
+    result = pyqtSignal(int, str, str)  # pid, name, outcome
+    finished = pyqtSignal(dict)         # {pid: (name, outcome)}
+
+    # Outcomes
+    EXITED = 'exited'    # exited after the signal
+    KILLED = 'killed'    # force-killed after the grace period
+    GONE = 'gone'        # had already exited (or its PID was reused)
+    SENT = 'sent'        # signal delivered; not one that ends the process
+    ALIVE = 'alive'      # still running after the signal (and any escalation)
+    DENIED = 'denied'    # permission denied
+    FAILED = 'failed'
+
+    # Signals after which the engine waits for the process to exit
+    EXIT_SIGNALS = frozenset(getattr(signal, name) for name in ('SIGTERM', 'SIGINT', 'SIGQUIT', 'SIGKILL')
+                             if hasattr(signal, name))
+    # Time to wait for the kernel to reap force-killed processes
+    KILL_WAIT = 2.0
+
+    def __init__(self, grace=3.0, parent=None):
+        super().__init__(parent)
+        self.grace = grace
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='kill')
+
+    def submit(self, targets, sig=signal.SIGTERM, escalate=True):
+        """Queue a job signalling every {ProcessIdentity: name} in `targets`."""
+        self._executor.submit(self._run, dict(targets), sig, escalate)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    @staticmethod
+    def _send(handle, sig):
+        if sig == signal.SIGTERM:
+            handle.terminate()
+        elif sig == getattr(signal, 'SIGKILL', None):
+            handle.kill()
+        else:
+            handle.send_signal(sig)
+
+    def _run(self, targets, sig, escalate):
+        outcomes = {}
+        opened = []
+
+        def report(identity, outcome):
+            outcomes[identity.pid] = (targets[identity], outcome)
+            self.result.emit(identity.pid, targets[identity], outcome)
+
+        try:
+            # Signal the whole batch before waiting on any of it
+            sent = []
+            for identity in targets:
+                try:
+                    handle = ProcessHandle.open(identity)
+                    opened.append(handle)
+                    self._send(handle, sig)
+                    sent.append(handle)
+                except psutil.NoSuchProcess:
+                    report(identity, self.GONE)
+                except psutil.AccessDenied:
+                    report(identity, self.DENIED)
+                except Exception as e:
+                    print(f"Error signalling PID {identity.pid}: {e}")
+                    report(identity, self.FAILED)
+            if sig not in self.EXIT_SIGNALS:
+                for handle in sent:
+                    report(handle.identity, self.SENT)
+                return
+            alive = ProcessHandle.wait(sent, self.grace, lambda handle: report(handle.identity, self.EXITED))
+            if alive and escalate and sig != getattr(signal, 'SIGKILL', None):
+                killed = []
+                for handle in alive:
+                    try:
+                        handle.kill()
+                        killed.append(handle)
+                    except psutil.NoSuchProcess:
+                        report(handle.identity, self.EXITED)
+                    except psutil.AccessDenied:
+                        report(handle.identity, self.DENIED)
+                alive = ProcessHandle.wait(killed, self.KILL_WAIT,
+                                           lambda handle: report(handle.identity, self.KILLED))
+            for handle in alive:
+                report(handle.identity, self.ALIVE)
+        except Exception as e:
+            print(f"Error in kill engine: {e}")
+        finally:
+            for handle in opened:
+                handle.close()
+            self.finished.emit(outcomes)
+
 
-    Emits `data_ready` with (mem_info, processes).
+class ProcessTableModel(QAbstractTableModel):
+    """Table model backed directly by a ProcessSnapshot.
+
+    No per-cell objects are created: data() formats only the cells the view
+    asks for, which is just the visible rows, so refresh cost is independent
+    of how many processes are in the snapshot.
     """
-    data_ready = pyqtSignal(dict, list)
+    HEADERS = ['PID', 'User', 'Process Name', 'CPU (%)', 'RAM (MB)', 'RAM (%)', 'Read (MB/s)', 'Write (MB/s)',
+               'PSS (MB)', 'USS (MB)', 'Swap (MB)']
+    # Sampling tier behind each column, for the header staleness tooltips
+    COLUMN_TIERS = {2: 'cmdline', 8: 'smaps', 9: 'smaps', 10: 'smaps'}
+    # Optional columns, hidden unless memory details are enabled
+    MEMORY_DETAIL_COLUMNS = (8, 9, 10)
+    # Snapshot column each table column sorts by, and whether its first click sorts descending
+    SORT_COLUMNS = ('pids', 'users', 'names', 'cpu', 'rss', 'rss', 'io_read', 'io_write', 'pss', 'uss', 'swap')
+    SORT_DESCENDING = (False, False, False, True, True, True, True, True, True, True, True)
+    _MEMORY_DETAIL_FIELDS = {8: 'pss', 9: 'uss', 10: 'swap'}
 
-    def __init__(self, interval_sec=4.0):
-        super().__init__()
-        self.interval = float(interval_sec)
-        self.process_cache = {}
-        self.total_memory = psutil.virtual_memory().total
-        self._stop_event = threading.Event()
-        self._immediate_event = threading.Event()
-        # CPU sampling: sample every N cycles
-        self._cpu_sample_rate = 4
-        self._cpu_sample_counter = 0
-        # Whether we've performed an initial cpu_percent() warm-up pass
-        self._cpu_initialized = False
-        # Disk IO sampling threshold (MB)
-        self._disk_io_threshold_mb = 50
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.snapshot = ProcessSnapshot()
+        self.sample_ages = {}
+        self.history = None
+        # Tree layout of the current snapshot (per-row depth and has-children), None in flat mode
+        self.tree_depths = None
+        self.tree_expandable = None
+        self.collapsed = set()
+        # Group mode: {pid: name} of each row's members, None otherwise
+        self.group_members = None
+        self.group_identities = None
+        self._brush_high = QBrush(QColor(255, 200, 0, 50))
+        self._brush_med = QBrush(QColor(255, 200, 0, 30))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.snapshot)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation != Qt.Horizontal:
+            return None
+        if role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        if role == Qt.ToolTipRole:
+            tier = self.COLUMN_TIERS.get(section)
+            if tier is None:
+                return "Sampled every refresh"
+            age = self.sample_ages.get(tier)
+            if age is None:
+                return "Not sampled yet"
+            if tier == 'smaps':
+                # Round-robin tier: the age is how long one pass over every process takes
+                return f"Every process refreshed within {age:.1f} s; visible rows first"
+            return f"Sampled {age:.1f} s ago"
+        return None
+
+    def set_sample_ages(self, ages):
+        """Update the per-tier staleness shown in the header and name tooltips."""
+        self.sample_ages = ages
+
+    def _age_note(self, tier):
+        """Return how stale a tier's values are, as a suffix for the name tooltip."""
+        age = self.sample_ages.get(tier)
+        return " (not sampled yet)" if age is None else f" (sampled {age:.1f} s ago)"
+
+    def flags(self, index):
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled
+
+    def data(self, index, role=Qt.DisplayRole):
+        row = index.row()
+        snapshot = self.snapshot
+        if role == Qt.DisplayRole:
+            col = index.column()
+            if self.group_members is not None and col in (0, 2):
+                count = len(self.group_members[row])
+                if col == 0:
+                    return str(snapshot.pids[row]) if count == 1 else ''
+                return f"{snapshot.names[row]} ({count})"
+            if col == 0:
+                return str(snapshot.pids[row])
+            if col == 1:
+                return snapshot.users[row]
+            if col == 2:
+                if self.tree_depths is not None:
+                    if not self.tree_expandable[row]:
+                        marker = '   '
+                    elif snapshot.pids[row] in self.collapsed:
+                        marker = '▸ '
+                    else:
+                        marker = '▾ '
+                    return '    ' * self.tree_depths[row] + marker + snapshot.names[row]
+                return snapshot.names[row]
+            if col == 3:
+                return f"{max(0.01, snapshot.cpu[row]):.1f}"
+            if col == 4:
+                return f"{snapshot.rss[row] / 1048576:.1f}"
+            if col == 5:
+                return f"{snapshot.mem_percent[row]:.1f}"
+            if col == 6:
+                return f"{snapshot.io_read[row]:.2f}"
+            if col == 7:
+                return f"{snapshot.io_write[row]:.2f}"
+            field = self._MEMORY_DETAIL_FIELDS.get(col)
+            if field is not None:
+                value = getattr(snapshot, field)[row]
+                return f"{value / 1048576:.1f}" if value >= 0 else '–'
+        elif role == Qt.BackgroundRole:
+            # Highlight heavy memory users
+            mem_percent = snapshot.mem_percent[row]
+            if mem_percent > 10:
+                return self._brush_high
+            if mem_percent > 5:
+                return self._brush_med
+        elif role == Qt.TextAlignmentRole:
+            if index.column() == 1:
+                return Qt.AlignCenter
+        elif role == Qt.ToolTipRole:
+            if index.column() == 2 and self.group_members is not None:
+                fds = snapshot.fds[row]
+                return "\n".join([snapshot.cmdlines[row],
+                                  f"Processes: {len(self.group_members[row])}",
+                                  f"Threads: {snapshot.threads[row]}{self._age_note('threads')}",
+                                  f"Open files: {fds if fds >= 0 else 'n/a'}{self._age_note('fds')}"])
+            if index.column() == 2:
+                fds = snapshot.fds[row]
+                cmdline = snapshot.cmdlines[row] or snapshot.names[row]
+                if len(cmdline) > 300:
+                    cmdline = cmdline[:300] + '…'
+                lines = [cmdline,
+                         f"Threads: {snapshot.threads[row]}{self._age_note('threads')}",
+                         f"Open files: {fds if fds >= 0 else 'n/a'}{self._age_note('fds')}"]
+                if self.history is not None:
+                    times, cpu = self.history.series(snapshot.pids[row], snapshot.starts[row], 'cpu')
+                    if len(cpu) > 1:
+                        lines.append(f"CPU over last {times[-1] - times[0]:.0f}s: "
+                                     f"avg {sum(cpu) / len(cpu):.1f}%, peak {max(cpu):.1f}%")
+                return "\n".join(lines)
+        return None
+
+    def pid_at(self, row):
+        """Return the PID shown in the given row."""
+        return self.snapshot.pids[row]
+
+    def row_of(self, pid):
+        """Return the row showing pid, or -1 (via the snapshot's pid index, built once per snapshot)."""
+        return self.snapshot.index_of(pid)
+
+    def set_snapshot(self, snapshot, tree=None, groups=None):
+        """Swap in a new snapshot, emitting only row-count and data-changed signals.
+
+        `tree` is the (depths, expandable) layout from TreeLayout.flatten() in tree mode;
+        `groups` the ProcessGroups the rows were built from in group mode.
+        """
+        self.tree_depths, self.tree_expandable = tree if tree is not None else (None, None)
+        self.group_members = groups.members if groups is not None else None
+        self.group_identities = groups.identities if groups is not None else None
+        old_count = len(self.snapshot)
+        new_count = len(snapshot)
+        if new_count > old_count:
+            self.beginInsertRows(QModelIndex(), old_count, new_count - 1)
+            self.snapshot = snapshot
+            self.endInsertRows()
+        elif new_count < old_count:
+            self.beginRemoveRows(QModelIndex(), new_count, old_count - 1)
+            self.snapshot = snapshot
+            self.endRemoveRows()
+        else:
+            self.snapshot = snapshot
+        if new_count:
+            self.dataChanged.emit(self.index(0, 0), self.index(new_count - 1, len(self.HEADERS) - 1))
 
-    def trigger_fetch(self):
-        """Trigger an immediate fetch outside the regular interval."""
-        self._immediate_event.set()
+    def rows_changed(self, rows):
+        """Notify views that the given rows were patched in place."""
+        last_col = len(self.HEADERS) - 1
+        for row in rows:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, last_col))
 
-    def stop(self):
-        self._stop_event.set()
-        self._immediate_event.set()
 
-    def run(self):
-        while not self._stop_event.is_set():
-            try:
-                mem = psutil.virtual_memory()
-                gb_divisor = 1073741824
-                mem_info = {
-                    'total': round(mem.total / gb_divisor, 2),
-                    'used': round(mem.used / gb_divisor, 2),
-                    'available': round(mem.available / gb_divisor, 2),
-                    'percent': round(mem.percent, 1)
-                }
-
-                processes = []
-                do_cpu_sample = (self._cpu_sample_counter == 0)
-
-                for proc in psutil.process_iter(['pid', 'name', 'memory_info', 'username']):
-                    try:
-                        with proc.oneshot():
-                            pid = proc.pid
-                            pinfo = proc.as_dict(attrs=['pid', 'name', 'memory_info', 'username'])
-                            rss = pinfo['memory_info'].rss
-                            memory_mb = round(rss / 1048576, 1)
-
-                            cpu_percent = 0.0
-                            try:
-                                if do_cpu_sample:
-                                    # Use interval=None to get non-blocking percent compared to last call.
-                                    # On the very first sampling pass we must "warm up" the counters
-                                    # by calling cpu_percent once (it will return 0.0). Subsequent
-                                    # calls with interval=None return meaningful percentages.
-                                    if not self._cpu_initialized:
-                                        proc.cpu_percent(interval=None)
-                                        self.process_cache[pid] = 0.0
-                                    else:
-                                        cpu_percent = proc.cpu_percent(interval=None)
-                                        # store last seen value in cache for use between sample cycles
-                                        self.process_cache[pid] = float(cpu_percent)
-                                else:
-                                    cpu_percent = float(self.process_cache.get(pid, 0.0))
-                            except (psutil.AccessDenied, psutil.NoSuchProcess):
-                                cpu_percent = 0.0
-
-                            disk_mb = 0.0
-                            if memory_mb > self._disk_io_threshold_mb:
-                                try:
-                                    io = proc.io_counters()
-                                    disk_mb = round((io.read_bytes + io.write_bytes) / 1048576, 1)
-                                except (psutil.AccessDenied, psutil.NoSuchProcess, AttributeError):
-                                    pass
-
-                            username = pinfo.get('username') or 'unknown'
-                            if '\\' in username:
-                                username = username.rpartition('\\')[2]
-
-                            processes.append({
-                                'pid': pinfo['pid'],
-                                'name': (pinfo['name'] or '')[:30],
-                                'username': username[:15],
-                                'cpu_percent': round(cpu_percent, 1),
-                                'memory_mb': memory_mb,
-                                'memory_percent': round(rss / self.total_memory * 100, 1),
-                                'disk_io_mb': disk_mb
-                            })
-                    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                        pass
-
-                # Clean up process cache
-                current_pids = {p['pid'] for p in processes}
-                for pid in list(self.process_cache.keys()):
-                    if pid not in current_pids:
-                        del self.process_cache[pid]
-
-                # Mark CPU initialized once we've completed one warm-up sampling pass
-                if do_cpu_sample and not self._cpu_initialized:
-                    self._cpu_initialized = True
-
-                processes.sort(key=lambda x: x['memory_mb'], reverse=True)
-                # Emit data to UI thread
-                self.data_ready.emit(mem_info, processes)
-            except Exception as e:
-                print(f"Error in DataFetcher run loop: {e}")
-            finally:
-                # advance sampling counter
-                try:
-                    self._cpu_sample_counter = (self._cpu_sample_counter + 1) % self._cpu_sample_rate
-                except Exception:
-                    self._cpu_sample_counter = 0
+class ProcessTableView(QTableView):
+    """Virtualized process table with the row helpers the rest of the GUI uses."""
 
-            # Wait for interval or immediate trigger or stop
-            if self._stop_event.is_set():
-                break
-            signaled = self._immediate_event.wait(self.interval)
-            if signaled:
-                self._immediate_event.clear()
+    def rowCount(self):
+        model = self.model()
+        return model.rowCount() if model is not None else 0
+
+    def currentRow(self):
+        index = self.currentIndex()
+        return index.row() if index.isValid() else -1
 
+    def setCurrentCell(self, row, column):
+        index = self.model().index(row, column)
+        if index.isValid():
+            self.setCurrentIndex(index)
 
-# Removed ProcessTableModel to restore original QTableWidget implementation
+    def selected_processes(self) -> dict:
+        """Return {ProcessIdentity: name} for the selected rows (every member of a selected group).
+
+        Identities come from the rows as rendered, so an action cannot reach a
+        process that reused a PID after the table was drawn.
+        """
+        model = self.model()
+        snapshot = model.snapshot
+        groups = model.group_members
+        selected = {}
+        for index in self.selectionModel().selectedRows():
+            row = index.row()
+            if row < len(snapshot):
+                if groups is not None:
+                    identities = model.group_identities[row]
+                    for pid, name in groups[row].items():
+                        selected[identities[pid]] = name
+                else:
+                    identity = ProcessIdentity(snapshot.pids[row], snapshot.starts[row], snapshot.start_ticks[row])
+                    selected[identity] = snapshot.names[row]
+        return selected
 
 
 class VirtualKeyboard(QDialog):
@@ -1052,10 +4535,19 @@ class ThemeDialog(QDialog):
 
 
 class TaskManagerGUI(QMainWindow):
-    def __init__(self):
+    def __init__(self, ring_path=DEFAULT_RING_PATH, recorder=None, replay=None, replay_speed=1.0):
         super().__init__()
-        self.data_fetcher = DataFetcher(interval_sec=4.0)
+        self.poll_scheduler = AdaptivePollScheduler()
+        self.data_fetcher = DataFetcher(self.poll_scheduler, ring_path=None if replay else ring_path,
+                                        recorder=recorder, replay=replay, replay_speed=replay_speed)
         self.current_theme = load_theme()  # Load saved theme
+        # Signals selected processes and confirms their exit in the background
+        self.kill_engine = KillEngine(load_kill_grace_seconds(), self)
+        self.kill_engine.result.connect(self.on_kill_result)
+        self.kill_engine.finished.connect(self.on_kill_finished)
+        # Notices selected processes exiting through their pidfds
+        self.process_watcher = ProcessWatcher(self)
+        self.process_watcher.exited.connect(self.on_watched_exit)
         
         # Track selected rows
         self.selected_pid = None
@@ -1093,6 +4585,12 @@ class TaskManagerGUI(QMainWindow):
             except Exception as e:
                 print(f"Gamepad initialization failed: {e}")
         
+        # Clickable column sort, kept across refreshes
+        sort_column, sort_descending = load_sort_order()
+        if sort_column not in ProcessTableModel.SORT_COLUMNS:
+            sort_column, sort_descending = 'rss', True
+        self._sort = SortOrder(sort_column, sort_descending)
+
         # Initialize UI
         self.initUI()
         
@@ -1102,21 +4600,27 @@ class TaskManagerGUI(QMainWindow):
             self.gamepad_timer.timeout.connect(self.process_gamepad_input)
             self.gamepad_timer.start(250)  # Poll gamepad every 250ms (reduced for CPU efficiency)
         
-        # Timer for auto-refresh
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.request_data_update)
-        self.timer.start(2000)  # Update every 2 seconds to reduce CPU usage ~50%
+        # Refresh cadence is owned by the poll scheduler; feed it user activity
+        self._activity_monitor = UserActivityMonitor(self.poll_scheduler, self)
+        QApplication.instance().installEventFilter(self._activity_monitor)
         
-        # Cached latest fetched data to allow fast local filtering (search/hide)
-        self._cached_processes = []
+        # Cached latest fetched snapshot to allow fast local filtering (search/hide).
+        # Kept in sync with the fetcher by applying its deltas; _snapshot_seq is the
+        # sequence number of the last delta applied.
+        self._cached_snapshot = ProcessSnapshot()
+        self._snapshot_seq = None
         self._last_mem_info = None
-        # Track last rendered rows for diff-based table updates
-        self._last_rendered = []
+        # Latest per-cgroup totals from the fetcher (None unless grouping by cgroup)
+        self._cgroup_totals = None
+        # Track last rendered snapshot for diff-based table updates
+        self._last_rendered = None
         # Debounce timer for search input to make typing feel responsive
         self._search_debounce_timer = QTimer()
         self._search_debounce_timer.setSingleShot(True)
-        self._search_debounce_timer.setInterval(200)  # ms
+        self._search_debounce_timer.setInterval(30)  # ms; the search index keeps each pass cheap
         self._search_debounce_timer.timeout.connect(self._apply_search_filter)
+        # Lowercased per-process search text, cached across keystrokes and refreshes
+        self._search_index = ProcessSearchIndex()
         # UI coalescing timer: batch rapid data_ready calls into a single UI update
         self._ui_update_timer = QTimer()
         self._ui_update_timer.setSingleShot(True)
@@ -1125,22 +4629,19 @@ class TaskManagerGUI(QMainWindow):
         # Pending render parameters (set by _apply_search_filter)
         self._pending_render_mem_info = None
         self._pending_render_processes = None
+        self._pending_render_tree = None
+        self._pending_render_groups = None
         self._pending_total_processes = 0
+        # Tree view: layout of the last filtered snapshot, re-flattened when subtrees are toggled
+        self._tree_layout = None
         # User scrolling detection: postpone rendering while user scrolls
         self._user_scrolling = False
         self._scroll_inactive_timer = QTimer()
         self._scroll_inactive_timer.setSingleShot(True)
         self._scroll_inactive_timer.setInterval(300)  # ms of idle before considered stopped
         self._scroll_inactive_timer.timeout.connect(self._on_scroll_stopped)
-        # Background filler: populate off-screen rows progressively to keep UI responsive
-        self._bg_fill_timer = QTimer()
-        self._bg_fill_timer.setSingleShot(False)
-        self._bg_fill_timer.setInterval(80)  # ms between background batches
-        self._bg_fill_timer.timeout.connect(self._bg_fill_step)
-        self._pending_offscreen_fill = []  # list of (row, proc)
         # Window move optimization: pause heavy UI updates while the window is being moved
         self._window_moving = False
-        self._bg_fill_was_active = False
         self._ui_update_was_active = False
         self._move_idle_timer = QTimer()
         self._move_idle_timer.setSingleShot(True)
@@ -1231,21 +4732,33 @@ class TaskManagerGUI(QMainWindow):
         self.search_input.setMaximumWidth(300)
         search_layout.addWidget(search_label)
         search_layout.addWidget(self.search_input)
+        search_layout.addSpacing(20)
+        group_label = QLabel('Group by:')
+        group_label.setStyleSheet("font-weight: bold;")
+        self.group_by_combo = QComboBox()
+        for text, mode in (('None', 'none'), ('Application', 'exe'), ('cgroup', 'cgroup'), ('User', 'user')):
+            self.group_by_combo.addItem(text, mode)
+        self.group_by_combo.setCurrentIndex(max(0, self.group_by_combo.findData(load_group_by())))
+        self.data_fetcher.set_group_by_cgroup(self.group_by_combo.currentData() == 'cgroup')
+        self.group_by_combo.currentIndexChanged.connect(self.on_group_by_changed)
+        search_layout.addWidget(group_label)
+        search_layout.addWidget(self.group_by_combo)
         search_layout.addStretch()
         main_layout.addLayout(search_layout)
         
         # Processes table
-        table_title = QLabel('Running Processes (sorted by RAM usage)')
+        self.table_title = QLabel('Running Processes')
         table_title_font = QFont()
         table_title_font.setPointSize(12)
         table_title_font.setBold(True)
-        table_title.setFont(table_title_font)
-        main_layout.addWidget(table_title)
+        self.table_title.setFont(table_title_font)
+        main_layout.addWidget(self.table_title)
         
-        # Create table
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels(['PID', 'User', 'Process Name', 'CPU (%)', 'RAM (MB)', 'RAM (%)', 'Disk I/O (MB)'])
+        # Create table (model/view: cells are formatted on demand for visible rows only)
+        self.table_model = ProcessTableModel(self)
+        self.table_model.history = self.data_fetcher.history
+        self.table = ProcessTableView()
+        self.table.setModel(self.table_model)
         
         # Install event filter to catch key presses
         self.table.installEventFilter(self)
@@ -1253,6 +4766,8 @@ class TaskManagerGUI(QMainWindow):
         # Enable right-click context menu
         self.table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self.show_context_menu)
+        # Double-click expands/collapses a subtree in tree view
+        self.table.doubleClicked.connect(self.on_table_double_clicked)
         
         # Configure table
         header = self.table.horizontalHeader()
@@ -1263,24 +4778,35 @@ class TaskManagerGUI(QMainWindow):
         header.setSectionResizeMode(4, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(5, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(6, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(7, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(8, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(9, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(10, QHeaderView.ResizeToContents)
+        # Click a column header to sort by it; click again to reverse
+        header.setSectionsClickable(True)
+        header.setSortIndicatorShown(True)
+        self._sort_section = ProcessTableModel.SORT_COLUMNS.index(self._sort.column)
+        header.setSortIndicator(self._sort_section,
+                                Qt.DescendingOrder if self._sort.descending else Qt.AscendingOrder)
+        header.sortIndicatorChanged.connect(self.on_sort_changed)
+        self._update_table_title()
         
         self.table.setAlternatingRowColors(True)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.ExtendedSelection)  # Ctrl/Shift for multi-select
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.ExtendedSelection)  # Ctrl/Shift for multi-select
         self.table.verticalScrollBar().setSingleStep(3)  # Faster scrolling
         self.table.verticalScrollBar().setPageStep(10)
-        # Improve rendering performance for uniform rows
-        try:
-            self.table.setUniformRowHeights(True)
-        except Exception:
-            pass
+        # Improve rendering performance for uniform rows: fixed row heights mean the
+        # view never measures rows it isn't painting
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(self.table.verticalHeader().defaultSectionSize())
         # Connect scrollbar activity to detect user scrolling
         try:
             self.table.verticalScrollBar().valueChanged.connect(self._on_user_scrolled)
         except Exception:
             pass
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 alternate-background-color: #f0f0f0;
                 background-color: #ffffff;
                 gridline-color: #d0d0d0;
@@ -1341,6 +4867,28 @@ class TaskManagerGUI(QMainWindow):
         self.hide_inaccessible_checkbox.installEventFilter(self)
         system_info_layout.addSpacing(20)
         system_info_layout.addWidget(self.hide_inaccessible_checkbox, 0, Qt.AlignLeft)
+
+        self.tree_view_checkbox = QCheckBox('Tree view')
+        self.tree_view_checkbox.setChecked(load_tree_view())
+        self.tree_view_checkbox.stateChanged.connect(self.on_tree_view_changed)
+        self.tree_view_checkbox.setSizePolicy(QSizePolicy.Maximum, QSizePolicy.Fixed)
+        self.tree_view_checkbox.setFixedHeight(self.gpu_driver_label.sizeHint().height())
+        self.tree_view_checkbox.setContentsMargins(0, 0, 0, 0)
+        system_info_layout.addSpacing(20)
+        system_info_layout.addWidget(self.tree_view_checkbox, 0, Qt.AlignLeft)
+
+        self.memory_details_checkbox = QCheckBox('Memory details')
+        self.memory_details_checkbox.setToolTip('Show PSS, USS and swap per process (read from smaps_rollup within a per-refresh time budget)')
+        self.memory_details_checkbox.setChecked(load_memory_details())
+        self.data_fetcher.set_memory_details(self.memory_details_checkbox.isChecked())
+        for column in ProcessTableModel.MEMORY_DETAIL_COLUMNS:
+            self.table.setColumnHidden(column, not self.memory_details_checkbox.isChecked())
+        self.memory_details_checkbox.stateChanged.connect(self.on_memory_details_changed)
+        self.memory_details_checkbox.setSizePolicy(QSizePolicy.Maximum, QSizePolicy.Fixed)
+        self.memory_details_checkbox.setFixedHeight(self.gpu_driver_label.sizeHint().height())
+        self.memory_details_checkbox.setContentsMargins(0, 0, 0, 0)
+        system_info_layout.addSpacing(20)
+        system_info_layout.addWidget(self.memory_details_checkbox, 0, Qt.AlignLeft)
         system_info_layout.addStretch()
         os_label_title = QLabel('OS:')
         os_label_title.setStyleSheet("font-weight: bold;")
@@ -1361,6 +4909,9 @@ class TaskManagerGUI(QMainWindow):
         self.controller_label.setCursor(Qt.PointingHandCursor)
         self.controller_label.parent_callback = self.open_controller_test
         self.statusBar().addPermanentWidget(self.controller_label)
+        # Effective refresh rate and collector cost
+        self.refresh_rate_label = QLabel('')
+        self.statusBar().addPermanentWidget(self.refresh_rate_label)
         self.statusBar().showMessage('Loading...')
         
         central_widget.setLayout(main_layout)
@@ -1405,7 +4956,7 @@ class TaskManagerGUI(QMainWindow):
         self.request_data_update()
         
         # Connect table selection signal
-        self.table.itemSelectionChanged.connect(self.on_selection_changed)
+        self.table.selectionModel().selectionChanged.connect(self.on_selection_changed)
     
     def run_with_sudo(self):
         """Restart the application with sudo privileges and close current window"""
@@ -1497,8 +5048,96 @@ class TaskManagerGUI(QMainWindow):
         else:
             self.request_data_update()
     
+    def on_tree_view_changed(self, state):
+        """Handle tree view checkbox state change"""
+        save_tree_view(self.tree_view_checkbox.isChecked())
+        if self._last_mem_info is not None:
+            self._apply_search_filter()
+        else:
+            self.request_data_update()
+
+    def on_memory_details_changed(self, state):
+        """Show or hide the PSS/USS/swap columns and start or stop sampling them"""
+        enabled = self.memory_details_checkbox.isChecked()
+        save_memory_details(enabled)
+        self.data_fetcher.set_memory_details(enabled)
+        for column in ProcessTableModel.MEMORY_DETAIL_COLUMNS:
+            self.table.setColumnHidden(column, not enabled)
+        if enabled:
+            self.request_data_update()
+
+    def on_group_by_changed(self, index):
+        """Handle group-by selection change"""
+        group_by = self.group_by_combo.currentData()
+        save_group_by(group_by)
+        self.data_fetcher.set_group_by_cgroup(group_by == 'cgroup')
+        if self._last_mem_info is not None:
+            self._apply_search_filter()
+        if self._last_mem_info is None or group_by == 'cgroup':
+            # cgroup paths are resolved on the fetcher thread; regroup once they arrive
+            self.request_data_update()
+
+    def on_sort_changed(self, section, order):
+        """Re-sort the table when a column header is clicked"""
+        descending = order == Qt.DescendingOrder
+        natural = ProcessTableModel.SORT_DESCENDING[section]
+        if section != self._sort_section and descending != natural:
+            # First click on a column sorts in its natural direction (largest numbers first);
+            # this re-emits sortIndicatorChanged with that order
+            self.table.horizontalHeader().setSortIndicator(
+                section, Qt.DescendingOrder if natural else Qt.AscendingOrder)
+            return
+        self._sort_section = section
+        column = ProcessTableModel.SORT_COLUMNS[section]
+        self._sort.set_column(column, descending)
+        save_sort_order(column, descending)
+        self._update_table_title()
+        if self._last_mem_info is not None:
+            self._apply_search_filter()
+
+    def _update_table_title(self):
+        name = ProcessTableModel.HEADERS[self._sort_section]
+        direction = 'descending' if self._sort.descending else 'ascending'
+        self.table_title.setText(f'Running Processes (sorted by {name}, {direction})')
+
+    def _sort_limit(self):
+        """Rows that must be in exact order: everything up to a page below the visible ones."""
+        row_height = max(1, self.table.verticalHeader().defaultSectionSize())
+        page = self.table.viewport().height() // row_height + 1
+        first = max(0, self.table.rowAt(0))
+        return first + 3 * page
+
+    def on_table_double_clicked(self, index):
+        """Toggle the double-clicked subtree in tree view."""
+        if self.tree_view_checkbox.isChecked() and index.isValid():
+            self.set_subtree_collapsed(self.table_model.pid_at(index.row()))
+
+    def set_subtree_collapsed(self, pid, collapsed=None):
+        """Collapse, expand (or, with collapsed=None, toggle) the subtree under pid and re-render."""
+        hidden = self.table_model.collapsed
+        if collapsed is None:
+            collapsed = pid not in hidden
+        if collapsed == (pid in hidden):
+            return
+        if collapsed:
+            hidden.add(pid)
+        else:
+            hidden.discard(pid)
+        layout = self._tree_layout
+        if layout is None:
+            return
+        # Same data, so only re-flatten the last layout, and render now rather than after the coalescing delay
+        processes, depths, expandable = layout.flatten(hidden)
+        self._ui_update_timer.stop()
+        self._render_process_list(self._last_mem_info, processes, len(self._cached_snapshot),
+                                  (depths, expandable))
+
     def on_search_changed(self, text):
         """Handle search input text change"""
+        active = bool(text.strip())
+        self.data_fetcher.set_search_active(active)
+        if not active:
+            self._search_index.clear()
         # Debounce and, if we have cached data, filter locally for snappy typing
         if self._last_mem_info is None:
             # No data yet: request initial fetch
@@ -1513,27 +5152,72 @@ class TaskManagerGUI(QMainWindow):
         if self._last_mem_info is None:
             return
 
-        # Start from the full cached process list (as received from fetcher)
-        processes = list(self._cached_processes)
+        # Filter rows of the cached snapshot first, then order only what is left
+        snapshot = self._cached_snapshot
+        pids = snapshot.pids
+        rows = range(len(snapshot))
+        filtered = False
 
-        total_processes = len(processes)
+        total_processes = len(snapshot)
 
-        # Apply system-process filter if enabled
+        # Apply the hide filters as one mask over the collector's classification flags
+        hidden = 0
         if self.hide_system_checkbox.isChecked():
-            processes = [p for p in processes if not self.is_system_process(p)]
-
-        # Apply inaccessible-process filter if enabled
+            hidden |= FLAG_SYSTEM
         if self.hide_inaccessible_checkbox.isChecked():
-            processes = [p for p in processes if not self.is_inaccessible_process(p)]
+            hidden |= FLAG_INACCESSIBLE
+        if hidden:
+            flags = self._classified_flags(snapshot)
+            rows = [i for i in rows if not flags[i] & hidden]
+            filtered = True
 
-        # Apply search filter if search text is entered
         search_text = self.search_input.text().strip().lower()
-        if search_text:
-            processes = [p for p in processes if search_text in p.get('name', '').lower()]
+        group_by = self.group_by_combo.currentData()
+        groups = None
+        if group_by != 'none':
+            # Aggregate what the hide filters kept, then search whole groups: a group
+            # matches on its own label or on any member's name
+            processes = snapshot.take(rows) if filtered else snapshot
+            keys, labels = self._group_keys(processes, group_by)
+            groups = ProcessGroups(processes, keys, labels)
+            if group_by == 'cgroup' and self._cgroup_totals:
+                groups.apply_totals(self._cgroup_totals, self.data_fetcher.total_memory)
+            if search_text:
+                matched = self._search_index.matching_pids(self._cached_snapshot, search_text)
+                labels = groups.view.names
+                groups.take([g for g, members in enumerate(groups.members)
+                             if search_text in labels[g].lower() or not matched.isdisjoint(members)])
+            # Groups are few, so a full (stable, RAM-ordered) sort is cheap
+            values = getattr(groups.view, self._sort.column)
+            groups.take(sorted(range(len(groups)), key=values.__getitem__, reverse=self._sort.descending))
+            processes = groups.view
+        else:
+            # Apply search filter if search text is entered
+            if search_text:
+                matched = self._search_index.matching_pids(self._cached_snapshot, search_text)
+                rows = [i for i in rows if pids[i] in matched]
+            if self.tree_view_checkbox.isChecked():
+                # The tree orders siblings itself
+                processes = snapshot.take(list(rows))
+            else:
+                processes = snapshot.take(self._sort.order(snapshot, rows, self._sort_limit()))
+
+        tree = None
+        if groups is None and self.tree_view_checkbox.isChecked():
+            # Forget collapsed subtrees whose root exited
+            collapsed = self.table_model.collapsed
+            collapsed.intersection_update([pid for pid in collapsed if snapshot.index_of(pid) >= 0])
+            self._tree_layout = self.data_fetcher.tree.layout(processes)
+            processes, depths, expandable = self._tree_layout.flatten(collapsed)
+            tree = (depths, expandable)
+        else:
+            self._tree_layout = None
 
         # Schedule the (filtered) processes to be rendered by the UI coalescer
         self._pending_render_mem_info = self._last_mem_info
         self._pending_render_processes = processes
+        self._pending_render_tree = tree
+        self._pending_render_groups = groups
         self._pending_total_processes = total_processes
         # Restart the UI update timer (coalesce multiple rapid updates)
         try:
@@ -1543,10 +5227,52 @@ class TaskManagerGUI(QMainWindow):
             pass
         self._ui_update_timer.start()
     
-    @staticmethod
-    def is_inaccessible_process(proc: dict) -> bool:
-        """Check if process has an inaccessible executable path."""
-        pid = proc.get('pid', -1)
+    def _group_keys(self, snapshot, group_by):
+        """Return (keys, labels) per row of `snapshot` for the given group-by mode.
+
+        Executables and cgroups come from the collector's metadata cache; rows
+        without metadata (e.g. from a --daemon ring) group by name / as unknown.
+        cgroup paths are only read here, never resolved: DataFetcher fills them
+        in while grouping by cgroup, so rows it has not reached yet are unknown.
+        """
+        if group_by == 'user':
+            return snapshot.users, snapshot.users
+        get_meta = self.data_fetcher.collector.metadata.get
+        keys, labels = [], []
+        for pid, start, name in zip(snapshot.pids, snapshot.starts, snapshot.names):
+            meta = get_meta(pid, start)
+            if group_by == 'exe':
+                exe = meta.exe if meta is not None else ''
+                keys.append(exe or name)
+                labels.append(os.path.basename(exe) if exe else name)
+            else:
+                path = (meta.cgroup or '') if meta is not None else ''
+                keys.append(path or '?')
+                labels.append(path.rpartition('/')[2] or path or '(unknown)')
+        return keys, labels
+
+    def _classified_flags(self, snapshot):
+        """Return snapshot.flags, classifying rows the collector did not (e.g. older recordings)."""
+        flags = snapshot.flags
+        if all(f & FLAG_CLASSIFIED for f in flags):
+            return flags
+        flags = array('B', flags)
+        for i, f in enumerate(flags):
+            if not f & FLAG_CLASSIFIED:
+                pid = snapshot.pids[i]
+                f = FLAG_CLASSIFIED
+                if self.is_system_process(pid, snapshot.users[i]):
+                    f |= FLAG_SYSTEM
+                if self.is_inaccessible_process(pid, snapshot.starts[i]):
+                    f |= FLAG_INACCESSIBLE
+                flags[i] = f
+        return flags
+
+    def is_inaccessible_process(self, pid: int, start: float) -> bool:
+        """Check if process has an inaccessible executable path (resolved once per process)."""
+        meta = self.data_fetcher.collector.metadata.get(pid, start)
+        if meta is not None:
+            return meta.is_inaccessible()
         try:
             process = psutil.Process(pid)
             exe_path = process.exe()
@@ -1559,25 +5285,11 @@ class TaskManagerGUI(QMainWindow):
         return False
     
     @staticmethod
-    def is_system_process(proc: dict) -> bool:
+    def is_system_process(pid: int, username: str) -> bool:
         """Heuristic to detect system processes for filtering."""
-        pid = proc.get('pid', -1)
-        user = (proc.get('username') or '').lower()
-        system_users = {
-            'root',
-            'system',
-            'local system',
-            'nt authority\\system',
-            'nt authority\\localservice',
-            'nt authority\\networkservice',
-            'localservice',
-            'networkservice'
-        }
         if pid in (0, 1, 2):
             return True
-        if user in system_users:
-            return True
-        return False
+        return USER_NAMES.is_system_user(username)
     
     def open_controller_test(self):
         """Open controller test dialog"""
@@ -1669,21 +5381,21 @@ class TaskManagerGUI(QMainWindow):
             QMainWindow {
                 background-color: #ffffff;
             }
-            QTableWidget {
+            QTableView {
                 alternate-background-color: #f0f0f0;
                 background-color: #ffffff;
                 gridline-color: #d0d0d0;
                 color: #000000;
             }
-            QTableWidget::item {
+            QTableView::item {
                 color: #000000;
                 background-color: #ffffff;
                 padding: 2px;
             }
-            QTableWidget::item:alternate {
+            QTableView::item:alternate {
                 background-color: #f0f0f0;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #3daee9;
                 color: #ffffff;
             }
@@ -1768,21 +5480,21 @@ class TaskManagerGUI(QMainWindow):
                 background-color: #1e1e1e;
                 color: #ffffff;
             }
-            QTableWidget {
+            QTableView {
                 alternate-background-color: #2d2d2d;
                 background-color: #252525;
                 gridline-color: #3d3d3d;
                 color: #ffffff;
             }
-            QTableWidget::item {
+            QTableView::item {
                 color: #ffffff;
                 background-color: #252525;
                 padding: 2px;
             }
-            QTableWidget::item:alternate {
+            QTableView::item:alternate {
                 background-color: #2d2d2d;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #ff6f00;
                 color: #ffffff;
             }
@@ -1892,21 +5604,21 @@ class TaskManagerGUI(QMainWindow):
                 background-color: #f5f5f5;
                 color: #212121;
             }
-            QTableWidget {
+            QTableView {
                 alternate-background-color: #eeeeee;
                 background-color: #ffffff;
                 gridline-color: #e0e0e0;
                 color: #212121;
             }
-            QTableWidget::item {
+            QTableView::item {
                 color: #212121;
                 background-color: #ffffff;
                 padding: 2px;
             }
-            QTableWidget::item:alternate {
+            QTableView::item:alternate {
                 background-color: #eeeeee;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #ff6f00;
                 color: #ffffff;
             }
@@ -2000,23 +5712,37 @@ class TaskManagerGUI(QMainWindow):
         """
         self.setStyleSheet(stylesheet)
     
-    def on_selection_changed(self):
+    def on_selection_changed(self, selected=None, deselected=None):
         """Track when rows are selected"""
-        selected_items = self.table.selectedItems()
-        if selected_items:
-            # Get unique PIDs from selected rows
-            pids = set()
-            for item in selected_items:
-                row = item.row()
-                pid_item = self.table.item(row, 0)
-                if pid_item:
-                    try:
-                        pids.add(int(pid_item.text()))
-                    except ValueError:
-                        pass
-            self.selected_pid = pids if pids else None
-        else:
-            self.selected_pid = None
+        selected = self.table.selected_processes()
+        pids = {identity.pid for identity in selected}
+        self.selected_pid = pids if pids else None
+        self._update_priority_pids()
+        self.process_watcher.watch(selected)
+
+    def on_watched_exit(self, pid):
+        """A selected process exited: refresh now rather than on the next tick"""
+        self.data_fetcher.trigger_fetch()
+
+    def process_identity(self, pid) -> ProcessIdentity:
+        """Return the identity of the process the latest snapshot has under this PID.
+
+        For PIDs that did not come from a rendered row (descendants, callers
+        passing a bare PID); selected rows carry their identity already.
+        """
+        if isinstance(pid, ProcessIdentity):
+            return pid
+        snapshot = self._cached_snapshot
+        row = snapshot.index_of(pid)
+        if row < 0:
+            return ProcessIdentity(pid, None)
+        return ProcessIdentity(pid, snapshot.starts[row], snapshot.start_ticks[row])
+
+    def process_identities(self, pids) -> dict:
+        """Map {pid: name} (or an iterable of PIDs) to {ProcessIdentity: name}; identities pass through."""
+        if not isinstance(pids, dict):
+            pids = dict.fromkeys(pids, '')
+        return {self.process_identity(pid): name for pid, name in pids.items()}
     
     def show_context_menu(self, position: QPoint):
         """Show right-click context menu"""
@@ -2024,24 +5750,8 @@ class TaskManagerGUI(QMainWindow):
         if row < 0:
             return
         
-        # Get selected PIDs
-        selected_items = self.table.selectedItems()
-        if not selected_items:
-            return
-        
-        selected_pids = {}
-        for item in selected_items:
-            row = item.row()
-            pid_item = self.table.item(row, 0)
-            name_item = self.table.item(row, 2)  # Process name is column 2 now
-            if pid_item and name_item:
-                try:
-                    pid = int(pid_item.text())
-                    name = name_item.text()
-                    selected_pids[pid] = name
-                except ValueError:
-                    pass
-        
+        # Get the selected processes, pinned to the rows shown right now
+        selected_pids = self.table.selected_processes()
         if not selected_pids:
             return
         
@@ -2050,14 +5760,14 @@ class TaskManagerGUI(QMainWindow):
         count = len(selected_pids)
         if count == 1:
             name = list(selected_pids.values())[0]
-            pid = list(selected_pids.keys())[0]
+            identity = list(selected_pids.keys())[0]
             kill_action = menu.addAction(f"End Task: {name}")
             open_location_action = menu.addAction("Open File Location")
             lookup_action = menu.addAction("Lookup Process")
             
             # Connect actions
             kill_action.triggered.connect(lambda: self.kill_processes(selected_pids))
-            open_location_action.triggered.connect(lambda: self.open_file_location(pid))
+            open_location_action.triggered.connect(lambda: self.open_file_location(identity))
             lookup_action.triggered.connect(lambda: self.lookup_process(name))
         else:
             kill_action = menu.addAction(f"End {count} Tasks")
@@ -2066,6 +5776,17 @@ class TaskManagerGUI(QMainWindow):
             # Connect actions
             kill_action.triggered.connect(lambda: self.kill_processes(selected_pids))
             open_location_action.triggered.connect(lambda: self.open_multiple_file_locations(selected_pids))
+
+        if self.has_children(identity.pid for identity in selected_pids):
+            tree_action = menu.addAction("End Process Tree")
+            tree_action.triggered.connect(lambda: self.kill_process_trees(selected_pids))
+
+        if os.name == 'posix':
+            signal_menu = menu.addMenu("Send Signal")
+            for sig_name in ('SIGHUP', 'SIGINT', 'SIGTERM', 'SIGKILL', 'SIGSTOP', 'SIGCONT'):
+                sig = getattr(signal, sig_name)
+                action = signal_menu.addAction(f"{sig_name} ({int(sig)})")
+                action.triggered.connect(lambda _, sig=sig: self.kill_processes(selected_pids, sig, escalate=False))
         
         # Set first action as active for gamepad
         menu.setActiveAction(kill_action)
@@ -2085,11 +5806,14 @@ class TaskManagerGUI(QMainWindow):
         self.active_menu = None
         self.active_menu_pids = None
     
-    def open_file_location(self, pid: int):
-        """Open the file location of a process"""
+    def open_file_location(self, pid):
+        """Open the file location of a process (a PID or ProcessIdentity)"""
         try:
-            proc = psutil.Process(pid)
-            exe_path = proc.exe()
+            handle = ProcessHandle.open(self.process_identity(pid))
+            try:
+                exe_path = handle.exe()
+            finally:
+                handle.close()
             if not exe_path or not os.path.exists(exe_path):
                 QMessageBox.warning(self, "Error", "Cannot locate executable path for this process.")
                 return
@@ -2128,10 +5852,14 @@ class TaskManagerGUI(QMainWindow):
         access_denied = []
         unique_dirs = set()
         
-        for pid, name in pids_dict.items():
+        for identity, name in self.process_identities(pids_dict).items():
+            pid = identity.pid
             try:
-                proc = psutil.Process(pid)
-                exe_path = proc.exe()
+                handle = ProcessHandle.open(identity)
+                try:
+                    exe_path = handle.exe()
+                finally:
+                    handle.close()
                 if not exe_path or not os.path.exists(exe_path):
                     failed.append(f"{name} (PID: {pid})")
                     continue
@@ -2212,44 +5940,72 @@ class TaskManagerGUI(QMainWindow):
     
     def kill_process(self, pid: int, process_name: str):
         """Kill a process by PID"""
-        try:
-            proc = psutil.Process(pid)
-            proc.terminate()
-            self.statusBar().showMessage(f"Terminated process: {process_name} (PID: {pid})")
-        except psutil.NoSuchProcess:
-            QMessageBox.warning(self, "Error", f"Process {process_name} (PID: {pid}) no longer exists")
-        except psutil.AccessDenied:
-            QMessageBox.warning(self, "Error", f"Access denied. Cannot terminate {process_name}.\nYou may need to run with sudo.")
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to terminate {process_name}: {str(e)}")
+        self.kill_processes({pid: process_name})
     
-    def kill_processes(self, pids_dict: dict):
-        """Kill multiple processes by PID"""
-        failed = []
-        access_denied = []
-        terminated = []
-        
-        for pid, name in pids_dict.items():
-            try:
-                proc = psutil.Process(pid)
-                proc.terminate()
-                terminated.append(f"{name} (PID: {pid})")
-            except psutil.NoSuchProcess:
-                pass  # Process already gone
-            except psutil.AccessDenied:
-                access_denied.append(f"{name} (PID: {pid})")
-            except Exception as e:
-                failed.append(f"{name} (PID: {pid}): {str(e)}")
-        
-        # Show status message
-        if terminated:
-            self.statusBar().showMessage(f"Terminated {len(terminated)} process(es)")
-        
-        # Show warnings if there were issues
-        if access_denied or failed:
+    def kill_processes(self, pids_dict: dict, sig=signal.SIGTERM, escalate=True):
+        """Send `sig` to multiple processes in one background batch; results arrive via the kill engine"""
+        if not pids_dict:
+            return
+        self.kill_engine.submit(self.process_identities(pids_dict), sig, escalate)
+        action = 'Ending' if sig == signal.SIGTERM else f'Sending {signal.Signals(sig).name} to'
+        self.statusBar().showMessage(f"{action} {len(pids_dict)} process(es)...")
+
+    def kill_process_trees(self, pids_dict: dict):
+        """End the given processes together with all their descendants, in one batch"""
+        tree = self.data_fetcher.tree
+        snapshot = self._cached_snapshot
+        targets = self.process_identities(pids_dict)
+        seen = {identity.pid for identity in targets}
+        pending = list(seen)
+        while pending:
+            for child in tree.children(pending.pop()):
+                if child not in seen:
+                    seen.add(child)
+                    row = snapshot.index_of(child)
+                    targets[self.process_identity(child)] = snapshot.names[row] if row >= 0 else str(child)
+                    pending.append(child)
+        self.kill_processes(targets)
+
+    def has_children(self, pids) -> bool:
+        """Return True if any of the given processes has child processes"""
+        return any(self.data_fetcher.tree.children(pid) for pid in pids)
+
+    def on_kill_result(self, pid, name, outcome):
+        """A process from a kill batch exited: refresh so its row disappears promptly"""
+        if outcome in (KillEngine.EXITED, KillEngine.KILLED):
+            self.data_fetcher.trigger_fetch()
+
+    def on_kill_finished(self, outcomes):
+        """Summarize a finished kill batch in the status bar, warning about survivors"""
+        by_outcome = {}
+        for pid, (name, outcome) in outcomes.items():
+            by_outcome.setdefault(outcome, []).append(f"{name} (PID: {pid})")
+        ended = len(by_outcome.get(KillEngine.EXITED, []))
+        killed = len(by_outcome.get(KillEngine.KILLED, []))
+        sent = len(by_outcome.get(KillEngine.SENT, []))
+        gone = len(by_outcome.get(KillEngine.GONE, []))
+        parts = []
+        if ended:
+            parts.append(f"Terminated {ended} process(es)")
+        if killed:
+            parts.append(f"force-killed {killed} that did not exit in time")
+        if sent:
+            parts.append(f"signalled {sent} process(es)")
+        if gone:
+            parts.append(f"{gone} process(es) had already exited or their PID was reused (left alone)")
+        if parts:
+            parts[0] = parts[0][0].upper() + parts[0][1:]
+            self.statusBar().showMessage(", ".join(parts))
+
+        access_denied = by_outcome.get(KillEngine.DENIED)
+        failed = by_outcome.get(KillEngine.FAILED)
+        alive = by_outcome.get(KillEngine.ALIVE)
+        if access_denied or failed or alive:
             msg = ""
             if access_denied:
                 msg += f"Access denied for:\n" + "\n".join(access_denied) + "\n\nYou may need to run with sudo.\n\n"
+            if alive:
+                msg += f"Still running:\n" + "\n".join(alive) + "\n\n"
             if failed:
                 msg += f"Failed to terminate:\n" + "\n".join(failed)
             QMessageBox.warning(self, "Error", msg.strip())
@@ -2459,7 +6215,7 @@ class TaskManagerGUI(QMainWindow):
                         if self.gamepad_focus_mode == 'table':
                             current_row = self.table.currentRow()
                             if current_row >= 0:
-                                rect = self.table.visualItemRect(self.table.item(current_row, 0))
+                                rect = self.table.visualRect(self.table_model.index(current_row, 0))
                                 self.show_context_menu(rect.center())
                         elif self.gamepad_focus_mode == 'hide_system':
                             self.hide_system_checkbox.setChecked(not self.hide_system_checkbox.isChecked())
@@ -2467,22 +6223,9 @@ class TaskManagerGUI(QMainWindow):
                             self.hide_inaccessible_checkbox.setChecked(not self.hide_inaccessible_checkbox.isChecked())
                     
                     elif button_id == 1:  # Button B - End task
-                        selected_items = self.table.selectedItems()
-                        if selected_items:
-                            selected_pids = {}
-                            for item in selected_items:
-                                row = item.row()
-                                pid_item = self.table.item(row, 0)
-                                name_item = self.table.item(row, 2)
-                                if pid_item and name_item:
-                                    try:
-                                        pid = int(pid_item.text())
-                                        name = name_item.text()
-                                        selected_pids[pid] = name
-                                    except ValueError:
-                                        pass
-                            if selected_pids:
-                                self.kill_processes(selected_pids)
+                        selected_pids = self.table.selected_processes()
+                        if selected_pids:
+                            self.kill_processes(selected_pids)
                     
                     elif button_id == 4:  # L1 - Page up
                         current_row = self.table.currentRow()
@@ -2498,7 +6241,7 @@ class TaskManagerGUI(QMainWindow):
                         if self.gamepad_focus_mode == 'table':
                             current_row = self.table.currentRow()
                             if current_row >= 0:
-                                rect = self.table.visualItemRect(self.table.item(current_row, 0))
+                                rect = self.table.visualRect(self.table_model.index(current_row, 0))
                                 self.show_context_menu(rect.center())
                     
                     elif button_id == 7:  # Start button - Open theme menu
@@ -2582,14 +6325,6 @@ class TaskManagerGUI(QMainWindow):
         try:
             self._window_moving = True
 
-            # Remember and stop background filler to avoid spikes
-            try:
-                self._bg_fill_was_active = self._bg_fill_timer.isActive()
-                if self._bg_fill_timer.isActive():
-                    self._bg_fill_timer.stop()
-            except Exception:
-                self._bg_fill_was_active = False
-
             # Pause UI coalescer
             try:
                 self._ui_update_was_active = self._ui_update_timer.isActive()
@@ -2617,8 +6352,68 @@ class TaskManagerGUI(QMainWindow):
 
         super().moveEvent(event)
     
+    def changeEvent(self, event):
+        """Tell the poll scheduler when the window is minimized, restored, focused or unfocused."""
+        if event.type() in (QEvent.WindowStateChange, QEvent.ActivationChange):
+            self._update_poll_state()
+        super().changeEvent(event)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # Watch expose events on the native window to notice occlusion
+        handle = self.windowHandle()
+        if handle is not None and not getattr(self, '_expose_filter_installed', False):
+            handle.installEventFilter(self)
+            self._expose_filter_installed = True
+        self._update_poll_state()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._update_poll_state()
+
+    def _update_poll_state(self):
+        """Push current visibility/focus to the scheduler and refresh now if the user just looked back."""
+        if not hasattr(self, 'poll_scheduler'):
+            return
+        handle = self.windowHandle()
+        visible = self.isVisible() and not self.isMinimized() and (handle is None or handle.isExposed())
+        focused = visible and self.isActiveWindow()
+        scheduler = self.poll_scheduler
+        woke_up = (visible and not scheduler.visible) or (focused and not scheduler.focused)
+        scheduler.set_window_state(visible, focused)
+        if woke_up:
+            scheduler.note_user_activity()
+            self.request_data_update()
+
+    def _update_refresh_rate_label(self):
+        """Show the effective refresh interval and what collection costs at that rate."""
+        scheduler = self.poll_scheduler
+        fetcher = self.data_fetcher
+        source = "Shared daemon" if fetcher.ring_reader is not None else "Collector"
+        history = fetcher.history
+        if fetcher.replay is not None and fetcher.replay_time is not None:
+            refresh = f"Replay: {datetime.fromtimestamp(fetcher.replay_time):%Y-%m-%d %H:%M:%S}"
+        else:
+            refresh = f"Refresh: {scheduler.effective_interval:.1f}s"
+        if fetcher.recorder is not None:
+            refresh += " (recording)"
+        self.refresh_rate_label.setText(
+            f"{refresh} | "
+            f"{source}: {scheduler.cycle_cpu * 1000:.0f} ms ({scheduler.collector_load() * 100:.1f}% CPU) | "
+            f"History: {history.memory_bytes() / 1048576:.1f}/{history.max_bytes / 1048576:.0f} MB"
+        )
+        self.refresh_rate_label.setToolTip(
+            f"History covers {history.tracked()} processes"
+            + (f" ({history.dropped} samples dropped at the memory cap)" if history.dropped else "")
+        )
+
     def eventFilter(self, source, event):
         """Filter events to catch key presses on the table and focus changes on checkboxes"""
+        # Native window exposed/obscured: adjust the polling rate
+        if event.type() == QEvent.Expose and source is self.windowHandle():
+            self._update_poll_state()
+            return False
+
         # Handle checkbox focus out events
         if (hasattr(self, 'hide_system_checkbox') and hasattr(self, 'hide_inaccessible_checkbox') and
             source in [self.hide_system_checkbox, self.hide_inaccessible_checkbox]):
@@ -2652,22 +6447,15 @@ class TaskManagerGUI(QMainWindow):
                     self.table.setCurrentCell(self.table.rowCount() - 1, 0)
                 return True
             elif key == Qt.Key_Delete:
-                selected_items = self.table.selectedItems()
-                if selected_items:
-                    selected_pids = {}
-                    for item in selected_items:
-                        row = item.row()
-                        pid_item = self.table.item(row, 0)
-                        name_item = self.table.item(row, 2)
-                        if pid_item and name_item:
-                            try:
-                                pid = int(pid_item.text())
-                                name = name_item.text()
-                                selected_pids[pid] = name
-                            except ValueError:
-                                pass
-                    if selected_pids:
-                        self.kill_processes(selected_pids)
+                selected_pids = self.table.selected_processes()
+                if selected_pids:
+                    self.kill_processes(selected_pids)
+                return True
+            elif key in (Qt.Key_Left, Qt.Key_Right) and self.table_model.tree_depths is not None:
+                # Collapse/expand the current row's subtree in tree view
+                row = self.table.currentRow()
+                if row >= 0:
+                    self.set_subtree_collapsed(self.table_model.pid_at(row), key == Qt.Key_Left)
                 return True
         
         return super().eventFilter(source, event)
@@ -2848,6 +6636,10 @@ class TaskManagerGUI(QMainWindow):
             if hasattr(self, 'data_fetcher') and self.data_fetcher.isRunning():
                 self.data_fetcher.stop()
                 self.data_fetcher.wait(1000)
+            if hasattr(self, 'kill_engine'):
+                self.kill_engine.close()
+            if hasattr(self, 'process_watcher'):
+                self.process_watcher.close()
         except Exception:
             pass
         super().closeEvent(event)
@@ -2858,17 +6650,36 @@ class TaskManagerGUI(QMainWindow):
         if hasattr(self, 'data_fetcher'):
             self.data_fetcher.trigger_fetch()
     
-    def on_data_ready(self, mem_info, processes):
-        """Handle data received from worker thread by caching and applying local filters."""
-        # Cache full set of processes and last mem info for local filtering
-        self._cached_processes = processes
+    def on_data_ready(self, mem_info, delta):
+        """Handle a delta from the worker thread: patch the cached snapshot, then the table."""
+        if delta.keyframe:
+            self._cached_snapshot = delta.snapshot
+        elif delta.base_seq != self._snapshot_seq:
+            # Out of sync with the fetcher (missed a delta); wait for a fresh keyframe
+            self.data_fetcher.request_keyframe()
+            self.data_fetcher.trigger_fetch()
+            return
+        else:
+            self._cached_snapshot.apply_delta(delta)
+        self._snapshot_seq = delta.seq
+        self._search_index.apply_delta(delta, self._cached_snapshot)
         self._last_mem_info = mem_info
+        self._cgroup_totals = delta.cgroup_totals
+        snapshot = self._cached_snapshot
+        self.table_model.set_sample_ages(delta.sample_ages)
+        self._update_refresh_rate_label()
+
+        # Fast path: only values of already-rendered rows changed, so patch those rows in place
+        if not delta.keyframe and self._apply_delta_to_table(delta):
+            self._update_memory_display(mem_info)
+            self._update_status_bar(len(self._last_rendered), len(snapshot))
+            return
 
         # If change is significant and user is not scrolling, render immediately for snappy UX
         try:
             immediate = False
             if not getattr(self, '_user_scrolling', False):
-                if self._is_significant_change(mem_info, processes):
+                if self._is_significant_change(mem_info, snapshot):
                     immediate = True
         except Exception:
             immediate = False
@@ -2885,33 +6696,74 @@ class TaskManagerGUI(QMainWindow):
                 pass
             QTimer.singleShot(0, self._flush_ui_update)
 
-    def _render_process_list(self, mem_info, processes, total_processes):
-        """Render the provided (already filtered) processes list into the table."""
+    def _render_process_list(self, mem_info, processes, total_processes, tree=None, groups=None):
+        """Render the provided (already filtered) ProcessSnapshot into the table.
+
+        `tree` is the tree-view layout of `processes` and `groups` the ProcessGroups
+        behind its rows in group mode; both None for the flat list.
+        """
         # Save current scroll position
         scroll_value = self.table.verticalScrollBar().value()
-        prev_rows = getattr(self, '_last_rendered', []) or []
-        full_reload = len(prev_rows) != len(processes)
 
-        # Temporarily disable sorting to avoid expensive resort on every update
-        try:
-            sorting_was_enabled = self.table.isSortingEnabled()
-        except Exception:
-            sorting_was_enabled = False
-        try:
-            self.table.setSortingEnabled(False)
-        except Exception:
-            pass
+        # Swap the model's snapshot; the view repaints only the visible rows
+        selection_model = self.table.selectionModel()
+        selection_model.blockSignals(True)
+        self.table_model.set_snapshot(processes, tree, groups)
+
+        self._update_memory_display(mem_info)
+
+        # Rows may have moved, so re-select by PID (without scrolling to them); the
+        # pid -> row index makes this cost the number of selected PIDs, not rows
+        selection = QItemSelection()
+        if self.selected_pid:
+            model = self.table_model
+            last_col = model.columnCount() - 1
+            rows = sorted(row for row in map(model.row_of, self.selected_pid) if row >= 0)
+            # One range per run of adjacent rows
+            start = None
+            for k, row in enumerate(rows):
+                if start is None:
+                    start = row
+                if k + 1 == len(rows) or rows[k + 1] != row + 1:
+                    selection.select(model.index(start, 0), model.index(row, last_col))
+                    start = None
+        selection_model.select(selection, QItemSelectionModel.ClearAndSelect | QItemSelectionModel.Rows)
+        selection_model.blockSignals(False)
+        # Repaint selection highlight (selectionChanged was blocked)
+        self.table.viewport().update()
+
+        # Restore scroll position only when not actively scrolling
+        if not getattr(self, '_user_scrolling', False):
+            try:
+                self.table.verticalScrollBar().setValue(scroll_value)
+            except Exception:
+                pass
+
+        # Snapshots are immutable once emitted, so keep a reference for diffing on next refresh
+        self._last_rendered = processes
+        self._update_priority_pids()
 
-        # Disable updates and selection signals during refresh
-        self.table.setUpdatesEnabled(False)
+        self._update_status_bar(len(processes), total_processes)
+
+    def _update_priority_pids(self):
+        """Tell the fetcher which PIDs are on screen or selected so their slow tiers stay fresh."""
         try:
-            self.table.itemSelectionChanged.disconnect(self.on_selection_changed)
+            rendered = self._last_rendered
+            pids = set(self.selected_pid or ())
+            if rendered is not None and len(rendered):
+                first = self.table.rowAt(0)
+                last = self.table.rowAt(self.table.viewport().height() - 1)
+                if first < 0:
+                    first = 0
+                if last < 0:
+                    last = len(rendered) - 1
+                pids.update(rendered.pids[first:last + 1])
+            self.data_fetcher.set_priority_pids(pids)
         except Exception:
             pass
-        if full_reload:
-            self.table.setRowCount(0)
-            self.table.setRowCount(len(processes))
 
+    def _update_memory_display(self, mem_info):
+        """Update the RAM labels and the color-coded memory progress bar."""
         # Update memory info - only if changed to reduce flickering
         self.total_ram_label.setText(f"{mem_info['total']:.2f} GB")
         self.used_ram_label.setText(f"{mem_info['used']:.2f} GB")
@@ -2932,225 +6784,84 @@ class TaskManagerGUI(QMainWindow):
             style = "QProgressBar::chunk { background-color: #e74c3c; }"
         self.progress_bar.setStyleSheet(style)
 
-        # Use cached color objects
-        if not hasattr(self, '_color_cache'):
-            self._color_cache = {
-                'high': QBrush(QColor(255, 200, 0, 50)),
-                'med': QBrush(QColor(255, 200, 0, 30)),
-                'none': QBrush(QColor(255, 255, 255, 0))
-            }
-        color_high = self._color_cache['high']
-        color_med = self._color_cache['med']
-        color_none = self._color_cache['none']
-
-        # Batch insert/update items with optimized formatting and diffing
-        non_editable_flags = Qt.ItemIsSelectable | Qt.ItemIsEnabled
-        str_func = str  # Cache built-in for faster access
-
-        # Compute visible row range to minimize work during updates
-        try:
-            viewport_height = self.table.viewport().height()
-            top_row = self.table.rowAt(0)
-            if top_row < 0:
-                top_row = 0
-            bottom_row = self.table.rowAt(viewport_height - 1)
-            if bottom_row < 0:
-                # estimate visible rows from default row height
-                try:
-                    rh = self.table.rowHeight(0) if self.table.rowCount() > 0 else self.table.verticalHeader().defaultSectionSize()
-                    rows_visible = max(1, int(viewport_height / max(1, rh)))
-                except Exception:
-                    rows_visible = 20
-                bottom_row = min(len(processes) - 1, top_row + rows_visible)
-        except Exception:
-            top_row = 0
-            bottom_row = min(len(processes) - 1, 20)
-
-        for row, proc in enumerate(processes):
-            # Skip work for rows outside the visible window to reduce UI churn
-            if row < top_row or row > bottom_row:
-                # still keep prev comparison and bookkeeping, but avoid creating items
-                prev = prev_rows[row] if (not full_reload and row < len(prev_rows)) else None
-                if (not full_reload) and prev and prev == proc:
-                    continue
-                # don't create items for off-screen rows
-                continue
-            prev = prev_rows[row] if (not full_reload and row < len(prev_rows)) else None
-            if (not full_reload) and prev and prev == proc:
-                # No change for this visible row; skip updates
-                continue
-            prev = prev_rows[row] if (not full_reload and row < len(prev_rows)) else None
-            if (not full_reload) and prev and prev == proc:
-                # No change for this row; skip updates
-                continue
-
-            # Always create fresh QTableWidgetItem objects to avoid ownership issues
-            pid_item = QTableWidgetItem()
-            pid_item.setFlags(non_editable_flags)
-
-            user_item = QTableWidgetItem()
-            user_item.setFlags(non_editable_flags)
-            user_item.setTextAlignment(Qt.AlignCenter)
-
-            name_item = QTableWidgetItem()
-            name_item.setFlags(non_editable_flags)
-
-            cpu_item = QTableWidgetItem()
-            cpu_item.setFlags(non_editable_flags)
-
-            ram_item = QTableWidgetItem()
-            ram_item.setFlags(non_editable_flags)
-
-            percent_item = QTableWidgetItem()
-            percent_item.setFlags(non_editable_flags)
-
-            disk_item = QTableWidgetItem()
-            disk_item.setFlags(non_editable_flags)
-
-            cpu_value = max(0.01, proc.get('cpu_percent', 0.0))
-            pid_item.setText(str_func(proc['pid']))
-            user_item.setText(proc.get('username', 'unknown'))
-            name_item.setText(proc['name'])
-            cpu_item.setText(f"{cpu_value:.1f}")
-            ram_item.setText(f"{proc['memory_mb']:.1f}")
-            percent_item.setText(f"{proc['memory_percent']:.1f}")
-            disk_item.setText(f"{proc.get('disk_io_mb', 0.0):.1f}")
-
-            # Select color based on memory usage
-            if proc['memory_percent'] > 10:
-                color = color_high
-            elif proc['memory_percent'] > 5:
-                color = color_med
-            else:
-                color = color_none
-
-            if color is not color_none:
-                pid_item.setBackground(color)
-                user_item.setBackground(color)
-                name_item.setBackground(color)
-                cpu_item.setBackground(color)
-                ram_item.setBackground(color)
-                percent_item.setBackground(color)
-                disk_item.setBackground(color)
-            else:
-                # Clear background if previously set
-                pid_item.setBackground(color_none)
-                user_item.setBackground(color_none)
-                name_item.setBackground(color_none)
-                cpu_item.setBackground(color_none)
-                ram_item.setBackground(color_none)
-                percent_item.setBackground(color_none)
-                disk_item.setBackground(color_none)
-
-            # Assign items for visible rows immediately
-            if not getattr(self, '_user_scrolling', False):
-                self.table.setItem(row, 0, pid_item)
-                self.table.setItem(row, 1, user_item)
-                self.table.setItem(row, 2, name_item)
-                self.table.setItem(row, 3, cpu_item)
-                self.table.setItem(row, 4, ram_item)
-                self.table.setItem(row, 5, percent_item)
-                self.table.setItem(row, 6, disk_item)
-            else:
-                # If currently scrolling, still queue visible-row items to ensure they appear
-                # (this rarely happens because we skip when scrolling, but keep safe)
-                try:
-                    self._pending_offscreen_fill.append((row, pid_item, user_item, name_item, cpu_item, ram_item, percent_item, disk_item))
-                except Exception:
-                    pass
-
-        # Re-enable updates
-        self.table.setUpdatesEnabled(True)
-
-        # Prepare background fill for off-screen rows (populate remaining rows in batches)
-        try:
-            # Build pending fill list for rows not currently filled
-            pending = []
-            for r in range(self.table.rowCount()):
-                if self.table.item(r, 0) is None and r < len(processes):
-                    p = processes[r]
-                    pending.append((r, p))
-            self._pending_offscreen_fill = pending
-            if self._pending_offscreen_fill:
-                if not self._bg_fill_timer.isActive():
-                    self._bg_fill_timer.start()
-            else:
-                try:
-                    if self._bg_fill_timer.isActive():
-                        self._bg_fill_timer.stop()
-                except Exception:
-                    pass
-        except Exception:
-            pass
-
-        # Restore previous sorting state
-        try:
-            self.table.setSortingEnabled(sorting_was_enabled)
-        except Exception:
-            pass
-        
-        # Restore selections if they still exist (without scrolling to them)
-        if not getattr(self, '_user_scrolling', False):
-            if self.selected_pid:
-                self.table.blockSignals(True)
-                for row in range(self.table.rowCount()):
-                    pid_item = self.table.item(row, 0)
-                    if pid_item:
-                        try:
-                            pid = int(pid_item.text())
-                            if pid in self.selected_pid:
-                                self.table.selectRow(row)
-                        except ValueError:
-                            pass
-                self.table.blockSignals(False)
-            
-            # Restore scroll position only when not actively scrolling
-            try:
-                self.table.verticalScrollBar().setValue(scroll_value)
-            except Exception:
-                pass
-
-        # Restore selections if they still exist (without scrolling to them)
-        if self.selected_pid:
-            self.table.blockSignals(True)
-            for row in range(self.table.rowCount()):
-                pid_item = self.table.item(row, 0)
-                if pid_item:
-                    try:
-                        pid = int(pid_item.text())
-                        if pid in self.selected_pid:
-                            self.table.selectRow(row)
-                    except ValueError:
-                        pass
-            self.table.blockSignals(False)
-
-        # Restore scroll position
-        self.table.verticalScrollBar().setValue(scroll_value)
-
-        # Reconnect selection signal
-        try:
-            self.table.itemSelectionChanged.connect(self.on_selection_changed)
-        except Exception:
-            pass
-
-        # Store a shallow copy of current rows for diffing on next refresh
-        try:
-            self._last_rendered = [dict(p) for p in processes]
-        except Exception:
-            self._last_rendered = processes
-
-        # Update status bar with both counts
+    def _update_status_bar(self, shown, total_processes):
+        """Update status bar with both counts"""
         current_time = datetime.now().strftime('%H:%M:%S')
         if self.hide_system_checkbox.isChecked() or self.hide_inaccessible_checkbox.isChecked():
-            self.statusBar().showMessage(f'Ready - Last updated: {current_time} | Showing: {len(processes)} / Total Processes: {total_processes}')
+            self.statusBar().showMessage(f'Ready - Last updated: {current_time} | Showing: {shown} / Total Processes: {total_processes}')
         else:
             self.statusBar().showMessage(f'Ready - Last updated: {current_time} | Total Processes: {total_processes}')
 
+    def _apply_delta_to_table(self, delta) -> bool:
+        """Patch only the rendered rows touched by a delta.
+
+        Returns False when the delta cannot be applied in place (rows added or
+        removed, name/user changed, a command line changed under an active search,
+        sort order broken, or a full render already pending) and the caller must
+        fall back to a full filtered render.
+        """
+        rendered = self._last_rendered
+        if rendered is None or delta.has_membership_changes():
+            return False
+        # Tree and group rows show totals, which any change can shift
+        if self.table_model.tree_depths is not None or self.table_model.group_members is not None:
+            return False
+        if self._pending_render_processes is not None or self._user_scrolling or self._window_moving:
+            return False
+        patchable = ('ppids', 'cpu', 'rss', 'mem_percent', 'io_read', 'io_write', 'threads', 'fds', 'cmdlines',
+                     'cpu_time', 'pss', 'uss', 'swap')
+        # The search matches on command lines, so a new one may show or hide its row
+        if self.search_input.text().strip():
+            patchable = tuple(column for column in patchable if column != 'cmdlines')
+        patches = []
+        for pid, changes in delta.changed.items():
+            if any(column not in patchable for column in changes):
+                return False
+            row = rendered.index_of(pid)
+            if row >= 0:
+                patches.append((row, changes))
+        if not patches:
+            return True
+
+        # Check the new values keep every patched row in place within the exactly sorted rows
+        sort = self._sort
+        column = sort.column
+        values = getattr(rendered, column)
+        exact = min(sort.exact, len(values))
+        new_values = {row: changes.get(column, values[row]) for row, changes in patches if row < exact}
+        last = exact - 1
+        for row, value in new_values.items():
+            before = new_values.get(row - 1, values[row - 1]) if row > 0 else None
+            after = new_values.get(row + 1, values[row + 1]) if row < last else None
+            if sort.descending:
+                if (before is not None and before < value) or (after is not None and value < after):
+                    return False
+            elif (before is not None and before > value) or (after is not None and value > after):
+                return False
+        # Rows past the exactly sorted prefix must not climb into it
+        if 0 < exact < len(values):
+            boundary = new_values.get(last, values[last])
+            for row, changes in patches:
+                if row >= exact and column in changes:
+                    value = changes[column]
+                    if (value > boundary) if sort.descending else (value < boundary):
+                        return False
+        for row, changes in patches:
+            rendered.set_fields(row, changes)
+
+        self.table_model.rows_changed(row for row, _ in patches)
+        return True
+
     def _flush_ui_update(self):
         """Called from the UI coalescing timer to perform a single render of pending data."""
         mem_info = self._pending_render_mem_info or self._last_mem_info
-        processes = self._pending_render_processes or list(self._cached_processes)
-        total = self._pending_total_processes or len(self._cached_processes)
+        processes = self._pending_render_processes
+        tree = self._pending_render_tree
+        groups = self._pending_render_groups
+        if processes is None:
+            processes = self._cached_snapshot
+            tree = groups = None
+        total = self._pending_total_processes or len(self._cached_snapshot)
         # If the user is actively scrolling, postpone intensive render until scrolling stops
         if getattr(self, '_user_scrolling', False):
             # re-schedule the ui update slightly later to avoid stutter
@@ -3168,14 +6879,16 @@ class TaskManagerGUI(QMainWindow):
             return
 
         try:
-            self._render_process_list(mem_info, processes, total)
+            self._render_process_list(mem_info, processes, total, tree, groups)
         finally:
             # Clear pending values
             self._pending_render_mem_info = None
             self._pending_render_processes = None
+            self._pending_render_tree = None
+            self._pending_render_groups = None
             self._pending_total_processes = 0
 
-    def _is_significant_change(self, mem_info, processes) -> bool:
+    def _is_significant_change(self, mem_info, snapshot) -> bool:
         """Return True if the incoming data is meaningfully different from last rendered.
 
         Heuristics used:
@@ -3195,19 +6908,13 @@ class TaskManagerGUI(QMainWindow):
 
             # Top 3 pid changes
             last_rows = getattr(self, '_last_rendered', None)
-            try:
-                new_top = tuple(p['pid'] for p in (processes[:3] if processes else []))
-            except Exception:
-                new_top = ()
-            try:
-                old_top = tuple(p.get('pid') for p in (last_rows[:3] if last_rows else []))
-            except Exception:
-                old_top = ()
-            if new_top and old_top and set(new_top) != set(old_top):
+            new_top = set(snapshot.pids[:3])
+            old_top = set(last_rows.pids[:3]) if last_rows is not None else set()
+            if new_top and old_top and new_top != old_top:
                 return True
 
             # Process count delta
-            if last_rows is not None and abs(len(processes) - len(last_rows)) > 3:
+            if last_rows is not None and abs(len(snapshot) - len(last_rows)) > 3:
                 return True
         except Exception:
             pass
@@ -3228,6 +6935,13 @@ class TaskManagerGUI(QMainWindow):
         """Called when scroll activity has paused; mark not scrolling and trigger any pending UI update."""
         try:
             self._user_scrolling = False
+            self._update_priority_pids()
+            # Scrolled past the exactly sorted rows: re-sort with a deeper limit
+            rendered = self._last_rendered
+            if (rendered is not None and self._sort.exact < len(rendered)
+                    and self.table_model.tree_depths is None and self.table_model.group_members is None
+                    and self.table.rowAt(self.table.viewport().height() - 1) >= self._sort.exact - 1):
+                self._apply_search_filter()
             # If there's pending data, ensure we flush soon
             if self._pending_render_processes is not None:
                 if self._ui_update_timer.isActive():
@@ -3248,14 +6962,6 @@ class TaskManagerGUI(QMainWindow):
             except Exception:
                 pass
 
-            # Resume background filler if it was previously active or there is pending work
-            try:
-                if getattr(self, '_bg_fill_was_active', False) or getattr(self, '_pending_offscreen_fill', None):
-                    if not self._bg_fill_timer.isActive() and getattr(self, '_pending_offscreen_fill', None):
-                        self._bg_fill_timer.start()
-            except Exception:
-                pass
-
             # If there was a UI update pending or was active before move, flush now
             try:
                 if getattr(self, '_ui_update_was_active', False) or self._pending_render_processes is not None:
@@ -3266,137 +6972,54 @@ class TaskManagerGUI(QMainWindow):
 
             # Reset remembered flags
             try:
-                self._bg_fill_was_active = False
                 self._ui_update_was_active = False
             except Exception:
                 pass
         except Exception as e:
             print(f"_on_move_stopped error: {e}")
 
-    def _bg_fill_step(self):
-        """Fill a small batch of pending off-screen rows to avoid large single-frame updates.
-
-        The pending entries may be either:
-        - (row, QTableWidgetItem, QTableWidgetItem, ... ) tuples produced while scrolling,
-        - or (row, proc_dict) tuples produced after a render to progressively populate off-screen rows.
-        """
-        try:
-            if not hasattr(self, '_pending_offscreen_fill') or not self._pending_offscreen_fill:
-                try:
-                    if self._bg_fill_timer.isActive():
-                        self._bg_fill_timer.stop()
-                except Exception:
-                    pass
-                return
-
-            # Number of rows to fill per tick - tuneable
-            batch_size = 8
-
-            non_editable_flags = Qt.ItemIsSelectable | Qt.ItemIsEnabled
-
-            # Ensure color cache exists
-            if not hasattr(self, '_color_cache'):
-                self._color_cache = {
-                    'high': QBrush(QColor(255, 200, 0, 50)),
-                    'med': QBrush(QColor(255, 200, 0, 30)),
-                    'none': QBrush(QColor(255, 255, 255, 0))
-                }
-
-            filled = 0
-            for _ in range(batch_size):
-                if not self._pending_offscreen_fill:
-                    break
-                entry = self._pending_offscreen_fill.pop(0)
-                # Two possible shapes: (row, pid_item, user_item, name_item, cpu_item, ram_item, percent_item, disk_item)
-                # or (row, proc_dict)
-                try:
-                    if len(entry) >= 8 and isinstance(entry[1], QTableWidgetItem):
-                        row = entry[0]
-                        items = entry[1:]
-                        # Ensure row exists
-                        if row >= self.table.rowCount():
-                            continue
-                        for col, itm in enumerate(items):
-                            try:
-                                self.table.setItem(row, col, itm)
-                            except Exception:
-                                pass
-                        filled += 1
-                    else:
-                        row, proc = entry
-                        if row >= self.table.rowCount():
-                            continue
-                        # Create fresh items similar to rendering path
-                        pid_item = QTableWidgetItem()
-                        pid_item.setFlags(non_editable_flags)
-                        user_item = QTableWidgetItem()
-                        user_item.setFlags(non_editable_flags)
-                        user_item.setTextAlignment(Qt.AlignCenter)
-                        name_item = QTableWidgetItem()
-                        name_item.setFlags(non_editable_flags)
-                        cpu_item = QTableWidgetItem()
-                        cpu_item.setFlags(non_editable_flags)
-                        ram_item = QTableWidgetItem()
-                        ram_item.setFlags(non_editable_flags)
-                        percent_item = QTableWidgetItem()
-                        percent_item.setFlags(non_editable_flags)
-                        disk_item = QTableWidgetItem()
-                        disk_item.setFlags(non_editable_flags)
-
-                        cpu_value = max(0.01, proc.get('cpu_percent', 0.0))
-                        pid_item.setText(str(proc.get('pid', '')))
-                        user_item.setText(proc.get('username', 'unknown'))
-                        name_item.setText(proc.get('name', ''))
-                        cpu_item.setText(f"{cpu_value:.1f}")
-                        ram_item.setText(f"{proc.get('memory_mb', 0.0):.1f}")
-                        percent_item.setText(f"{proc.get('memory_percent', 0.0):.1f}")
-                        disk_item.setText(f"{proc.get('disk_io_mb', 0.0):.1f}")
-
-                        # Color selection
-                        color = self._color_cache['none']
-                        try:
-                            if proc.get('memory_percent', 0.0) > 10:
-                                color = self._color_cache['high']
-                            elif proc.get('memory_percent', 0.0) > 5:
-                                color = self._color_cache['med']
-                        except Exception:
-                            color = self._color_cache['none']
-
-                        if color is not self._color_cache['none']:
-                            for itm in (pid_item, user_item, name_item, cpu_item, ram_item, percent_item, disk_item):
-                                itm.setBackground(color)
-                        else:
-                            for itm in (pid_item, user_item, name_item, cpu_item, ram_item, percent_item, disk_item):
-                                itm.setBackground(self._color_cache['none'])
-
-                        # Apply to table
-                        try:
-                            self.table.setItem(row, 0, pid_item)
-                            self.table.setItem(row, 1, user_item)
-                            self.table.setItem(row, 2, name_item)
-                            self.table.setItem(row, 3, cpu_item)
-                            self.table.setItem(row, 4, ram_item)
-                            self.table.setItem(row, 5, percent_item)
-                            self.table.setItem(row, 6, disk_item)
-                        except Exception:
-                            pass
-                        filled += 1
-                except Exception:
-                    # Ignore malformed entries and continue
-                    continue
 
-            # If nothing left to fill, stop timer
-            if not self._pending_offscreen_fill:
-                try:
-                    if self._bg_fill_timer.isActive():
-                        self._bg_fill_timer.stop()
-                except Exception:
-                    pass
-        except Exception as e:
-            print(f"_bg_fill_step error: {e}")
+def parse_args(argv):
+    """Parse our own options, leaving anything else (Qt/QtWebEngine flags) in place."""
+    parser = argparse.ArgumentParser(description='Task Manager GUI')
+    parser.add_argument('--daemon', action='store_true',
+                        help='run headless and publish snapshots for GUI instances to share')
+    parser.add_argument('--ring', default=DEFAULT_RING_PATH,
+                        help=f'shared snapshot file (default: {DEFAULT_RING_PATH})')
+    parser.add_argument('--interval', type=float, default=1.0, help='daemon collection interval in seconds')
+    parser.add_argument('--record', metavar='FILE', help='append every refresh to a recording for later replay')
+    parser.add_argument('--replay', metavar='FILE', help='show a recording instead of live data')
+    parser.add_argument('--replay-from', metavar='TIME', type=parse_timestamp,
+                        help='start the replay at a Unix timestamp or ISO date/time')
+    parser.add_argument('--replay-speed', type=float, default=1.0, help='replay speed multiplier')
+    args, remaining = parser.parse_known_args(argv[1:])
+    return args, argv[:1] + remaining
+
+
+def parse_timestamp(text):
+    """Parse a Unix timestamp or an ISO 8601 date/time (local time) into epoch seconds."""
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid time: {text!r}")
 
 
 def main():
+    args, sys.argv = parse_args(sys.argv)
+    recorder = SnapshotRecorder(args.record) if args.record else None
+    if args.daemon:
+        run_daemon(args.ring, args.interval, recorder)
+        return
+    replay = None
+    if args.replay:
+        replay = SnapshotRecording(args.replay)
+        if args.replay_from is not None:
+            replay.seek(args.replay_from)
+
     # Check if display is available
     if not os.environ.get('DISPLAY'):
         print("Warning: No display found. Setting DISPLAY to :0")
@@ -3416,7 +7039,8 @@ def main():
         os.environ['QT_QPA_PLATFORM'] = 'offscreen'
         app = QApplication(sys.argv)
     
-    window = TaskManagerGUI()
+    window = TaskManagerGUI(ring_path=args.ring, recorder=recorder, replay=replay,
+                            replay_speed=args.replay_speed)
     window.showNormal()  # Use showNormal instead of show
     window.raise_()  # Bring window to front
     window.activateWindow()  # Ensure window is focused
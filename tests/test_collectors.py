@@ -0,0 +1,61 @@
+"""
+Tests for the /proc collector against a small synthetic procfs tree.
+
+Run with:
+  python3 -m pytest tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from task_manager_gui import ProcCollector, SamplingPlan  # noqa: E402
+
+STAT_TEMPLATE = (
+    "{pid} ({name}) S 1 {pid} {pid} 0 -1 4194560 1200 0 0 0 10 5 0 0 20 0 1 0 {start} "
+    "25000000 1000 18446744073709551615 1 1 0 0 0 0 0 4096 0 0 0 0 17 0 0 0 0 0 0 0 0 0 0 0 0 0\n"
+)
+
+
+def write_process(root, pid, name, argv, start=100):
+    """Create or overwrite the /proc/[pid] files the collector reads."""
+    d = os.path.join(root, str(pid))
+    os.makedirs(d, exist_ok=True)
+    with open(os.path.join(d, 'stat'), 'w') as f:
+        f.write(STAT_TEMPLATE.format(pid=pid, name=name[:15], start=start))
+    with open(os.path.join(d, 'statm'), 'w') as f:
+        f.write("6000 1000 500 10 0 1000 0\n")
+    with open(os.path.join(d, 'status'), 'w') as f:
+        f.write(f"Name:\t{name[:15]}\nUid:\t0\t0\t0\t0\n")
+    with open(os.path.join(d, 'cmdline'), 'wb') as f:
+        f.write(b'\0'.join(arg.encode() for arg in argv) + b'\0')
+
+
+def collect(collector, plan):
+    plan.begin_tick()
+    snapshot = collector.collect(plan)
+    plan.end_tick()
+    return snapshot
+
+
+def test_exec_without_event_refreshes_name_and_cmdline(tmp_path):
+    root = str(tmp_path)
+    with open(os.path.join(root, 'stat'), 'w') as f:
+        f.write("cpu  100 0 100 1000 0 0 0 0 0 0\nbtime 1700000000\n")
+    write_process(root, 1000, 'bash', ['/bin/bash', '-c', 'exec sleep 60'])
+    collector = ProcCollector(1 << 30, proc_root=root)
+    plan = SamplingPlan(SamplingPlan.DAEMON_TIERS)
+
+    snapshot = collect(collector, plan)
+    row = snapshot.index_of(1000)
+    assert snapshot.names[row] == 'bash'
+    assert snapshot.cmdlines[row] == '/bin/bash -c exec sleep 60'
+
+    # exec keeps the PID and start time; only comm and argv change
+    write_process(root, 1000, 'sleep', ['sleep', '60'])
+    snapshot = collect(collector, plan)
+    row = snapshot.index_of(1000)
+    assert snapshot.names[row] == 'sleep'
+    assert snapshot.cmdlines[row] == 'sleep 60'
+    assert len(collector.metadata) == 1
@@ -0,0 +1,88 @@
+"""
+Tests for the --daemon collector and the shared snapshot ring it publishes to.
+
+Run with:
+  python3 -m pytest tests
+"""
+
+import errno
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import task_manager_gui  # noqa: E402
+from task_manager_gui import ProcessSnapshot, SnapshotRingReader, SnapshotRingWriter  # noqa: E402
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'task_manager_gui.py')
+
+
+def make_snapshot(count):
+    snapshot = ProcessSnapshot()
+    for pid in range(1, count + 1):
+        snapshot.append(pid, f'proc{pid}', 'root', 0.0, 4096 * pid, 0.1, 0.0, 0.0,
+                        cmdline=f'/usr/bin/proc{pid} --flag')
+    return snapshot
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='needs /proc')
+def test_daemon_publishes_cmdlines_and_fds(tmp_path):
+    ring_path = str(tmp_path / 'ring')
+    env = dict(os.environ, HOME=str(tmp_path))
+    daemon = subprocess.Popen([sys.executable, SCRIPT, '--daemon', '--ring', ring_path, '--interval', '0.2'],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 15
+        reader = None
+        result = None
+        while time.monotonic() < deadline and result is None:
+            time.sleep(0.2)
+            if reader is None:
+                if not os.path.exists(ring_path):
+                    continue
+                reader = SnapshotRingReader(ring_path)
+            published = reader.read()
+            if published is not None and published[0] >= 2:
+                result = published
+        assert result is not None, 'daemon published nothing'
+        _, snapshot, meta = result
+        # Nothing in the daemon is priority-only: our own row must be fully sampled
+        row = snapshot.index_of(daemon.pid)
+        assert row >= 0
+        assert '--daemon' in snapshot.cmdlines[row]
+        assert snapshot.fds[row] >= 0
+        assert sum(1 for cmdline in snapshot.cmdlines if cmdline) > 0
+        assert meta['ages']['cmdline'] is not None
+        reader.close()
+    finally:
+        daemon.terminate()
+        daemon.wait(10)
+
+
+def test_ring_growth_failure_keeps_old_slot_size(tmp_path, monkeypatch):
+    ring_path = str(tmp_path / 'ring')
+    writer = SnapshotRingWriter(ring_path, slot_count=2, slot_size=65536)
+    try:
+        writer.publish(1, make_snapshot(10), {})
+
+        def no_space(fd, size):
+            raise OSError(errno.ENOSPC, 'No space left on device')
+
+        monkeypatch.setattr(task_manager_gui.os, 'ftruncate', no_space)
+        with pytest.raises(OSError):
+            writer.publish(2, make_snapshot(5000), {})
+        assert writer.slot_size == 65536
+        monkeypatch.undo()
+
+        # The writer is still on its old ring and keeps publishing into it
+        writer.publish(3, make_snapshot(20), {})
+        reader = SnapshotRingReader(ring_path)
+        seq, snapshot, _ = reader.read()
+        assert seq == 3 and len(snapshot) == 20
+        reader.close()
+    finally:
+        writer.close()
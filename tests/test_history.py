@@ -0,0 +1,46 @@
+"""
+Tests for HistoryStore's memory cap.
+
+Run with:
+  python3 -m pytest tests
+"""
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from task_manager_gui import HistoryStore, ProcessSnapshot  # noqa: E402
+
+MEM_INFO = {'used': 1.0}
+
+
+def make_snapshot(first_pid, count):
+    snapshot = ProcessSnapshot()
+    for pid in range(first_pid, first_pid + count):
+        snapshot.append(pid, 'proc', 'root', 1.0, 1048576, 0.1, 0.0, 0.0, start=float(pid))
+    return snapshot
+
+
+def test_memory_stays_under_cap_once_slots_run_out():
+    store = HistoryStore(max_bytes=1048576)
+    # Enough new processes every tick to fill every slot and then some
+    for tick in range(4):
+        store.record(make_snapshot(1000 + tick * store.max_slots, store.max_slots + 100), MEM_INFO)
+    assert store.tracked() == store.max_slots - 1
+    assert store.dropped > 0
+    assert store.memory_bytes() <= store.max_bytes
+
+
+def test_growth_peak_stays_under_cap():
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        store = HistoryStore(max_bytes=4 * 1048576)
+        store._grow(store.max_slots)
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    assert store._slots == store.max_slots
+    assert peak <= store.max_bytes
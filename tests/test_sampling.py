@@ -0,0 +1,47 @@
+"""
+Tests for SamplingPlan tier cadences and staleness.
+
+Run with:
+  python3 -m pytest tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from task_manager_gui import SamplingPlan  # noqa: E402
+
+
+def run_tick(plan, pids):
+    plan.begin_tick()
+    sampled = {name: [pid for pid in pids if plan.wants(name, pid)] for name in plan.tiers}
+    plan.end_tick()
+    return sampled
+
+
+def test_priority_tier_without_priority_pids_is_not_fresh():
+    plan = SamplingPlan()
+    sampled = run_tick(plan, [1, 2, 3])
+    assert sampled['fds'] == [] and sampled['cmdline'] == []
+    ages = plan.ages()
+    assert ages['fds'] is None and ages['cmdline'] is None
+    assert ages['threads'] is not None
+
+
+def test_priority_tier_is_stamped_once_it_covers_a_process():
+    plan = SamplingPlan()
+    run_tick(plan, [1, 2, 3])
+    plan.set_priority_pids([2])
+    # fds is due every other tick
+    run_tick(plan, [1, 2, 3])
+    sampled = run_tick(plan, [1, 2, 3])
+    assert sampled['fds'] == [2]
+    assert plan.ages()['fds'] is not None
+
+
+def test_daemon_tiers_cover_every_process():
+    plan = SamplingPlan(SamplingPlan.DAEMON_TIERS)
+    sampled = run_tick(plan, [1, 2, 3])
+    assert sampled['fds'] == [1, 2, 3] and sampled['cmdline'] == [1, 2, 3]
+    assert None not in plan.ages().values()